@@ -0,0 +1,162 @@
+"""Import-time profile of the bot modules, with a regression budget.
+
+Imports each bot module in a fresh interpreter under ``python -X importtime``,
+groups the cumulative time of every top-level import into phases (pipecat,
+Daily, the LLM backend, VAD, ...) and checks the result against
+``budget.json``:
+
+- ``total_ms``: ceiling for importing the module
+- ``forbidden``: modules that must not load at import time because the bot
+  only needs them for some configurations (e.g. the VAD engines)
+
+Exits with status 1 if any budget is exceeded, so it can gate CI:
+
+    python script/import-time/app.py [bot_gemini bot_openai] [--json]
+
+``tests/test_import_budget.py`` runs the same check as part of the test suite.
+Phase times are cumulative, so a package shared by several phases is counted
+in whichever imports it first.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), "..", ".."))
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), "budget.json")
+
+# Root package -> phase
+PHASES = {
+    "pipecat": "pipecat",
+    "daily": "daily",
+    "openai": "llm",
+    "google": "llm",
+    "websockets": "llm",
+    "supabase": "supabase",
+    "postgrest": "supabase",
+    "gotrue": "supabase",
+    "httpx": "supabase",
+    "onnxruntime": "vad",
+    "webrtcvad": "vad",
+    "energy_vad_analyzer": "vad",
+    "webrtc_vad_analyzer": "vad",
+    "vad_engines": "vad",
+    "numpy": "numpy",
+    "PIL": "sprites",
+    "sprites": "sprites",
+    "aiohttp": "aiohttp",
+    "pydantic": "pydantic",
+    "loguru": "logging",
+    "src": "bot",
+    "bot_events": "bot",
+    "runner": "bot",
+    "utils": "bot",
+    "transcript": "bot",
+    "end_of_turn": "bot",
+    "avatar": "sprites",
+}
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+
+def profile(module: str):
+    """Import ``module`` under ``-X importtime``.
+
+    Returns:
+        tuple: (wall seconds, [(depth, name, cumulative microseconds)])
+    """
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - started)"
+    )
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([os.path.join(ROOT_DIR, "src"), ROOT_DIR]),
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            _, cumulative, indent, name = match.groups()
+            imports.append(((len(indent) - 1) // 2, name, int(cumulative)))
+    return float(result.stdout.strip().splitlines()[-1]), imports
+
+
+def phases(module: str, imports) -> dict:
+    """Milliseconds per phase, from the imports made directly by ``module``."""
+    totals = defaultdict(float)
+    # A module's imports are listed before it, one level deeper
+    children = []
+    for depth, name, cumulative in imports:
+        if depth == 1:
+            children.append((name, cumulative))
+        elif depth == 0:
+            if name == module:
+                for child, child_cumulative in children:
+                    phase = PHASES.get(child.split(".")[0], "other")
+                    totals[phase] += child_cumulative / 1000
+            children = []
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def check(module: str, budget: dict) -> dict:
+    wall, imports = profile(module)
+    loaded = {name for _, name, _ in imports}
+    report = {
+        "module": module,
+        "total_ms": round(wall * 1000, 1),
+        "phases_ms": {
+            phase: round(ms, 1) for phase, ms in phases(module, imports).items()
+        },
+        "violations": [],
+    }
+    if budget.get("total_ms") and report["total_ms"] > budget["total_ms"]:
+        report["violations"].append(
+            f"import took {report['total_ms']} ms, budget is {budget['total_ms']} ms"
+        )
+    for name in budget.get("forbidden", []):
+        if name in loaded:
+            report["violations"].append(f"{name} is imported at startup")
+    return report
+
+
+def main():
+    with open(BUDGET_FILE) as f:
+        budgets = json.load(f)
+
+    parser = argparse.ArgumentParser(description="Bot import-time budget check")
+    parser.add_argument("modules", nargs="*", default=list(budgets))
+    parser.add_argument("--json", action="store_true", help="Print reports as JSON")
+    args = parser.parse_args()
+
+    reports = [check(module, budgets.get(module, {})) for module in args.modules]
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            print(f"{report['module']}: {report['total_ms']} ms")
+            for phase, ms in report["phases_ms"].items():
+                print(f"  {phase:<12} {ms:>8.1f} ms")
+            for violation in report["violations"]:
+                print(f"  OVER BUDGET: {violation}")
+
+    sys.exit(1 if any(report["violations"] for report in reports) else 0)
+
+
+if __name__ == "__main__":
+    main()
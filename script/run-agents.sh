@@ -0,0 +1,18 @@
+# Start several worker agents on this machine as a local stand-in for a
+# multi-node deployment, then point the server at them with WORKER_NODES.
+AGENTS=${AGENTS:-2}
+BASE_PORT=${BASE_PORT:-7870}
+# Agents refuse to start without a shared token
+export WORKER_AGENT_TOKEN=${WORKER_AGENT_TOKEN:-$(python3 -c "import secrets; print(secrets.token_hex(16))")}
+
+NODES=""
+for i in $(seq 0 $((AGENTS - 1))); do
+  port=$((BASE_PORT + i))
+  poetry run uvicorn src.worker_agent:app --host 127.0.0.1 --port ${port} > agent-${port}.log 2>&1 &
+  NODES="${NODES:+${NODES},}http://127.0.0.1:${port}"
+done
+
+echo "Started ${AGENTS} worker agents"
+echo "WORKER_NODES=${NODES}"
+echo "WORKER_AGENT_TOKEN=${WORKER_AGENT_TOKEN}"
+wait
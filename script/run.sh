@@ -2,4 +2,12 @@ echo "VITE_API_URL=${VITE_API_URL}" > src/ui/.env
 
 echo "Starting the server... with VITE_API_URL=${VITE_API_URL}"
 make build
-poetry run uvicorn src.main:app --reload --host 0.0.0.0 --port ${PORT:-8000} --workers 1
+# Several API workers share bot and room state through STATE_STORE_PATH;
+# --reload only works with a single worker
+WORKERS=${WEB_CONCURRENCY:-1}
+if [ "${WORKERS}" -gt 1 ]; then
+  export STATE_STORE_PATH=${STATE_STORE_PATH:-/tmp/hotline-state.db}
+  poetry run uvicorn src.main:app --host 0.0.0.0 --port ${PORT:-8000} --workers ${WORKERS}
+else
+  poetry run uvicorn src.main:app --reload --host 0.0.0.0 --port ${PORT:-8000}
+fi
@@ -0,0 +1,220 @@
+"""Offline benchmark and accuracy suite for the VAD analyzers.
+
+Streams every WAV file in a corpus directory through each analyzer in
+``src/vad_engines.py``, in the frame size the analyzer asks for, and reports
+per engine:
+
+- cost: CPU time per frame, frames per second per core, peak RSS, and for
+  cascaded analyzers the share of frames the gate kept from the model
+- accuracy against labeled speech segments: frame agreement, speech recall,
+  false alarm rate
+- end-of-speech delay: time from the end of each labeled segment until the
+  analyzer's VAD state (with the bot's ``stop_secs``) returns to quiet
+
+Corpus layout: ``name.wav`` (16-bit PCM, mono or first channel used) with
+``name.json`` holding ``[[start, end], ...]`` speech segments in seconds, or
+``name.txt`` with one ``start end`` pair per line. Files without labels only
+count towards cost.
+
+Each engine runs in its own interpreter so memory is measured in isolation.
+Results are printed as JSON (``--output`` to write a file) for comparing runs:
+
+    python script/vad-bench/app.py corpus/ [--engines WebRTCVADAnalyzer ...]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import wave
+from statistics import mean, median
+
+ROOT_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path[:0] = [os.path.join(ROOT_DIR, "src"), ROOT_DIR]
+
+import numpy as np  # noqa: E402
+
+# Matches the bots' VAD parameters
+STOP_SECS = 0.5
+
+
+def read_wav(path: str):
+    """Read a WAV file as 16-bit mono PCM bytes.
+
+    Returns:
+        tuple: (pcm bytes, sample rate)
+    """
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM is supported")
+        channels = f.getnchannels()
+        rate = f.getframerate()
+        pcm = f.readframes(f.getnframes())
+    if channels > 1:
+        pcm = np.frombuffer(pcm, dtype=np.int16)[::channels].tobytes()
+    return pcm, rate
+
+
+def read_segments(wav_path: str):
+    """Labeled speech segments for a WAV file, or None if it has no labels."""
+    stem = os.path.splitext(wav_path)[0]
+    if os.path.exists(f"{stem}.json"):
+        with open(f"{stem}.json") as f:
+            return [(float(start), float(end)) for start, end in json.load(f)]
+    if os.path.exists(f"{stem}.txt"):
+        with open(f"{stem}.txt") as f:
+            return [
+                (float(start), float(end))
+                for start, end, *_ in (line.split() for line in f if line.strip())
+            ]
+    return None
+
+
+def is_speech(t: float, segments) -> bool:
+    return any(start <= t < end for start, end in segments)
+
+
+def percentile(values, q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def run_engine(engine: str, corpus: str) -> dict:
+    """Benchmark one engine over the corpus, in this process."""
+    from pipecat.audio.vad.vad_analyzer import VADParams, VADState
+
+    from vad_engines import load_vad_analyzer
+
+    analyzer_class = load_vad_analyzer(engine)
+    params = VADParams(stop_secs=STOP_SECS)
+
+    frames = model_skipped = 0
+    cpu_ns = []
+    agree = speech_frames = speech_hits = quiet_frames = false_alarms = 0
+    delays = []
+    missed_ends = 0
+
+    for name in sorted(os.listdir(corpus)):
+        if not name.lower().endswith(".wav"):
+            continue
+        path = os.path.join(corpus, name)
+        pcm, rate = read_wav(path)
+        segments = read_segments(path)
+
+        # Raw per-frame decisions and their cost
+        analyzer = analyzer_class(sample_rate=rate, params=params)
+        frame_samples = analyzer.num_frames_required()
+        frame_bytes = frame_samples * 2
+        frame_secs = frame_samples / rate
+        for index, offset in enumerate(range(0, len(pcm) - frame_bytes + 1, frame_bytes)):
+            frame = pcm[offset : offset + frame_bytes]
+            started = time.process_time_ns()
+            confidence = analyzer.voice_confidence(frame)
+            cpu_ns.append(time.process_time_ns() - started)
+            frames += 1
+            if segments is None:
+                continue
+            predicted = confidence >= params.confidence
+            actual = is_speech((index + 0.5) * frame_secs, segments)
+            agree += predicted == actual
+            if actual:
+                speech_frames += 1
+                speech_hits += predicted
+            else:
+                quiet_frames += 1
+                false_alarms += predicted
+
+        # Cascaded analyzers count the frames their gate kept from the model
+        model_skipped += getattr(analyzer, "skipped_frames", 0)
+
+        if not segments:
+            continue
+
+        # End-of-speech delay through the full VAD state machine
+        analyzer = analyzer_class(sample_rate=rate, params=params)
+        quiet_at = []
+        previous = VADState.QUIET
+        for index, offset in enumerate(range(0, len(pcm) - frame_bytes + 1, frame_bytes)):
+            state = analyzer.analyze_audio(pcm[offset : offset + frame_bytes])
+            if state == VADState.QUIET and previous != VADState.QUIET:
+                quiet_at.append((index + 1) * frame_secs)
+            previous = state
+        for _, end in segments:
+            after = [t for t in quiet_at if t >= end]
+            if after:
+                delays.append(after[0] - end)
+            else:
+                missed_ends += 1
+
+    cpu_seconds = sum(cpu_ns) / 1e9
+    labeled = speech_frames + quiet_frames
+    return {
+        "engine": engine,
+        "frames": frames,
+        "cpu_us_per_frame": {
+            "mean": round(mean(cpu_ns) / 1000, 3) if cpu_ns else 0.0,
+            "p50": round(percentile(cpu_ns, 50) / 1000, 3),
+            "p99": round(percentile(cpu_ns, 99) / 1000, 3),
+        },
+        "frames_per_cpu_second": round(frames / cpu_seconds, 1) if cpu_seconds else None,
+        "model_skip_ratio": round(model_skipped / frames, 4) if frames else None,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "accuracy": {
+            "labeled_frames": labeled,
+            "agreement": round(agree / labeled, 4) if labeled else None,
+            "speech_recall": round(speech_hits / speech_frames, 4) if speech_frames else None,
+            "false_alarm_rate": round(false_alarms / quiet_frames, 4) if quiet_frames else None,
+        },
+        "end_of_speech_delay_secs": {
+            "segments": len(delays) + missed_ends,
+            "missed": missed_ends,
+            "mean": round(mean(delays), 3) if delays else None,
+            "p50": round(median(delays), 3) if delays else None,
+            "p95": round(percentile(delays, 95), 3) if delays else None,
+        },
+    }
+
+
+def main():
+    from vad_engines import VAD_ENGINES
+
+    parser = argparse.ArgumentParser(description="VAD benchmark and accuracy suite")
+    parser.add_argument("corpus", help="Directory of WAV files and segment labels")
+    parser.add_argument(
+        "--engines", nargs="+", default=list(VAD_ENGINES), help="Engines to run"
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--in-process", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.in_process:
+        print(json.dumps(run_engine(args.engines[0], args.corpus)))
+        return
+
+    results = []
+    for engine in args.engines:
+        print(f"Benchmarking {engine}...", file=sys.stderr)
+        result = subprocess.run(
+            [sys.executable, __file__, args.corpus, "--engines", engine, "--in-process"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            print(f"{engine} failed:\n{result.stderr}", file=sys.stderr)
+            results.append({"engine": engine, "error": result.stderr.strip().splitlines()[-1:]})
+            continue
+        results.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    report = json.dumps({"corpus": os.path.abspath(args.corpus), "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
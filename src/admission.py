@@ -0,0 +1,199 @@
+"""Admission control for bot spawning.
+
+Every bot is a CPU-hungry real-time pipeline, so letting a burst of callers
+spawn as many bots as they like makes audio stutter for every call on the node.
+``AdmissionController`` caps how many bots may run at once (by count, CPU load
+and/or total bot RSS), holds a short bounded queue of callers waiting for a
+slot, and rejects the rest so the endpoint can answer 503 with ``Retry-After``.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+from loguru import logger
+
+
+class AdmissionRejected(Exception):
+    """Raised when a caller can't be admitted within the queue limits."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limiter with a bounded, deadline-limited wait queue.
+
+    ``acquire()`` takes a slot for one bot and ``release()`` gives it back when
+    the bot exits. A limit of 0 disables that particular budget.
+    """
+
+    # How often queued callers re-check the CPU/RSS budgets
+    BUDGET_POLL_SECS = 0.25
+
+    def __init__(
+        self,
+        max_bots: int = 0,
+        max_load_per_cpu: float = 0.0,
+        max_rss_bytes: int = 0,
+        queue_size: int = 16,
+        queue_timeout: float = 5.0,
+        rss_used: Optional[Callable[[], int]] = None,
+        bots_running: Optional[Callable[[], int]] = None,
+    ):
+        """
+        Args:
+            max_bots (int): Maximum concurrent bots
+            max_load_per_cpu (float): Maximum 1-minute load average per CPU
+            max_rss_bytes (int): Maximum combined RSS of running bots
+            queue_size (int): Callers allowed to wait for a slot
+            queue_timeout (float): Seconds a caller may wait before rejection
+            rss_used (Optional[Callable[[], int]]): Returns current bot RSS in bytes
+            bots_running (Optional[Callable[[], int]]): Returns the bots running
+                across all API workers, when ``max_bots`` is shared by several
+        """
+        self.max_bots = max_bots
+        self.max_load_per_cpu = max_load_per_cpu
+        self.max_rss_bytes = max_rss_bytes
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._rss_used = rss_used
+        self._bots_running = bots_running
+        self.active = 0
+        self.draining = False
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self.admission_seconds_total = 0.0
+        self.last_admission_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds a rejected caller should wait before trying again."""
+        return max(1, math.ceil(self.queue_timeout))
+
+    async def acquire(self):
+        """Wait for a bot slot.
+
+        Raises:
+            AdmissionRejected: If the queue is full, the deadline passes or
+                the server is draining
+        """
+        started = time.monotonic()
+        if self.draining:
+            self.rejected_total += 1
+            raise AdmissionRejected("Server is shutting down", self.retry_after)
+        if not self._waiters and self._has_capacity():
+            self._admit(started)
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            self.rejected_total += 1
+            raise AdmissionRejected("Admission queue is full", self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        deadline = started + self.queue_timeout
+        try:
+            while not waiter.done():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                try:
+                    await asyncio.wait_for(
+                        asyncio.shield(waiter), min(remaining, self.BUDGET_POLL_SECS)
+                    )
+                except asyncio.TimeoutError:
+                    # Budgets free up without a release() when load drops
+                    self._wake()
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as we gave up; pass it on
+                self.release()
+            waiter.cancel()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected_total += 1
+            raise AdmissionRejected(
+                "Timed out waiting for a bot slot", self.retry_after
+            )
+
+        self._record(started)
+
+    def release(self):
+        """Return a slot, handing it to the next queued caller if any."""
+        self.active = max(self.active - 1, 0)
+        self._wake()
+
+    def drain(self):
+        """Stop admitting bots and turn away every queued caller."""
+        self.draining = True
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.rejected_total += 1
+                waiter.set_exception(
+                    AdmissionRejected("Server is shutting down", self.retry_after)
+                )
+
+    def stats(self) -> Dict[str, float]:
+        """Live admission state for monitoring."""
+        admitted = self.admitted_total
+        return {
+            "active": self.active,
+            "draining": self.draining,
+            "queue_depth": self.queue_depth,
+            "admitted_total": admitted,
+            "rejected_total": self.rejected_total,
+            "last_admission_seconds": self.last_admission_seconds,
+            "mean_admission_seconds": (
+                self.admission_seconds_total / admitted if admitted else 0.0
+            ),
+        }
+
+    def _admit(self, started: float):
+        self.active += 1
+        self._record(started)
+
+    def _record(self, started: float):
+        elapsed = time.monotonic() - started
+        self.admitted_total += 1
+        self.admission_seconds_total += elapsed
+        self.last_admission_seconds = elapsed
+
+    def _wake(self):
+        if self.draining:
+            return
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+    def _has_capacity(self) -> bool:
+        if self.max_bots:
+            active = self.active
+            if self._bots_running:
+                active = max(active, self._bots_running())
+            if active >= self.max_bots:
+                return False
+        if self.max_load_per_cpu:
+            load_per_cpu = os.getloadavg()[0] / (os.cpu_count() or 1)
+            if load_per_cpu >= self.max_load_per_cpu:
+                logger.debug(f"CPU budget exhausted: load {load_per_cpu:.2f}/cpu")
+                return False
+        if self.max_rss_bytes and self._rss_used:
+            if self._rss_used() >= self.max_rss_bytes:
+                logger.debug("RSS budget exhausted")
+                return False
+        return True
@@ -0,0 +1,174 @@
+"""Avatar video output that only sends frames when the picture changes.
+
+With a ``SpriteFrame`` the output transport redraws the animation (or the
+single quiet frame) at the full camera frame rate for the whole call, so the
+video encoder never idles. ``AvatarAnimator`` instead runs the transport in
+live mode, where it only draws frames it's given, and gives it:
+
+- the quiet frame once when the bot stops talking
+- the talking sprites at ``AVATAR_FPS`` while it talks, skipping repeats
+
+Sprites come pre-scaled to the camera size (see ``sprites.py``) so the
+transport never has to resize them. ``AVATAR_OUTPUT=sprite`` switches back to
+``TalkingAnimation`` and the redrawn ``SpriteFrame``.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from pipecat.frames.frames import (
+    BotStartedSpeakingFrame,
+    BotStoppedSpeakingFrame,
+    CancelFrame,
+    EndFrame,
+    Frame,
+    OutputImageRawFrame,
+    SpriteFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from sprites import load_sprite_frames
+
+# "dirty" sends frames only when the picture changes; "sprite" is the old
+# continuously redrawn SpriteFrame output
+AVATAR_OUTPUT = os.getenv("AVATAR_OUTPUT", "dirty").lower()
+
+# Frame rate of the talking animation in "dirty" mode
+AVATAR_FPS = int(os.getenv("AVATAR_FPS", "8"))
+
+
+def camera_params(width: int, height: int) -> Dict[str, Any]:
+    """``DailyParams`` camera settings for the selected avatar output mode.
+
+    Args:
+        width (int): Camera width
+        height (int): Camera height
+    """
+    params = {
+        "camera_out_enabled": True,
+        "camera_out_width": width,
+        "camera_out_height": height,
+    }
+    if AVATAR_OUTPUT == "dirty":
+        params["camera_out_is_live"] = True
+        params["camera_out_framerate"] = AVATAR_FPS
+    return params
+
+
+def create_avatar(size: Tuple[int, int]) -> FrameProcessor:
+    """The avatar processor for the selected output mode.
+
+    Args:
+        size (Tuple[int, int]): Camera (width, height) to scale sprites to
+
+    Returns:
+        FrameProcessor: ``AvatarAnimator`` or ``TalkingAnimation``; either
+            exposes the listening frame as ``quiet_frame``
+    """
+    quiet_frame, talking_frame = load_sprite_frames(size)
+    if AVATAR_OUTPUT == "dirty":
+        return AvatarAnimator(quiet_frame, talking_frame.images)
+    return TalkingAnimation(quiet_frame, talking_frame)
+
+
+class TalkingAnimation(FrameProcessor):
+    """Manages the bot's visual animation states.
+
+    Switches between static (listening) and animated (talking) states based on
+    the bot's current speaking status.
+    """
+
+    def __init__(self, quiet_frame: OutputImageRawFrame, talking_frame: SpriteFrame):
+        super().__init__()
+        self.quiet_frame = quiet_frame
+        self._talking_frame = talking_frame
+        self._is_talking = False
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        """Process incoming frames and update animation state.
+
+        Args:
+            frame: The incoming frame to process
+            direction: The direction of frame flow in the pipeline
+        """
+        await super().process_frame(frame, direction)
+
+        # Switch to talking animation when bot starts speaking
+        if isinstance(frame, BotStartedSpeakingFrame):
+            if not self._is_talking:
+                await self.push_frame(self._talking_frame)
+                self._is_talking = True
+        # Return to static frame when bot stops speaking
+        elif isinstance(frame, BotStoppedSpeakingFrame):
+            await self.push_frame(self.quiet_frame)
+            self._is_talking = False
+
+        await self.push_frame(frame, direction)
+
+
+class AvatarAnimator(FrameProcessor):
+    """Animates the avatar while the bot talks, sending only changed frames."""
+
+    def __init__(
+        self,
+        quiet_frame: OutputImageRawFrame,
+        sprites: List[OutputImageRawFrame],
+        fps: int = AVATAR_FPS,
+    ):
+        """
+        Args:
+            quiet_frame (OutputImageRawFrame): Shown while the bot listens
+            sprites (List[OutputImageRawFrame]): Talking animation, in order
+            fps (int): Animation frame rate
+        """
+        super().__init__()
+        self.quiet_frame = quiet_frame
+        self._sprites = sprites
+        self._frame_duration = 1 / max(fps, 1)
+        self._last_image: Optional[Any] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, OutputImageRawFrame):
+            await self._show(frame)
+            return
+
+        if isinstance(frame, BotStartedSpeakingFrame):
+            if not self._task:
+                self._task = asyncio.create_task(self._animate())
+        elif isinstance(frame, BotStoppedSpeakingFrame):
+            await self._stop()
+            await self._show(self.quiet_frame)
+        elif isinstance(frame, (EndFrame, CancelFrame)):
+            await self._stop()
+
+        await self.push_frame(frame, direction)
+
+    async def cleanup(self):
+        await super().cleanup()
+        await self._stop()
+
+    async def _show(self, frame: OutputImageRawFrame):
+        # Sprites are shared objects, so identity spots unchanged pictures
+        if frame.image is self._last_image:
+            return
+        self._last_image = frame.image
+        await self.push_frame(frame)
+
+    async def _animate(self):
+        while True:
+            for sprite in self._sprites:
+                await self._show(sprite)
+                await asyncio.sleep(self._frame_duration)
+
+    async def _stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
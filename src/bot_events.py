@@ -0,0 +1,112 @@
+"""Line-delimited JSON events sent from bot processes back to the server.
+
+The server opens a pipe for each bot process it starts and passes the write end
+in the ``BOT_EVENTS_FD`` environment variable. Bots report through ``emit()``,
+which is a no-op when the bot was started without a pipe (e.g. by hand from the
+command line).
+
+Events are tagged with the id of the call they belong to. A bot host sets
+``current_call_id`` for each call it runs; a dedicated bot process gets its id
+from ``BOT_CALL_ID``.
+"""
+
+import asyncio
+import json
+import os
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+EVENTS_FD_ENV = "BOT_EVENTS_FD"
+CALL_ID_ENV = "BOT_CALL_ID"
+
+current_call_id: ContextVar[Optional[str]] = ContextVar("current_call_id", default=None)
+
+
+def emit(event: str, **fields: Any):
+    """Send an event to the server, if it's listening.
+
+    Args:
+        event (str): Event name
+        **fields: JSON-serializable event payload
+    """
+    fd = os.getenv(EVENTS_FD_ENV)
+    if not fd:
+        return
+    fields.setdefault("call_id", current_call_id.get() or os.getenv(CALL_ID_ENV))
+    line = json.dumps({"event": event, **fields}) + "\n"
+    try:
+        os.write(int(fd), line.encode())
+    except OSError:
+        # The server went away; events are best effort
+        pass
+
+
+class EventPipe:
+    """Server side of a bot's event pipe.
+
+    Create it before spawning the bot, pass ``write_fd`` through ``pass_fds``
+    and ``child_env()`` to the child, then call ``attach()`` from the event loop.
+    """
+
+    def __init__(self, on_event: Callable[[Dict[str, Any]], None]):
+        self._read_fd, self.write_fd = os.pipe()
+        os.set_blocking(self._read_fd, False)
+        self._on_event = on_event
+        self._buffer = b""
+        self._attached = False
+        self._closed = False
+
+    def child_env(self, call_id: Optional[str] = None) -> Dict[str, str]:
+        """Environment for the child process, including the pipe's fd.
+
+        Args:
+            call_id (Optional[str]): Call id for a process dedicated to one call
+        """
+        env = {**os.environ, EVENTS_FD_ENV: str(self.write_fd)}
+        if call_id:
+            env[CALL_ID_ENV] = call_id
+        return env
+
+    def attach(self):
+        """Drop the server's copy of the write end and start reading events."""
+        os.close(self.write_fd)
+        asyncio.get_running_loop().add_reader(self._read_fd, self._on_readable)
+        self._attached = True
+
+    def close(self):
+        """Stop reading and release the pipe.
+
+        Before ``attach()`` (e.g. when the child failed to start) this closes
+        both ends, and may be called from any thread.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._attached:
+            asyncio.get_running_loop().remove_reader(self._read_fd)
+        else:
+            os.close(self.write_fd)
+        os.close(self._read_fd)
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._read_fd, 65536)
+        except BlockingIOError:
+            return
+        if not data:
+            self.close()
+            return
+
+        self._buffer += data
+        *lines, self._buffer = self._buffer.split(b"\n")
+        for line in lines:
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                logger.warning(f"Ignoring malformed bot event: {line!r}")
+                continue
+            self._on_event(event)
@@ -20,133 +20,62 @@ import asyncio
 import os
 import sys
 from typing import List, Optional
-from openai.types.chat import ChatCompletionToolParam
-from datetime import datetime
 from dotenv import load_dotenv
-from src.helpers.datetime import serialize_datetime
-from src.models import Conversation
-from src.supabase_interface import SupabaseInterface
+from src.conversations import ConversationRecord
 from loguru import logger
-from PIL import Image
 from runner import configure
 import aiohttp
-from pipecat.audio.vad.silero import SileroVADAnalyzer
 from pipecat.audio.vad.vad_analyzer import VADParams
 from pipecat.frames.frames import (
-    BotStartedSpeakingFrame,
-    BotStoppedSpeakingFrame,
     EndFrame,
-    Frame,
-    OutputImageRawFrame,
-    SpriteFrame,
 )
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
 from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
-from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
 from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIProcessor
 from pipecat.services.gemini_multimodal_live.gemini import (
     GeminiMultimodalLiveLLMService,
 )
 from pipecat.transports.services.daily import DailyParams, DailyTransport
 
-from energy_vad_analyzer import EnergyBaseVADAnalyzer
+from bot_events import emit
+from avatar import camera_params, create_avatar
+from end_of_turn import BASELINE_STOP_SECS, END_OF_TURN, EndOfTurnController
+from transcript import TranscriptRecorder
+from sprites import load_sprite_frames
 from utils import read_file
-from webrtc_vad_analyzer import WebRTCVADAnalyzer
+from vad_engines import create_vad_analyzer, load_vad_analyzer
 
 load_dotenv(override=True)
 
 logger.remove(0)
 logger.add(sys.stderr, level="DEBUG")
 
-sprites = []
-script_dir = os.path.dirname(__file__)
-
-for i in range(1, 26):
-    # Build the full path to the image file
-    full_path = os.path.join(script_dir, f"assets/robot0{i}.png")
-    # Get the filename without the extension to use as the dictionary key
-    # Open the image and convert it to bytes
-    with Image.open(full_path) as img:
-        sprites.append(
-            OutputImageRawFrame(image=img.tobytes(), size=img.size, format=img.format)
-        )
-
-# Create a smooth animation by adding reversed frames
-flipped = sprites[::-1]
-sprites.extend(flipped)
-
-# Define static and animated states
-quiet_frame = sprites[0]  # Static frame for when bot is listening
-talking_frame = SpriteFrame(
-    images=sprites
-)  # Animation sequence for when bot is talking
+# Avatar video is off by default; the sprites are only loaded when it's on
+CAMERA_OUT_ENABLED = os.getenv("GEMINI_CAMERA_OUT", "false").lower() == "true"
 
-global_task = None
+# Avatar video size; sprites are pre-scaled to it
+CAMERA_OUT_SIZE = (1024, 576)
 
 
-class TalkingAnimation(FrameProcessor):
-    """Manages the bot's visual animation states.
+def preload():
+    """Import what calls will need, for workers started ahead of their call.
 
-    Switches between static (listening) and animated (talking) states based on
-    the bot's current speaking status.
+    The VAD engine selected by ``AMD_ENGINE`` (and the sprites, if camera
+    output is on) are otherwise loaded when the first call starts.
     """
+    load_vad_analyzer(os.getenv("AMD_ENGINE", ""))
+    if CAMERA_OUT_ENABLED:
+        load_sprite_frames(CAMERA_OUT_SIZE)
 
-    def __init__(self):
-        super().__init__()
-        self._is_talking = False
-
-    async def process_frame(self, frame: Frame, direction: FrameDirection):
-        """Process incoming frames and update animation state.
-
-        Args:
-            frame: The incoming frame to process
-            direction: The direction of frame flow in the pipeline
-        """
-        await super().process_frame(frame, direction)
-
-        # Switch to talking animation when bot starts speaking
-        if isinstance(frame, BotStartedSpeakingFrame):
-            if not self._is_talking:
-                await self.push_frame(talking_frame)
-                self._is_talking = True
-        # Return to static frame when bot stops speaking
-        elif isinstance(frame, BotStoppedSpeakingFrame):
-            await self.push_frame(quiet_frame)
-            self._is_talking = False
-
-        await self.push_frame(frame, direction)
-
-
-async def end_conversation():
-    global global_task
-    if global_task is None:
-        print(f"Task not found")
-        return
+
+async def end_conversation(task: PipelineTask):
     print(f"Ending conversation")
     # End the conversation after a delay
     await asyncio.sleep(3)
 
-    await global_task.queue_frame(EndFrame())
-
-
-async def update_transcript(room_url, context):
-    # Get conversation record for this room
-    conversations_db = SupabaseInterface[Conversation]("conversations")
-    conversations = await conversations_db.read_all({"room_url": room_url})
-    print(context.get_messages_for_persistent_storage())
-    if conversations:
-        conversation = conversations[0]
-        # Update conversation with transcript and status
-        await conversations_db.update(
-            conversation["id"],
-            {
-                "transcript": context.get_messages_for_persistent_storage(),
-                "status": "ended",
-                "updated_at": serialize_datetime(datetime.now()),
-            },
-        )
+    await task.queue_frame(EndFrame())
 
 
 def get_tool() -> List:
@@ -194,8 +123,18 @@ def get_tool() -> List:
     ]
 
 
-async def main():
-    """Main bot execution function.
+async def run_bot(
+    room_url: str,
+    token: str,
+    conversation_id: Optional[str] = None,
+    handle_sigint: bool = True,
+):
+    """Run one call in the given room.
+
+    All per-call state (pipeline task, database handle, VAD analyzer) is local
+    to this coroutine, so several calls can run concurrently in one process.
+    A host running many calls passes ``handle_sigint=False`` and handles
+    signals itself.
 
     Sets up and runs the bot pipeline including:
     - Daily video transport with specific audio parameters
@@ -204,202 +143,189 @@ async def main():
     - Animation processing
     - RTVI event handling
     """
-    vad_engine = os.getenv("AMD_ENGINE", "")
-    if vad_engine == "SileroVADAnalyzer":
-        vad_analyzer = SileroVADAnalyzer(
-            params=VADParams(
-                stop_secs=0.5,
-            ),
-        )
-
-    elif vad_engine == "WebRTCVADAnalyzer":
-        vad_analyzer = WebRTCVADAnalyzer(
-            params=VADParams(
-                stop_secs=0.5,
-            ),
-        )
-    else:
-        vad_analyzer = EnergyBaseVADAnalyzer(
-            params=VADParams(
-                stop_secs=0.5,
-            ),
-        )
+    # Only the selected engine's dependencies are imported
+    vad_params = VADParams(
+        stop_secs=BASELINE_STOP_SECS,
+    )
+    vad_analyzer = create_vad_analyzer(os.getenv("AMD_ENGINE", ""), vad_params)
+    # Tunes stop_secs to the caller's pauses as the call goes on
+    end_of_turn = (
+        EndOfTurnController(vad_analyzer, vad_params)
+        if END_OF_TURN == "adaptive"
+        else None
+    )
     print(f"Using VAD Analyzer: {vad_analyzer}")
 
-    async with aiohttp.ClientSession() as session:
-        (room_url, token, conv_id) = await configure(session)
-
-        # Set up Daily transport with specific audio/video parameters for Gemini
-        transport = DailyTransport(
-            room_url,
-            token,
-            "Chatbot",
-            DailyParams(
-                audio_in_sample_rate=16000,
-                audio_out_sample_rate=24000,
-                audio_out_enabled=True,
-                camera_out_enabled=False,
-                # Disable camera output for performance issue
-                # camera_out_enabled=True,
-                # camera_out_width=1024,
-                # camera_out_height=576,
-                vad_enabled=True,
-                vad_audio_passthrough=True,
-                vad_analyzer=vad_analyzer,
-            ),
+    conversation = ConversationRecord(conversation_id, room_url)
+
+    # Set up Daily transport with specific audio/video parameters for Gemini
+    transport = DailyTransport(
+        room_url,
+        token,
+        "Chatbot",
+        DailyParams(
+            audio_in_sample_rate=16000,
+            audio_out_sample_rate=24000,
+            audio_out_enabled=True,
+            **(camera_params(*CAMERA_OUT_SIZE) if CAMERA_OUT_ENABLED else {}),
+            vad_enabled=True,
+            vad_audio_passthrough=True,
+            vad_analyzer=vad_analyzer,
+        ),
+    )
+
+    system_prompt = read_file(filename="src/prompts/system.txt")
+
+    # Initialize the Gemini Multimodal Live model
+    llm = GeminiMultimodalLiveLLMService(
+        api_key=os.getenv("GEMINI_API_KEY"),
+        voice_id="Puck",  # Aoede, Charon, Fenrir, Kore, Puck
+        transcribe_user_audio=True,
+        transcribe_model_audio=True,
+        # model="gemini-1.5-flash-latest",
+        system_instruction=system_prompt,
+        tools=get_tool(),
+    )
+
+    # Optional start callback - called when function execution begins
+    async def record_user_contact(function_name, llm, context):
+        print(f"[{function_name}] Function execution callback started {context}")
+
+    # Main function handler - called to execute the function
+    async def record_user_contact_api(
+        function_name, tool_call_id, args, llm, context, result_callback
+    ):
+        print(
+            f"[{function_name}] Function execution started {context} {tool_call_id} {args} {llm}"
         )
 
-        system_prompt = read_file(filename="src/prompts/system.txt")
-
-        # Initialize the Gemini Multimodal Live model
-        llm = GeminiMultimodalLiveLLMService(
-            api_key=os.getenv("GEMINI_API_KEY"),
-            voice_id="Puck",  # Aoede, Charon, Fenrir, Kore, Puck
-            transcribe_user_audio=True,
-            transcribe_model_audio=True,
-            # model="gemini-1.5-flash-latest",
-            system_instruction=system_prompt,
-            tools=get_tool(),
+        try:
+            # Update conversation with contact info in JSONB column
+            updated = await conversation.update(
+                {
+                    "contact": {  # Store contact info in JSONB column
+                        "email": args.get("email"),
+                        "phone_number": args.get("phone_number"),
+                        "notes": args.get("notes"),
+                    },
+                }
+            )
+            if updated:
+                await result_callback(f"Contact information recorded successfully")
+            else:
+                await result_callback(f"No active conversation found for this room")
+        except Exception as e:
+            print(f"Error recording contact: {str(e)}")
+            await result_callback(f"Error recording contact information: {str(e)}")
+
+    # Register the function
+    llm.register_function(
+        "record_user_contact",
+        record_user_contact_api,
+        start_callback=record_user_contact,
+    )
+
+    async def end_conversation_api(
+        function_name, tool_call_id, args, llm, context, result_callback
+    ):
+        print(
+            f"[{function_name}] Function execution started {context} {tool_call_id} {args} {llm}"
         )
+        await transcript.finish()
+        await end_conversation(task)
+        await result_callback(f"Conversation ended: {args}")
 
-        # Optional start callback - called when function execution begins
-        async def record_user_contact(function_name, llm, context):
-            print(f"[{function_name}] Function execution callback started {context}")
+    llm.register_function(
+        "end_conversation",
+        end_conversation_api,
+    )
 
-        # Main function handler - called to execute the function
-        async def record_user_contact_api(
-            function_name, tool_call_id, args, llm, context, result_callback
-        ):
-            print(
-                f"[{function_name}] Function execution started {context} {tool_call_id} {args} {llm}"
-            )
+    greeting_prompt = read_file(filename="src/prompts/greeting.txt")
 
-            try:
-                if room_url:
-                    # Initialize Supabase interface
-                    conversations_db = SupabaseInterface[Conversation]("conversations")
-
-                    # Find the conversation by room_url
-                    conversations = await conversations_db.read_all(
-                        {"room_url": room_url}
-                    )
-                    if conversations:
-                        conversation = conversations[0]
-
-                        # Update conversation with contact info in JSONB column
-                        update_data = {
-                            "updated_at": serialize_datetime(datetime.now()),
-                            "contact": {  # Store contact info in JSONB column
-                                "email": args.get("email"),
-                                "phone_number": args.get("phone_number"),
-                                "notes": args.get("notes"),
-                            },
-                        }
-
-                        await conversations_db.update(conversation["id"], update_data)
-                        await result_callback(
-                            f"Contact information recorded successfully"
-                        )
-                    else:
-                        await result_callback(
-                            f"No active conversation found for this room"
-                        )
-                else:
-                    await result_callback(f"Could not determine room URL")
-            except Exception as e:
-                print(f"Error recording contact: {str(e)}")
-                await result_callback(f"Error recording contact information: {str(e)}")
-
-        # Register the function
-        llm.register_function(
-            "record_user_contact",
-            record_user_contact_api,
-            start_callback=record_user_contact,
-        )
+    messages = [
+        {
+            "role": "user",
+            "content": greeting_prompt,
+        },
+    ]
 
-        async def end_conversation_api(
-            function_name, tool_call_id, args, llm, context, result_callback
-        ):
-            print(
-                f"[{function_name}] Function execution started {context} {tool_call_id} {args} {llm}"
-            )
-            await update_transcript(room_url, context)
-            await end_conversation()
-            await result_callback(f"Conversation ended: {args}")
+    # Set up conversation context and management
+    # The context_aggregator will automatically collect conversation context
+    context = OpenAILLMContext(
+        messages=messages,
+        tools=get_tool(),
+    )
+    context_aggregator = llm.create_context_aggregator(context)
+    # Writes each message of the transcript as the conversation goes
+    transcript = TranscriptRecorder(conversation, context)
+
+    ta = create_avatar(CAMERA_OUT_SIZE) if CAMERA_OUT_ENABLED else None
+
+    #
+    # RTVI events for Pipecat client UI
+    #
+    rtvi = RTVIProcessor(config=RTVIConfig(config=[]))
+
+    pipeline = Pipeline(
+        [
+            transport.input(),
+            *([end_of_turn] if end_of_turn else []),
+            rtvi,
+            context_aggregator.user(),
+            llm,
+            *([ta] if ta else []),
+            transport.output(),
+            context_aggregator.assistant(),
+            transcript,
+        ]
+    )
 
-        llm.register_function(
-            "end_conversation",
-            end_conversation_api,
-        )
+    task = PipelineTask(
+        pipeline,
+        PipelineParams(
+            allow_interruptions=True,
+            enable_metrics=True,
+            enable_usage_metrics=True,
+            observers=[rtvi.observer()],
+        ),
+    )
+    if ta:
+        await task.queue_frame(ta.quiet_frame)
 
-        greeting_prompt = read_file(filename="src/prompts/greeting.txt")
+    @rtvi.event_handler("on_client_ready")
+    async def on_client_ready(rtvi):
+        await rtvi.set_bot_ready()
 
-        messages = [
-            {
-                "role": "user",
-                "content": greeting_prompt,
-            },
-        ]
+    @transport.event_handler("on_joined")
+    async def on_joined(transport, data):
+        # Lets the server measure spawn-to-join time
+        emit("joined")
 
-        # Set up conversation context and management
-        # The context_aggregator will automatically collect conversation context
-        context = OpenAILLMContext(
-            messages=messages,
-            tools=get_tool(),
-        )
-        context_aggregator = llm.create_context_aggregator(context)
-
-        # ta = TalkingAnimation()
-
-        #
-        # RTVI events for Pipecat client UI
-        #
-        rtvi = RTVIProcessor(config=RTVIConfig(config=[]))
-
-        pipeline = Pipeline(
-            [
-                transport.input(),
-                rtvi,
-                context_aggregator.user(),
-                llm,
-                # ta,
-                transport.output(),
-                context_aggregator.assistant(),
-            ]
-        )
+    @transport.event_handler("on_first_participant_joined")
+    async def on_first_participant_joined(transport, participant):
+        await transport.capture_participant_transcription(participant["id"])
+        await task.queue_frames([context_aggregator.user().get_context_frame()])
 
-        task = PipelineTask(
-            pipeline,
-            PipelineParams(
-                allow_interruptions=True,
-                enable_metrics=True,
-                enable_usage_metrics=True,
-                observers=[rtvi.observer()],
-            ),
-        )
-        await task.queue_frame(quiet_frame)
+    @transport.event_handler("on_participant_left")
+    async def on_participant_left(transport, participant, reason):
+        print(f"Participant left: {participant}")
+        await transcript.finish()
+        await task.queue_frame(EndFrame())
 
-        global global_task
-        global_task = task
+    runner = PipelineRunner(handle_sigint=handle_sigint)
 
-        @rtvi.event_handler("on_client_ready")
-        async def on_client_ready(rtvi):
-            await rtvi.set_bot_ready()
+    await runner.run(task)
 
-        @transport.event_handler("on_first_participant_joined")
-        async def on_first_participant_joined(transport, participant):
-            await transport.capture_participant_transcription(participant["id"])
-            await task.queue_frames([context_aggregator.user().get_context_frame()])
 
-        @transport.event_handler("on_participant_left")
-        async def on_participant_left(transport, participant, reason):
-            print(f"Participant left: {participant}")
-            await update_transcript(room_url, context)
-            await task.queue_frame(EndFrame())
+async def main():
+    """Main bot execution function.
 
-        runner = PipelineRunner()
+    Resolves the room from the command line or environment and runs the call.
+    """
+    async with aiohttp.ClientSession() as session:
+        (room_url, token, conv_id) = await configure(session)
 
-        await runner.run(task)
+    await run_bot(room_url, token, conv_id)
 
 
 if __name__ == "__main__":
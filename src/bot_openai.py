@@ -20,31 +20,26 @@ the conversation flow.
 import asyncio
 import os
 import sys
-from datetime import datetime
+from typing import Optional
 
 import aiohttp
 from dotenv import load_dotenv
 from loguru import logger
-from PIL import Image
+from bot_events import emit
 from runner import configure
-from src.models import Conversation
-from src.supabase_interface import SupabaseInterface
-from src.helpers.datetime import serialize_datetime
+from avatar import camera_params, create_avatar
+from sprites import load_sprite_frames
+from transcript import TranscriptRecorder
+from vad_engines import create_vad_analyzer, load_vad_analyzer
+from src.conversations import ConversationRecord
 
-from pipecat.audio.vad.silero import SileroVADAnalyzer
 from pipecat.frames.frames import (
-    BotStartedSpeakingFrame,
-    BotStoppedSpeakingFrame,
     EndFrame,
-    Frame,
-    OutputImageRawFrame,
-    SpriteFrame,
 )
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
 from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
-from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
 from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIProcessor
 from pipecat.services.elevenlabs import ElevenLabsTTSService
 from pipecat.services.openai import OpenAILLMService
@@ -54,62 +49,34 @@ load_dotenv(override=True)
 logger.remove(0)
 logger.add(sys.stderr, level="DEBUG")
 
-sprites = []
-script_dir = os.path.dirname(__file__)
+# Voice activity detection engine, see vad_engines.py
+VAD_ENGINE = "SileroVADAnalyzer"
 
-# Load sequential animation frames
-for i in range(1, 26):
-    # Build the full path to the image file
-    full_path = os.path.join(script_dir, f"assets/robot0{i}.png")
-    # Get the filename without the extension to use as the dictionary key
-    # Open the image and convert it to bytes
-    with Image.open(full_path) as img:
-        sprites.append(OutputImageRawFrame(image=img.tobytes(), size=img.size, format=img.format))
+# Avatar video size; sprites are pre-scaled to it
+CAMERA_OUT_SIZE = (1024, 576)
 
-# Create a smooth animation by adding reversed frames
-flipped = sprites[::-1]
-sprites.extend(flipped)
 
-# Define static and animated states
-quiet_frame = sprites[0]  # Static frame for when bot is listening
-talking_frame = SpriteFrame(images=sprites)  # Animation sequence for when bot is talking
+def preload():
+    """Import what calls will need, for workers started ahead of their call.
 
-
-class TalkingAnimation(FrameProcessor):
-    """Manages the bot's visual animation states.
-
-    Switches between static (listening) and animated (talking) states based on
-    the bot's current speaking status.
+    The VAD engine and the sprites are otherwise loaded when the first call
+    starts.
     """
+    load_vad_analyzer(VAD_ENGINE)
+    load_sprite_frames(CAMERA_OUT_SIZE)
 
-    def __init__(self):
-        super().__init__()
-        self._is_talking = False
-
-    async def process_frame(self, frame: Frame, direction: FrameDirection):
-        """Process incoming frames and update animation state.
-
-        Args:
-            frame: The incoming frame to process
-            direction: The direction of frame flow in the pipeline
-        """
-        await super().process_frame(frame, direction)
 
-        # Switch to talking animation when bot starts speaking
-        if isinstance(frame, BotStartedSpeakingFrame):
-            if not self._is_talking:
-                await self.push_frame(talking_frame)
-                self._is_talking = True
-        # Return to static frame when bot stops speaking
-        elif isinstance(frame, BotStoppedSpeakingFrame):
-            await self.push_frame(quiet_frame)
-            self._is_talking = False
+async def run_bot(
+    room_url: str,
+    token: str,
+    conversation_id: Optional[str] = None,
+    handle_sigint: bool = True,
+):
+    """Run one call in the given room.
 
-        await self.push_frame(frame, direction)
-
-
-async def main():
-    """Main bot execution function.
+    All per-call state is local to this coroutine, so several calls can run
+    concurrently in one process. A host running many calls passes
+    ``handle_sigint=False`` and handles signals itself.
 
     Sets up and runs the bot pipeline including:
     - Daily video transport
@@ -118,128 +85,135 @@ async def main():
     - Animation processing
     - RTVI event handling
     """
-    async with aiohttp.ClientSession() as session:
-        (room_url, token) = await configure(session)
-
-        # Set up Daily transport with video/audio parameters
-        transport = DailyTransport(
-            room_url,
-            token,
-            "Chatbot",
-            DailyParams(
-                audio_out_enabled=True,
-                camera_out_enabled=True,
-                camera_out_width=1024,
-                camera_out_height=576,
-                vad_enabled=True,
-                vad_analyzer=SileroVADAnalyzer(),
-                transcription_enabled=True,
-                #
-                # Spanish
-                #
-                # transcription_settings=DailyTranscriptionSettings(
-                #     language="es",
-                #     tier="nova",
-                #     model="2-general"
-                # )
-            ),
-        )
-
-        # Initialize text-to-speech service
-        tts = ElevenLabsTTSService(
-            api_key=os.getenv("ELEVENLABS_API_KEY"),
+    conversation = ConversationRecord(conversation_id, room_url)
+
+    # Set up Daily transport with video/audio parameters
+    transport = DailyTransport(
+        room_url,
+        token,
+        "Chatbot",
+        DailyParams(
+            audio_out_enabled=True,
+            **camera_params(*CAMERA_OUT_SIZE),
+            vad_enabled=True,
+            vad_analyzer=create_vad_analyzer(VAD_ENGINE),
+            transcription_enabled=True,
+            #
+            # Spanish
+            #
+            # transcription_settings=DailyTranscriptionSettings(
+            #     language="es",
+            #     tier="nova",
+            #     model="2-general"
+            # )
+        ),
+    )
+
+    # Initialize text-to-speech service
+    tts = ElevenLabsTTSService(
+        api_key=os.getenv("ELEVENLABS_API_KEY"),
+        #
+        # English
+        #
+        voice_id="pNInz6obpgDQGcFmaJgB",
+        #
+        # Spanish
+        #
+        # model="eleven_multilingual_v2",
+        # voice_id="gD1IexrzCvsXPHUuT0s3",
+    )
+
+    # Initialize LLM service
+    llm = OpenAILLMService(api_key=os.getenv("OPENAI_API_KEY"), model="gpt-4o")
+
+    messages = [
+        {
+            "role": "system",
             #
             # English
             #
-            voice_id="pNInz6obpgDQGcFmaJgB",
+            "content": "You are Chatbot, a friendly, helpful robot. Your goal is to demonstrate your capabilities in a succinct way. Your output will be converted to audio so don't include special characters in your answers. Respond to what the user said in a creative and helpful way, but keep your responses brief. Start by introducing yourself.",
             #
             # Spanish
             #
-            # model="eleven_multilingual_v2",
-            # voice_id="gD1IexrzCvsXPHUuT0s3",
-        )
-
-        # Initialize LLM service
-        llm = OpenAILLMService(api_key=os.getenv("OPENAI_API_KEY"), model="gpt-4o")
-
-        messages = [
-            {
-                "role": "system",
-                #
-                # English
-                #
-                "content": "You are Chatbot, a friendly, helpful robot. Your goal is to demonstrate your capabilities in a succinct way. Your output will be converted to audio so don't include special characters in your answers. Respond to what the user said in a creative and helpful way, but keep your responses brief. Start by introducing yourself.",
-                #
-                # Spanish
-                #
-                # "content": "Eres Chatbot, un amigable y útil robot. Tu objetivo es demostrar tus capacidades de una manera breve. Tus respuestas se convertiran a audio así que nunca no debes incluir caracteres especiales. Contesta a lo que el usuario pregunte de una manera creativa, útil y breve. Empieza por presentarte a ti mismo.",
-            },
+            # "content": "Eres Chatbot, un amigable y útil robot. Tu objetivo es demostrar tus capacidades de una manera breve. Tus respuestas se convertiran a audio así que nunca no debes incluir caracteres especiales. Contesta a lo que el usuario pregunte de una manera creativa, útil y breve. Empieza por presentarte a ti mismo.",
+        },
+    ]
+
+    # Set up conversation context and management
+    # The context_aggregator will automatically collect conversation context
+    context = OpenAILLMContext(messages)
+    context_aggregator = llm.create_context_aggregator(context)
+    # Writes each message of the transcript as the conversation goes
+    transcript = TranscriptRecorder(conversation, context)
+
+    # Avatar frames come from the shared sprite atlas
+    ta = create_avatar(CAMERA_OUT_SIZE)
+
+    #
+    # RTVI events for Pipecat client UI
+    #
+    rtvi = RTVIProcessor(config=RTVIConfig(config=[]))
+
+    pipeline = Pipeline(
+        [
+            transport.input(),
+            rtvi,
+            context_aggregator.user(),
+            llm,
+            tts,
+            ta,
+            transport.output(),
+            context_aggregator.assistant(),
+            transcript,
         ]
+    )
 
-        # Set up conversation context and management
-        # The context_aggregator will automatically collect conversation context
-        context = OpenAILLMContext(messages)
-        context_aggregator = llm.create_context_aggregator(context)
+    task = PipelineTask(
+        pipeline,
+        PipelineParams(
+            allow_interruptions=True,
+            enable_metrics=True,
+            enable_usage_metrics=True,
+            observers=[rtvi.observer()],
+        ),
+    )
+    await task.queue_frame(ta.quiet_frame)
 
-        ta = TalkingAnimation()
+    @rtvi.event_handler("on_client_ready")
+    async def on_client_ready(rtvi):
+        await rtvi.set_bot_ready()
 
-        #
-        # RTVI events for Pipecat client UI
-        #
-        rtvi = RTVIProcessor(config=RTVIConfig(config=[]))
-
-        pipeline = Pipeline(
-            [
-                transport.input(),
-                rtvi,
-                context_aggregator.user(),
-                llm,
-                tts,
-                ta,
-                transport.output(),
-                context_aggregator.assistant(),
-            ]
-        )
-
-        task = PipelineTask(
-            pipeline,
-            PipelineParams(
-                allow_interruptions=True,
-                enable_metrics=True,
-                enable_usage_metrics=True,
-                observers=[rtvi.observer()],
-            ),
-        )
-        await task.queue_frame(quiet_frame)
-
-        @rtvi.event_handler("on_client_ready")
-        async def on_client_ready(rtvi):
-            await rtvi.set_bot_ready()
-
-        @transport.event_handler("on_first_participant_joined")
-        async def on_first_participant_joined(transport, participant):
-            await transport.capture_participant_transcription(participant["id"])
-            await task.queue_frames([context_aggregator.user().get_context_frame()])
-
-        @transport.event_handler("on_participant_left")
-        async def on_participant_left(transport, participant, reason):
-            print(f"Participant left: {participant}")
-            # Get conversation record for this room
-            conversations_db = SupabaseInterface[Conversation]("conversations")
-            conversations = await conversations_db.read_all({"room_url": room_url})
-            if conversations:
-                conversation = conversations[0]
-                # Update conversation with transcript and status
-                await conversations_db.update(conversation["id"], {
-                    "transcript": context.get_messages_for_persistent_storage(),
-                    "status": "ended",
-                    "updated_at": serialize_datetime(datetime.now())
-                })
-            await task.queue_frame(EndFrame())
-
-        runner = PipelineRunner()
-
-        await runner.run(task)
+    @transport.event_handler("on_joined")
+    async def on_joined(transport, data):
+        # Lets the server measure spawn-to-join time
+        emit("joined")
+
+    @transport.event_handler("on_first_participant_joined")
+    async def on_first_participant_joined(transport, participant):
+        await transport.capture_participant_transcription(participant["id"])
+        await task.queue_frames([context_aggregator.user().get_context_frame()])
+
+    @transport.event_handler("on_participant_left")
+    async def on_participant_left(transport, participant, reason):
+        print(f"Participant left: {participant}")
+        await transcript.finish()
+        await task.queue_frame(EndFrame())
+
+    runner = PipelineRunner(handle_sigint=handle_sigint)
+
+    await runner.run(task)
+
+
+async def main():
+    """Main bot execution function.
+
+    Resolves the room from the command line or environment and runs the call.
+    """
+    async with aiohttp.ClientSession() as session:
+        (room_url, token, conv_id) = await configure(session)
+
+    await run_bot(room_url, token, conv_id)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,374 @@
+"""Warm pool of pre-imported bot workers.
+
+Spawning ``python src/bot_<impl>.py`` for every call makes each caller wait for
+a fresh interpreter to import pipecat, Daily and the LLM services and to decode
+the avatar sprites before the bot can join the room. The pool keeps a few
+``src/bot_worker.py`` processes that have already done that work and are
+blocked on their control pipe. A call hands one of them its assignment and a
+replacement is spawned in the background.
+
+With ``capacity > 1`` the pool runs bot hosts instead: each worker serves up to
+``capacity`` calls on a single event loop, and calls are placed on the least
+loaded host.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
+
+from loguru import logger
+
+from src.bot_events import EventPipe
+from src.utils import ROOT_DIR
+
+WORKER_FILE = "src/bot_worker.py"
+
+
+def get_bot_file():
+    bot_implementation = os.getenv("BOT_IMPLEMENTATION", "openai").lower().strip()
+    # If blank or None, default to openai
+    if not bot_implementation:
+        bot_implementation = "openai"
+    if bot_implementation not in ["openai", "gemini"]:
+        raise ValueError(
+            f"Invalid BOT_IMPLEMENTATION: {bot_implementation}. Must be 'openai' or 'gemini'"
+        )
+    return f"src/bot_{bot_implementation}".replace("-", "_") + ".py"
+
+
+class BotHost:
+    """A worker process serving several calls at once."""
+
+    def __init__(
+        self,
+        proc: subprocess.Popen,
+        events: EventPipe,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.proc = proc
+        self.events = events
+        self.calls: Dict[str, "HostedBot"] = {}
+        self._on_event = on_event
+
+    def send(self, message: Dict[str, Any]) -> bool:
+        """Write a control message to the host. Returns False if it's gone."""
+        try:
+            self.proc.stdin.write(json.dumps(message) + "\n")
+            self.proc.stdin.flush()
+            return True
+        except (BrokenPipeError, OSError, ValueError):
+            return False
+
+    def on_event(self, event: Dict[str, Any]):
+        if event.get("event") == "finished":
+            call = self.calls.pop(event["call_id"], None)
+            if call:
+                call.returncode = event.get("exit_code", 0)
+        if self._on_event:
+            self._on_event(event)
+
+
+class HostedBot:
+    """Handle for a call running inside a ``BotHost``.
+
+    Mirrors the parts of ``subprocess.Popen`` the server relies on (``pid``,
+    ``poll()``, ``terminate()`` and ``kill()``), so hosted calls and dedicated
+    bot processes are tracked the same way. ``pid`` is the host's. The call's
+    end is reported by the host's ``finished`` event, delivered on the event
+    loop, so there is no blocking ``wait()``.
+    """
+
+    def __init__(self, host: BotHost, call_id: str):
+        self.host = host
+        self.call_id = call_id
+        self.pid = host.proc.pid
+        self.returncode: Optional[int] = None
+
+    def poll(self) -> Optional[int]:
+        if self.returncode is None and self.host.proc.poll() is not None:
+            self.returncode = self.host.proc.returncode
+        return self.returncode
+
+    def terminate(self):
+        if self.poll() is None:
+            self.host.send({"op": "stop", "call_id": self.call_id})
+
+    def kill(self):
+        """Stop the call now, killing its host if the call is still running.
+
+        A call that ignores ``terminate()`` may be stalling the host's event
+        loop, so the host is killed along with every other call on it.
+        """
+        if self.poll() is None:
+            logger.warning(
+                f"Killing bot host {self.pid}, call {self.call_id} didn't stop"
+            )
+            self.host.proc.kill()
+
+
+BotHandle = Union[subprocess.Popen, HostedBot]
+
+
+class BotWorkerPool:
+    """Keeps bot workers ready and assigns calls to them.
+
+    With ``size=0`` (or when no worker has room) calls fall back to a cold
+    ``subprocess.Popen`` of the bot file, so the pool never refuses work.
+    """
+
+    def __init__(
+        self,
+        bot_file: str,
+        size: int = 0,
+        capacity: int = 1,
+        python: Path = Path(sys.executable),
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        """
+        Args:
+            bot_file (str): Bot script relative to the repository root
+            size (int): Number of idle workers to keep warm; with hosts, free
+                call slots are kept at ``size * capacity``
+            capacity (int): Calls per worker; above 1 workers run as hosts
+            python (Path): Interpreter used for workers and cold spawns
+            on_event (Optional[Callable[[Dict[str, Any]], None]]): Called with
+                every event a bot reports, such as ``joined`` or (for hosted
+                calls) ``finished``
+        """
+        self.bot_file = bot_file
+        self.size = max(size, 0)
+        self.capacity = max(capacity, 1)
+        self.python = python
+        self.on_event = on_event
+        self._idle: Deque[subprocess.Popen] = deque()
+        self._hosts: List[BotHost] = []
+        self._refill_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def hosted(self) -> bool:
+        return self.capacity > 1
+
+    @property
+    def idle(self) -> int:
+        """Number of calls that can start on a warm worker right now."""
+        if self.hosted:
+            return sum(
+                self.capacity - len(host.calls)
+                for host in self._hosts
+                if host.proc.poll() is None
+            )
+        return len(self._idle)
+
+    def start(self):
+        """Fill the pool in the background. Must be called from the event loop."""
+        self._schedule_refill()
+
+    async def launch(
+        self,
+        call_id: str,
+        room_url: str,
+        token: str,
+        conversation_id: Optional[str] = None,
+    ) -> BotHandle:
+        """Start a bot for the given room.
+
+        Args:
+            call_id (str): Unique id for this call
+            room_url (str): Daily room the bot joins
+            token (str): Meeting token for the room
+            conversation_id (Optional[str]): Conversation record for this call
+
+        Returns:
+            BotHandle: The process (or hosted call) now running the bot
+        """
+        assignment = {
+            "call_id": call_id,
+            "room_url": room_url,
+            "token": token,
+            "conversation_id": conversation_id,
+        }
+        try:
+            if self.hosted:
+                handle = self._launch_hosted(assignment)
+            else:
+                handle = self._launch_idle(assignment)
+            if handle:
+                return handle
+            return await self._spawn_cold(call_id, room_url, token, conversation_id)
+        finally:
+            self._schedule_refill()
+
+    def close(self, timeout: float = 5.0):
+        """Stop refilling and shut down every worker the pool owns.
+
+        Workers are signalled together; any still alive after ``timeout``
+        seconds are killed.
+
+        Args:
+            timeout (float): Seconds between SIGTERM and SIGKILL
+        """
+        self._closed = True
+        if self._refill_task:
+            self._refill_task.cancel()
+        procs = list(self._idle) + [host.proc for host in self._hosts]
+        self._idle.clear()
+        for proc in procs:
+            # EOF on the control pipe tells a worker to exit cleanly
+            proc.stdin.close()
+            proc.terminate()
+
+        deadline = time.monotonic() + timeout
+        for proc in procs:
+            try:
+                proc.wait(max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                logger.warning(f"Killing bot worker {proc.pid}")
+                proc.kill()
+                proc.wait()
+        for host in self._hosts:
+            host.events.close()
+        self._hosts.clear()
+
+    def _launch_idle(self, assignment: Dict[str, Any]) -> Optional[subprocess.Popen]:
+        while self._idle:
+            worker = self._idle.popleft()
+            if worker.poll() is not None:
+                continue
+            try:
+                worker.stdin.write(json.dumps(assignment) + "\n")
+                worker.stdin.close()
+            except (BrokenPipeError, OSError):
+                worker.kill()
+                worker.wait()
+                continue
+            return worker
+        return None
+
+    def _launch_hosted(self, assignment: Dict[str, Any]) -> Optional[HostedBot]:
+        available = [
+            host
+            for host in self._hosts
+            if host.proc.poll() is None and len(host.calls) < self.capacity
+        ]
+        for host in sorted(available, key=lambda host: len(host.calls)):
+            call = HostedBot(host, assignment["call_id"])
+            host.calls[call.call_id] = call
+            if host.send(assignment):
+                return call
+            del host.calls[call.call_id]
+        return None
+
+    def _dispatch(self, event: Dict[str, Any]):
+        if self.on_event:
+            self.on_event(event)
+
+    async def _spawn(
+        self, args: List[str], events: EventPipe, call_id: Optional[str] = None, **kwargs
+    ) -> subprocess.Popen:
+        """Start a bot process with its event pipe.
+
+        Forking a large server process takes milliseconds, so ``Popen`` runs
+        in a thread. The pipe is released if the process fails to start.
+        """
+        started = asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(
+                subprocess.Popen,
+                args,
+                shell=False,
+                cwd=ROOT_DIR,
+                env=events.child_env(call_id),
+                pass_fds=(events.write_fd,),
+                **kwargs,
+            ),
+        )
+        try:
+            proc = await asyncio.shield(started)
+        except asyncio.CancelledError:
+            # The pool is closing; the fork still finishes in its thread
+            started.add_done_callback(lambda _: self._discard(started, events))
+            raise
+        except BaseException:
+            events.close()
+            raise
+        events.attach()
+        return proc
+
+    @staticmethod
+    def _discard(started: "asyncio.Future[subprocess.Popen]", events: EventPipe):
+        """Stop a process whose spawn was cancelled, and release its pipe."""
+        events.close()
+        if started.cancelled() or started.exception():
+            return
+        proc = started.result()
+        proc.kill()
+        proc.wait()
+
+    async def _spawn_worker(self) -> subprocess.Popen:
+        return await self._spawn(
+            [str(self.python), WORKER_FILE, self.bot_file],
+            EventPipe(self._dispatch),
+            stdin=subprocess.PIPE,
+            text=True,
+        )
+
+    async def _spawn_host(self) -> BotHost:
+        host: Optional[BotHost] = None
+        events = EventPipe(lambda event: host.on_event(event))
+        proc = await self._spawn(
+            [
+                str(self.python),
+                WORKER_FILE,
+                self.bot_file,
+                "--capacity",
+                str(self.capacity),
+            ],
+            events,
+            stdin=subprocess.PIPE,
+            text=True,
+        )
+        host = BotHost(proc, events, self.on_event)
+        return host
+
+    async def _spawn_cold(
+        self, call_id: str, room_url: str, token: str, conversation_id: Optional[str]
+    ) -> subprocess.Popen:
+        args = [str(self.python), self.bot_file, "-u", room_url, "-t", token]
+        if conversation_id:
+            args += ["-i", conversation_id]
+        return await self._spawn(args, EventPipe(self._dispatch), call_id, bufsize=1)
+
+    def _schedule_refill(self):
+        if self._closed or self.size == 0:
+            return
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self):
+        if self.hosted:
+            for host in [h for h in self._hosts if h.proc.poll() is not None]:
+                logger.warning(f"Bot host {host.proc.pid} exited, replacing it")
+                self._hosts.remove(host)
+                host.events.close()
+
+        while not self._closed:
+            # Hosts are added when their free slots run low, not per host
+            spare = self.idle
+            if spare >= (self.size * self.capacity if self.hosted else self.size):
+                return
+            try:
+                if self.hosted:
+                    self._hosts.append(await self._spawn_host())
+                else:
+                    self._idle.append(await self._spawn_worker())
+            except OSError as e:
+                logger.error(f"Failed to spawn bot worker: {e}")
+                return
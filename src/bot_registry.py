@@ -0,0 +1,345 @@
+"""Registry of the bots started by this server.
+
+Running bots are indexed by (node, pid), room URL and conversation id, so
+checks like ``MAX_BOTS_PER_ROOM`` only look at live calls. Pids are only
+unique per node, so bots on worker nodes never share an index entry with
+local processes, and they are addressed by call id across nodes. Exited children are reaped as
+soon as they exit, through a pidfd per process where the kernel supports it
+and a SIGCHLD handler otherwise. Finished calls keep their exit code and
+duration in a bounded LRU for ``/status/{pid}``. On shutdown ``drain()`` lets
+calls finish up to a deadline and then stops the rest together.
+"""
+
+import asyncio
+import os
+import signal
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from src.bot_pool import BotHandle
+from src.state_store import StateStore
+
+
+@dataclass
+class BotEntry:
+    """A call and the bot running it."""
+
+    call_id: str
+    handle: BotHandle
+    room_url: str
+    conversation_id: Optional[str] = None
+    node: str = "local"
+    started_at: float = field(default_factory=time.monotonic)
+    joined_at: Optional[float] = None
+    ended_at: Optional[float] = None
+    exit_code: Optional[int] = None
+
+    @property
+    def pid(self) -> int:
+        return self.handle.pid
+
+    @property
+    def running(self) -> bool:
+        return self.ended_at is None
+
+    @property
+    def duration(self) -> float:
+        """Seconds the call has been (or was) running."""
+        return (self.ended_at or time.monotonic()) - self.started_at
+
+
+class BotRegistry:
+    """Tracks running bots and a bounded history of finished ones."""
+
+    # How often drain() checks whether calls have finished
+    DRAIN_POLL_SECS = 0.1
+
+    def __init__(self, history_size: int = 1000, store: Optional[StateStore] = None):
+        """
+        Args:
+            history_size (int): Number of finished calls kept for status lookups
+            store (Optional[StateStore]): Shared state the registry records
+                bots in, so other API workers can see them
+        """
+        self.history_size = history_size
+        self.store = store
+        self._running: Dict[str, BotEntry] = {}
+        self._finished: "OrderedDict[str, BotEntry]" = OrderedDict()
+        self._by_pid: Dict[Tuple[str, int], Set[str]] = defaultdict(set)
+        self._by_room: Dict[str, Set[str]] = defaultdict(set)
+        self._by_conversation: Dict[str, str] = {}
+        self._pidfds: Dict[int, int] = {}
+        self._use_pidfd = hasattr(os, "pidfd_open")
+        self._finished_callbacks: List[Callable[[BotEntry], None]] = []
+
+    def start(self):
+        """Install the child watcher. Must be called from the event loop."""
+        if not self._use_pidfd:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGCHLD, self.reap)
+
+    def stop(self):
+        """Remove the child watcher."""
+        loop = asyncio.get_running_loop()
+        for pid in list(self._pidfds):
+            self._unwatch(pid)
+        if not self._use_pidfd:
+            loop.remove_signal_handler(signal.SIGCHLD)
+
+    def on_finished(self, callback: Callable[[BotEntry], None]):
+        """Register a callback invoked whenever a call finishes."""
+        self._finished_callbacks.append(callback)
+
+    def add(
+        self,
+        call_id: str,
+        handle: BotHandle,
+        room_url: str,
+        conversation_id: Optional[str] = None,
+        watch: bool = True,
+        node: str = "local",
+    ) -> BotEntry:
+        """Start tracking a newly launched bot.
+
+        Args:
+            call_id (str): Unique id for the call
+            handle (BotHandle): Process or hosted call running the bot
+            room_url (str): Daily room the bot joined
+            conversation_id (Optional[str]): Conversation record for the call
+            watch (bool): Reap the bot's process when it exits. Bots running
+                on another node are finished by whoever tracks them there.
+            node (str): Node the bot runs on
+
+        Returns:
+            BotEntry: The registry entry for the call
+        """
+        entry = BotEntry(call_id, handle, room_url, conversation_id, node)
+        self._running[call_id] = entry
+        self._by_pid[(node, entry.pid)].add(call_id)
+        self._by_room[room_url].add(call_id)
+        if conversation_id:
+            self._by_conversation[conversation_id] = call_id
+        if watch:
+            self._watch(entry.pid)
+        if self.store:
+            self.store.add_bot(call_id, entry.pid, room_url, conversation_id, node)
+        return entry
+
+    def finish(self, call_id: str, exit_code: Optional[int] = None):
+        """Mark a call as finished and move it to the history.
+
+        Args:
+            call_id (str): Call to finish
+            exit_code (Optional[int]): Exit code, if known
+        """
+        entry = self._running.pop(call_id, None)
+        if entry is None:
+            return
+        entry.ended_at = time.monotonic()
+        entry.exit_code = exit_code
+        self._discard(self._by_room, entry.room_url, call_id)
+        if self.store:
+            self.store.finish_bot(call_id, exit_code)
+
+        self._finished[call_id] = entry
+        while len(self._finished) > self.history_size:
+            _, evicted = self._finished.popitem(last=False)
+            self._forget(evicted)
+
+        logger.debug(
+            f"Bot {entry.pid} for call {call_id} finished with exit code "
+            f"{exit_code} after {entry.duration:.1f}s"
+        )
+        for callback in self._finished_callbacks:
+            callback(entry)
+
+    def mark_joined(self, call_id: str) -> Optional[BotEntry]:
+        """Record that the call's bot joined its room.
+
+        Returns:
+            Optional[BotEntry]: The entry, or None if the call isn't running
+        """
+        entry = self._running.get(call_id)
+        if entry and entry.joined_at is None:
+            entry.joined_at = time.monotonic()
+            return entry
+        return None
+
+    def reap(self):
+        """Poll running bots and finish the ones that have exited."""
+        for entry in list(self._running.values()):
+            exit_code = entry.handle.poll()
+            if exit_code is not None:
+                self.finish(entry.call_id, exit_code)
+
+    async def drain(
+        self,
+        timeout: float,
+        kill_timeout: float,
+        select: Optional[Callable[[BotEntry], bool]] = None,
+    ) -> List[BotEntry]:
+        """Wait for running calls to end, then stop the ones that don't.
+
+        Calls get up to ``timeout`` seconds to finish on their own. Bots still
+        running after that are all sent SIGTERM at once, and any that haven't
+        exited ``kill_timeout`` seconds later are sent SIGKILL.
+
+        Args:
+            timeout (float): Seconds to let calls finish on their own
+            kill_timeout (float): Seconds between SIGTERM and SIGKILL
+            select (Optional[Callable[[BotEntry], bool]]): Limits the drain to
+                matching calls, e.g. the ones running on this host
+
+        Returns:
+            List[BotEntry]: The calls that had to be stopped
+        """
+
+        def pending() -> List[BotEntry]:
+            return [
+                entry
+                for entry in self._running.values()
+                if select is None or select(entry)
+            ]
+
+        if await self._wait_for(pending, timeout):
+            return []
+
+        stopped = pending()
+        logger.info(f"Stopping {len(stopped)} calls still running after the drain")
+        for entry in stopped:
+            entry.handle.terminate()
+        if await self._wait_for(pending, kill_timeout):
+            return stopped
+
+        for entry in pending():
+            logger.warning(f"Killing bot {entry.pid} for call {entry.call_id}")
+            entry.handle.kill()
+        return stopped
+
+    async def _wait_for(
+        self, pending: Callable[[], List[BotEntry]], timeout: float
+    ) -> bool:
+        """Wait until nothing is pending. Returns False if the timeout passed."""
+        deadline = time.monotonic() + timeout
+        while pending():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(remaining, self.DRAIN_POLL_SECS))
+        return True
+
+    def running(self) -> List[BotEntry]:
+        """All calls still in progress."""
+        return list(self._running.values())
+
+    def finished(self, limit: int = 100) -> List[BotEntry]:
+        """The most recently finished calls, newest last."""
+        return list(self._finished.values())[-limit:]
+
+    def status(self, pid: int, node: str = "local") -> Optional[Dict[str, Any]]:
+        """Status of a bot process for ``/status/{pid}``, or None if unknown.
+
+        A bot host can serve several calls; its status reports the most
+        recent one.
+
+        Args:
+            pid (int): Process id of the bot
+            node (str): Node the process runs on
+        """
+        entries = self.by_pid(pid, node)
+        if not entries:
+            return None
+        entry = max(entries, key=lambda entry: entry.started_at)
+        return {
+            **self._status(entry),
+            "status": "running" if any(entry.running for entry in entries) else "finished",
+        }
+
+    def call_status(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a call, running or in recent history, or None if unknown."""
+        entry = self._lookup(call_id)
+        return self._status(entry) if entry else None
+
+    @staticmethod
+    def _status(entry: BotEntry) -> Dict[str, Any]:
+        return {
+            "bot_id": entry.pid,
+            "call_id": entry.call_id,
+            "node": entry.node,
+            "status": "running" if entry.running else "finished",
+            "exit_code": entry.exit_code,
+            "duration": round(entry.duration, 3),
+        }
+
+    def bots_in_room(self, room_url: str) -> int:
+        """Number of bots currently running in the room."""
+        return len(self._by_room.get(room_url, ()))
+
+    def by_pid(self, pid: int, node: str = "local") -> List[BotEntry]:
+        """Calls handled by the process, running or in recent history.
+
+        Args:
+            pid (int): Process id of the bot
+            node (str): Node the process runs on
+        """
+        entries = []
+        for call_id in self._by_pid.get((node, pid), ()):
+            entry = self._lookup(call_id)
+            if entry:
+                entries.append(entry)
+        return entries
+
+    def by_conversation(self, conversation_id: str) -> Optional[BotEntry]:
+        """The call for a conversation, running or in recent history."""
+        call_id = self._by_conversation.get(conversation_id)
+        return self._lookup(call_id) if call_id else None
+
+    def _lookup(self, call_id: str) -> Optional[BotEntry]:
+        entry = self._running.get(call_id)
+        if entry is None and call_id in self._finished:
+            entry = self._finished[call_id]
+            self._finished.move_to_end(call_id)
+        return entry
+
+    def _forget(self, entry: BotEntry):
+        self._discard(self._by_pid, (entry.node, entry.pid), entry.call_id)
+        if self._by_conversation.get(entry.conversation_id) == entry.call_id:
+            del self._by_conversation[entry.conversation_id]
+
+    @staticmethod
+    def _discard(index: Dict, key, call_id: str):
+        call_ids = index.get(key)
+        if call_ids is None:
+            return
+        call_ids.discard(call_id)
+        if not call_ids:
+            del index[key]
+
+    def _watch(self, pid: int):
+        if not self._use_pidfd or pid in self._pidfds:
+            return
+        try:
+            pidfd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            self._on_exit(pid)
+            return
+        self._pidfds[pid] = pidfd
+        asyncio.get_running_loop().add_reader(pidfd, self._on_exit, pid)
+
+    def _unwatch(self, pid: int):
+        pidfd = self._pidfds.pop(pid, None)
+        if pidfd is not None:
+            asyncio.get_running_loop().remove_reader(pidfd)
+            os.close(pidfd)
+
+    def _on_exit(self, pid: int):
+        self._unwatch(pid)
+        # Only local processes are watched
+        for call_id in list(self._by_pid.get(("local", pid), ())):
+            entry = self._running.get(call_id)
+            if entry:
+                # poll() reaps the child and reports the call's exit code
+                self.finish(call_id, entry.handle.poll())
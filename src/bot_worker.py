@@ -0,0 +1,124 @@
+#
+# Copyright (c) 2024–2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Pre-imported bot worker and multi-call bot host.
+
+Started by ``BotWorkerPool`` as ``python src/bot_worker.py src/bot_<impl>.py``.
+The worker imports the bot module up front (pipecat, Daily and the LLM service),
+runs its ``preload()`` hook for what bots otherwise load lazily (the VAD engine,
+the avatar sprites) and then blocks on stdin until the server writes a JSON
+assignment line::
+
+    {"call_id": "...", "room_url": "...", "token": "...", "conversation_id": "..."}
+
+By default the worker runs that one call and exits. With ``--capacity N`` it
+becomes a bot host: it keeps reading assignments and runs up to N calls as
+asyncio tasks on one event loop, sharing the interpreter, the imported modules
+and the decoded sprites between them. A host also accepts
+``{"op": "stop", "call_id": "..."}`` and reports ``finished`` events for each
+call through the server's event pipe. Events emitted by a call (such as
+``joined``) are tagged with its call id.
+
+EOF on stdin means the server no longer needs this worker. A host lets calls
+in progress finish before exiting.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import signal
+import sys
+from pathlib import Path
+from typing import Dict
+
+from loguru import logger
+
+from bot_events import current_call_id, emit
+
+
+async def host(bot, capacity: int):
+    """Run calls from the control pipe until it's closed."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+    )
+
+    calls: Dict[str, asyncio.Task] = {}
+
+    async def run_call(call_id: str, assignment: Dict):
+        # Each call runs in its own task, so this only tags this call's events
+        current_call_id.set(call_id)
+        exit_code = 0
+        try:
+            await bot.run_bot(
+                assignment["room_url"],
+                assignment["token"],
+                assignment.get("conversation_id"),
+                handle_sigint=False,
+            )
+        except asyncio.CancelledError:
+            exit_code = -signal.SIGTERM
+        except Exception as e:
+            logger.exception(f"Call {call_id} failed: {e}")
+            exit_code = 1
+        finally:
+            calls.pop(call_id, None)
+            emit("finished", call_id=call_id, exit_code=exit_code)
+
+    while line := await reader.readline():
+        message = json.loads(line)
+        call_id = message["call_id"]
+        if message.get("op") == "stop":
+            if call_id in calls:
+                calls[call_id].cancel()
+        elif len(calls) >= capacity:
+            logger.error(f"Host is full, rejecting call {call_id}")
+            emit("finished", call_id=call_id, exit_code=1)
+        else:
+            calls[call_id] = asyncio.create_task(run_call(call_id, message))
+
+    if calls:
+        await asyncio.gather(*calls.values(), return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-imported bot worker")
+    parser.add_argument("bot_file", help="Bot script, e.g. src/bot_gemini.py")
+    parser.add_argument(
+        "--capacity",
+        type=int,
+        default=1,
+        help="Run as a host serving up to this many concurrent calls",
+    )
+    args = parser.parse_args()
+
+    bot = importlib.import_module(Path(args.bot_file).stem)
+    if hasattr(bot, "preload"):
+        bot.preload()
+
+    if args.capacity > 1:
+        asyncio.run(host(bot, args.capacity))
+        return
+
+    line = sys.stdin.readline()
+    if not line:
+        return
+    assignment = json.loads(line)
+    current_call_id.set(assignment["call_id"])
+
+    asyncio.run(
+        bot.run_bot(
+            assignment["room_url"],
+            assignment["token"],
+            assignment.get("conversation_id"),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
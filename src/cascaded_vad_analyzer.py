@@ -0,0 +1,113 @@
+from typing import Optional
+
+from loguru import logger
+
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
+
+from energy_vad_analyzer import AdaptiveEnergyVADAnalyzer
+from vad_engines import load_vad_analyzer
+
+
+class CascadedVADAnalyzer(VADAnalyzer):
+    """A cheap energy gate in front of a neural (or WebRTC) VAD.
+
+    Every frame goes through an adaptive energy gate that tracks the line's
+    noise floor. The model only runs on frames the gate lets through, plus
+    ``hangover_frames`` after the last frame the model called speech, so the
+    end of an utterance is still decided by the model. Skipped frames score
+    0.0.
+
+    When the model is stateful it can define ``skip_frame(buffer)`` to keep
+    its audio context continuous over skipped frames, and the last skipped
+    frame is run through it (result discarded) before the gate reopens so
+    its recurrent state has seen the lead-in to the speech.
+    """
+
+    # Engine name of the model behind the gate, see vad_engines.py
+    MODEL_ENGINE = "SileroVADAnalyzer"
+    # RMS level, relative to the noise floor, at which the gate opens
+    GATE_RATIO = 2.0
+    # Frames the model keeps running after it last detected speech
+    HANGOVER_FRAMES = 10
+    # Frames between skip-rate log lines
+    STATS_LOG_FRAMES = 1000
+
+    def __init__(
+        self,
+        *,
+        sample_rate: int = 16000,
+        params: VADParams = VADParams(),
+        gate_ratio: float = GATE_RATIO,
+        hangover_frames: int = HANGOVER_FRAMES,
+    ):
+        """
+        Args:
+            sample_rate (int): 8000 or 16000
+            params (VADParams): Pipecat VAD parameters
+            gate_ratio (float): RMS above floor * gate_ratio runs the model
+            hangover_frames (int): Frames the model keeps running after speech
+        """
+        self._model = load_vad_analyzer(self.MODEL_ENGINE)(
+            sample_rate=sample_rate, params=params
+        )
+        super().__init__(sample_rate=sample_rate, num_channels=1, params=params)
+        self._gate = AdaptiveEnergyVADAnalyzer(
+            sample_rate=sample_rate,
+            params=params,
+            on_ratio=gate_ratio,
+            off_ratio=gate_ratio,
+        )
+        self._hangover_frames = hangover_frames
+        self._since_speech = hangover_frames
+        self._skipped_frame: Optional[bytes] = None
+        self.frames = 0
+        self.skipped_frames = 0
+
+    @property
+    def skip_ratio(self) -> float:
+        """Share of frames the gate kept from the model."""
+        return self.skipped_frames / self.frames if self.frames else 0.0
+
+    def num_frames_required(self) -> int:
+        return self._model.num_frames_required()
+
+    def voice_confidence(self, buffer) -> float:
+        self.frames += 1
+        if self.frames % self.STATS_LOG_FRAMES == 0:
+            logger.debug(
+                f"Cascaded VAD: gate skipped {self.skip_ratio:.0%} of {self.frames} frames"
+            )
+
+        gate_open = self._gate.voice_confidence(buffer) > 0
+        if not gate_open and self._since_speech >= self._hangover_frames:
+            self.skipped_frames += 1
+            # The latest skipped frame is held back in case speech follows
+            skip_frame = getattr(self._model, "skip_frame", None)
+            if skip_frame and self._skipped_frame is not None:
+                skip_frame(self._skipped_frame)
+            self._skipped_frame = bytes(buffer)
+            return 0.0
+
+        if self._skipped_frame is not None:
+            # Warm the model's state with the frame before the speech
+            self._model.voice_confidence(self._skipped_frame)
+            self._skipped_frame = None
+
+        confidence = self._model.voice_confidence(buffer)
+        if confidence >= self._params.confidence:
+            self._since_speech = 0
+        else:
+            self._since_speech += 1
+        return confidence
+
+
+class CascadedSileroVADAnalyzer(CascadedVADAnalyzer):
+    """Energy gate in front of Silero."""
+
+    MODEL_ENGINE = "SileroVADAnalyzer"
+
+
+class CascadedWebRTCVADAnalyzer(CascadedVADAnalyzer):
+    """Energy gate in front of the WebRTC VAD."""
+
+    MODEL_ENGINE = "WebRTCVADAnalyzer"
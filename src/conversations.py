@@ -0,0 +1,85 @@
+"""Writes to the conversation record of one call.
+
+The server creates the record with a known id and passes it to the bot
+(``--conversation-id``), so every write is a single update keyed by id.
+Bots started without one (e.g. through ``/room`` or by hand) fall back to
+matching the record by room URL, which is still one request.
+
+The transcript is appended message by message to ``conversation_turns``
+(see ``transcript.py``), keyed by (conversation id, sequence number) so a
+retried write replaces itself instead of duplicating the message.
+
+With a write queue (see ``write_queue.py``) writes are queued locally and
+sent in the background, so the call never waits on the database. The queue is
+opt-in (``WRITE_QUEUE_PATH``); without it writes go straight to Supabase and
+raise on failure, and callers on the call's path log them and carry on.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from src.helpers.datetime import serialize_datetime
+from src.models import Conversation, ConversationTurn
+from src.supabase_interface import SupabaseInterface
+from src.write_queue import get_write_queue
+
+
+class ConversationRecord:
+    """The conversation record of a call."""
+
+    def __init__(self, conversation_id: Optional[str], room_url: str):
+        """
+        Args:
+            conversation_id (Optional[str]): Record id, if the server sent one
+            room_url (str): Daily room of the call
+        """
+        self.conversation_id = conversation_id
+        self.room_url = room_url
+        self._db = SupabaseInterface[Conversation]("conversations")
+        self._turns = SupabaseInterface[ConversationTurn]("conversation_turns")
+
+    async def update(self, data: Dict[str, Any]) -> bool:
+        """Update the record, stamping ``updated_at``.
+
+        Args:
+            data (Dict[str, Any]): Columns to update
+
+        Returns:
+            bool: False if no record matched; always True once queued
+        """
+        data = {**data, "updated_at": serialize_datetime(datetime.now())}
+        match = (
+            {"id": self.conversation_id}
+            if self.conversation_id
+            else {"room_url": self.room_url}
+        )
+        queue = get_write_queue()
+        if queue:
+            await queue.enqueue("conversations", match, data)
+            return True
+        return await self._db.patch_where(match, data) > 0
+
+    async def add_turn(self, seq: int, message: Dict[str, Any]) -> bool:
+        """Append a transcript message, or rewrite it if ``seq`` was written.
+
+        Args:
+            seq (int): Position of the message in the transcript
+            message (Dict[str, Any]): The context message
+
+        Returns:
+            bool: False if the call has no conversation id to key turns by
+        """
+        if not self.conversation_id:
+            return False
+        key = {"conversation_id": self.conversation_id, "seq": seq}
+        data = {
+            "role": message.get("role"),
+            "message": message,
+            "created_at": serialize_datetime(datetime.now()),
+        }
+        queue = get_write_queue()
+        if queue:
+            await queue.enqueue("conversation_turns", key, data, op="upsert")
+        else:
+            await self._turns.upsert({**key, **data}, list(key))
+        return True
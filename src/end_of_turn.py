@@ -0,0 +1,184 @@
+"""Per-call end-of-turn delay that adapts to the caller.
+
+The VAD ends the caller's turn after ``stop_secs`` of silence, and that delay
+is added to every response. ``EndOfTurnController`` tunes it for each call
+within ``END_OF_TURN_MIN_SECS`` and ``END_OF_TURN_MAX_SECS``:
+
+- each clean turn end (the caller doesn't speak again within
+  ``RESUME_WINDOW_SECS``) shortens it by ``STEP_DOWN_SECS``
+- a false turn end (the caller resumes within the window after the bot
+  started answering, i.e. they were only pausing) lengthens it by
+  ``STEP_UP_SECS``
+- it never drops below the caller's pause distribution: the 90th percentile
+  of their recent mid-turn pauses plus ``PAUSE_MARGIN_SECS``
+
+The pauses are observed on both sides of ``stop_secs``, so none is censored
+by the current delay. A pause shorter than ``stop_secs`` is a STOPPING ->
+SPEAKING transition of the VAD, timed by watching its ``analyze_audio()``; a
+longer one ended the turn and is the delay plus the time until the caller
+spoke again. Only pauses longer than ``stop_secs + RESUME_WINDOW_SECS`` go
+unseen, and those are taken as real turn ends.
+
+Changing the VAD's params resets its state, so a new value is applied when
+the caller's turn ends, never while they speak. Each turn end is reported to
+the server as a ``turn_end`` event with the time saved (``saved_secs``) or
+added (``added_secs``) against the fixed ``BASELINE_STOP_SECS``, both zero or
+more; false turn ends as ``false_turn_end``.
+"""
+
+import os
+import time
+from collections import deque
+from typing import Deque, Optional
+
+from loguru import logger
+
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams, VADState
+from pipecat.frames.frames import (
+    BotStartedSpeakingFrame,
+    Frame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from bot_events import emit
+
+# "adaptive" tunes stop_secs per call; "fixed" keeps BASELINE_STOP_SECS
+END_OF_TURN = os.getenv("END_OF_TURN", "adaptive").lower()
+END_OF_TURN_MIN_SECS = float(os.getenv("END_OF_TURN_MIN_SECS", "0.3"))
+END_OF_TURN_MAX_SECS = float(os.getenv("END_OF_TURN_MAX_SECS", "1.2"))
+
+# The fixed end-of-turn delay savings are measured against
+BASELINE_STOP_SECS = 0.5
+
+
+class EndOfTurnController(FrameProcessor):
+    """Adapts the VAD's ``stop_secs`` to the caller's pauses.
+
+    Place it right after ``transport.input()``; it needs the user speaking
+    frames going downstream and ``BotStartedSpeakingFrame`` coming upstream.
+    It also wraps the analyzer's ``analyze_audio()`` to see the pauses too
+    short to end a turn.
+    """
+
+    # Speech this soon after a turn end continues the same turn
+    RESUME_WINDOW_SECS = 1.5
+    STEP_DOWN_SECS = 0.05
+    STEP_UP_SECS = 0.2
+    PAUSE_MARGIN_SECS = 0.1
+    # Mid-turn pauses remembered, and needed before they set a floor
+    PAUSE_HISTORY = 50
+    MIN_PAUSES = 10
+
+    def __init__(
+        self,
+        vad_analyzer: VADAnalyzer,
+        params: VADParams,
+        min_secs: float = END_OF_TURN_MIN_SECS,
+        max_secs: float = END_OF_TURN_MAX_SECS,
+    ):
+        """
+        Args:
+            vad_analyzer (VADAnalyzer): The transport's analyzer
+            params (VADParams): Its params; only ``stop_secs`` is changed
+            min_secs (float): Lowest ``stop_secs``
+            max_secs (float): Highest ``stop_secs``
+        """
+        super().__init__()
+        self._vad_analyzer = vad_analyzer
+        self._params = params
+        self._min_secs = min_secs
+        self._max_secs = max_secs
+        self.stop_secs = params.stop_secs
+        self._pending_secs = self.stop_secs
+        self._pauses: Deque[float] = deque(maxlen=self.PAUSE_HISTORY)
+        self._stopped_at: Optional[float] = None
+        self._bot_answered = False
+
+        # The transport runs the analyzer in a worker thread; the deque is
+        # only appended to there
+        self._analyze_audio = vad_analyzer.analyze_audio
+        self._vad_state = VADState.QUIET
+        self._stopping_at: Optional[float] = None
+        vad_analyzer.analyze_audio = self._watch_vad
+
+    @property
+    def pause_floor(self) -> Optional[float]:
+        """Lowest ``stop_secs`` the caller's pauses allow, if known yet."""
+        if len(self._pauses) < self.MIN_PAUSES:
+            return None
+        pauses = sorted(self._pauses)
+        p90 = pauses[min(int(len(pauses) * 0.9), len(pauses) - 1)]
+        return p90 + self.PAUSE_MARGIN_SECS
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, UserStartedSpeakingFrame):
+            self._on_user_started()
+        elif isinstance(frame, UserStoppedSpeakingFrame):
+            self._on_user_stopped()
+        elif isinstance(frame, BotStartedSpeakingFrame):
+            self._bot_answered = True
+
+        await self.push_frame(frame, direction)
+
+    def _watch_vad(self, buffer) -> VADState:
+        state = self._analyze_audio(buffer)
+        if state != self._vad_state:
+            if state == VADState.STOPPING:
+                self._stopping_at = time.monotonic()
+            elif state == VADState.SPEAKING and self._stopping_at is not None:
+                # Resumed before stop_secs ran out: a pause within the turn
+                self._pauses.append(time.monotonic() - self._stopping_at)
+            if state != VADState.STOPPING:
+                self._stopping_at = None
+            self._vad_state = state
+        return state
+
+    def _on_user_started(self):
+        if self._stopped_at is None:
+            return
+        gap = time.monotonic() - self._stopped_at
+        self._stopped_at = None
+
+        if gap >= self.RESUME_WINDOW_SECS:
+            self._pending_secs = self._clamp(self._pending_secs - self.STEP_DOWN_SECS)
+            return
+
+        # The caller only paused. The VAD reports speech start_secs after it
+        # began, and the pause also includes the delay that ended the turn.
+        self._pauses.append(self.stop_secs + max(gap - self._params.start_secs, 0.0))
+        if self._bot_answered:
+            emit("false_turn_end", stop_secs=self.stop_secs)
+            self._pending_secs = self._clamp(self._pending_secs + self.STEP_UP_SECS)
+        else:
+            self._pending_secs = self._clamp(self._pending_secs)
+
+    def _on_user_stopped(self):
+        self._stopped_at = time.monotonic()
+        self._bot_answered = False
+        emit(
+            "turn_end",
+            stop_secs=self.stop_secs,
+            saved_secs=max(BASELINE_STOP_SECS - self.stop_secs, 0.0),
+            added_secs=max(self.stop_secs - BASELINE_STOP_SECS, 0.0),
+        )
+
+        # The analyzer is quiet now, so resetting its state is harmless
+        if abs(self._pending_secs - self.stop_secs) >= 0.01:
+            logger.debug(
+                f"End of turn delay {self.stop_secs:.2f}s -> {self._pending_secs:.2f}s"
+            )
+            self.stop_secs = self._pending_secs
+            self._vad_analyzer.set_params(
+                self._params.model_copy(update={"stop_secs": self.stop_secs})
+            )
+
+    def _clamp(self, stop_secs: float) -> float:
+        """Keep ``stop_secs`` within bounds and above the caller's pauses."""
+        floor = self.pause_floor
+        if floor is not None:
+            stop_secs = max(stop_secs, floor)
+        return min(max(stop_secs, self._min_secs), self._max_secs)
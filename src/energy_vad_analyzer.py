@@ -1,3 +1,6 @@
+from collections import deque
+from typing import Deque
+
 import numpy as np
 from loguru import logger
 
@@ -5,20 +8,184 @@ from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
 
 
 class EnergyBaseVADAnalyzer(VADAnalyzer):
-    def __init__(self, *, sample_rate: int = 16000, params: VADParams = VADParams()):
+    """Energy (RMS) voice activity detection on 16-bit PCM.
+
+    A frame is speech when its RMS level exceeds ``threshold``. The check is
+    done in the integer domain: the sum of squared samples is compared with
+    ``threshold**2 * samples``, so there is no float conversion, mean or sqrt,
+    and samples are widened into a preallocated buffer instead of temporary
+    arrays. ``voice_confidences()`` scores many frames in one vectorized call.
+    """
+
+    # RMS level above which a frame counts as speech
+    THRESHOLD = 500
+
+    def __init__(
+        self,
+        *,
+        sample_rate: int = 16000,
+        params: VADParams = VADParams(),
+        threshold: int = THRESHOLD,
+    ):
         self.frame_duration_ms = 30
         super().__init__(sample_rate=sample_rate, num_channels=1, params=params)
         if sample_rate not in [8000, 16000]:
-            raise ValueError("WebRTC VAD requires a sample rate of 8000 or 16000 Hz")
+            raise ValueError("Energy VAD requires a sample rate of 8000 or 16000 Hz")
+
+        self._threshold_sq = int(threshold) ** 2
+        # int16 squares summed over a frame overflow int32, so widen to int64
+        self._samples = np.empty(self.num_frames_required(), dtype=np.int64)
+        self._batch = np.empty(0, dtype=np.int64)
+        self._energies = np.empty(0, dtype=np.int64)
 
-        logger.debug("Initializing WebRTC VAD...")
+        logger.debug("Initializing Energy VAD...")
 
     def num_frames_required(self) -> int:
         return int(self.sample_rate * self.frame_duration_ms / 1000)
 
     def voice_confidence(self, buffer) -> float:
-        audio_int16 = np.frombuffer(buffer, dtype=np.int16)
-        rms = np.sqrt(np.mean(audio_int16.astype(np.float32) ** 2))
-        threshold = 500  # Adjust based on testing
-        confidence = 1.0 if rms > threshold else 0.0
-        return confidence
+        energy, length = self._energy(buffer)
+        return 1.0 if energy > self._threshold_sq * length else 0.0
+
+    def voice_confidences(self, buffer) -> np.ndarray:
+        """Score every whole frame in ``buffer`` at once.
+
+        Args:
+            buffer: 16-bit PCM holding one or more frames of
+                ``num_frames_required()`` samples; a trailing partial frame is
+                ignored
+
+        Returns:
+            np.ndarray: Confidence (0.0 or 1.0) for each frame, in order
+        """
+        energies = self._frame_energies(buffer)
+        return (energies > self._threshold_sq * self.num_frames_required()).astype(
+            np.float32
+        )
+
+    def _energy(self, buffer):
+        """Sum of squared samples of a frame, and its number of samples."""
+        pcm = np.frombuffer(buffer, dtype=np.int16)
+        if len(pcm) > len(self._samples):
+            self._samples = np.empty(len(pcm), dtype=np.int64)
+        samples = self._samples[: len(pcm)]
+        np.copyto(samples, pcm)
+        return int(np.dot(samples, samples)), len(pcm)
+
+    def _frame_energies(self, buffer) -> np.ndarray:
+        """Sum of squared samples of every whole frame in ``buffer``."""
+        frame_length = self.num_frames_required()
+        pcm = np.frombuffer(buffer, dtype=np.int16)
+        count = len(pcm) // frame_length
+        size = count * frame_length
+        if size > len(self._batch):
+            self._batch = np.empty(size, dtype=np.int64)
+            self._energies = np.empty(count, dtype=np.int64)
+
+        frames = self._batch[:size].reshape(count, frame_length)
+        np.copyto(frames, pcm[:size].reshape(count, frame_length))
+        energies = self._energies[:count]
+        np.einsum("ij,ij->i", frames, frames, out=energies)
+        return energies
+
+
+class AdaptiveEnergyVADAnalyzer(EnergyBaseVADAnalyzer):
+    """Energy VAD with a threshold that follows the line's noise floor.
+
+    The noise floor is tracked with minimum statistics: the smoothed per-frame
+    energy is reduced to one minimum per block of ``BLOCK_FRAMES`` frames, and
+    the floor is the lowest of the last ``BLOCKS`` block minima (about 3 s), so
+    speech never raises it but a louder line does within seconds. Speech starts
+    when a frame is ``on_ratio`` times louder (in RMS) than the floor and ends
+    when it drops below ``off_ratio`` times the floor; the gap between the two
+    stops steady noise near the threshold from toggling the state.
+    """
+
+    # Frames per minimum-statistics block, and blocks in the tracking window
+    BLOCK_FRAMES = 10
+    BLOCKS = 10
+    # Smoothing of the per-frame energy before taking minima
+    SMOOTHING = 0.7
+    # Minimum statistics underestimate the mean noise level by about this much
+    BIAS = 1.5
+    # RMS floor used before any noise has been measured, and the lowest allowed
+    INITIAL_FLOOR = 150
+    MIN_FLOOR = 50
+
+    def __init__(
+        self,
+        *,
+        sample_rate: int = 16000,
+        params: VADParams = VADParams(),
+        on_ratio: float = 4.0,
+        off_ratio: float = 2.0,
+    ):
+        """
+        Args:
+            sample_rate (int): 8000 or 16000
+            params (VADParams): Pipecat VAD parameters
+            on_ratio (float): RMS above floor * on_ratio starts speech
+            off_ratio (float): RMS below floor * off_ratio ends speech
+        """
+        super().__init__(sample_rate=sample_rate, params=params)
+        self._on_ratio_sq = on_ratio**2
+        self._off_ratio_sq = off_ratio**2
+        self._min_floor_sq = float(self.MIN_FLOOR**2)
+        self._floor_sq = float(self.INITIAL_FLOOR**2)
+        self._smoothed = None
+        self._block_min = float("inf")
+        self._block_frames = 0
+        self._block_minima: Deque[float] = deque(maxlen=self.BLOCKS)
+        self._speaking = False
+
+    @property
+    def noise_floor(self) -> float:
+        """Current noise floor estimate, as an RMS level."""
+        return self._floor_sq**0.5
+
+    @property
+    def thresholds(self):
+        """(on, off) speech thresholds, as RMS levels."""
+        return (
+            (self._floor_sq * self._on_ratio_sq) ** 0.5,
+            (self._floor_sq * self._off_ratio_sq) ** 0.5,
+        )
+
+    def voice_confidence(self, buffer) -> float:
+        energy, length = self._energy(buffer)
+        return self._update(energy / length) if length else 0.0
+
+    def voice_confidences(self, buffer) -> np.ndarray:
+        # The floor and the speech state carry over from frame to frame, so
+        # only the energies are computed in one pass
+        frame_length = self.num_frames_required()
+        energies = self._frame_energies(buffer)
+        return np.array(
+            [self._update(energy / frame_length) for energy in energies.tolist()],
+            dtype=np.float32,
+        )
+
+    def _update(self, mean_square: float) -> float:
+        """Track the floor with one frame's mean square and classify it."""
+        if self._smoothed is None:
+            self._smoothed = mean_square
+        else:
+            self._smoothed = (
+                self.SMOOTHING * self._smoothed + (1 - self.SMOOTHING) * mean_square
+            )
+
+        self._block_min = min(self._block_min, self._smoothed)
+        self._block_frames += 1
+        if self._block_frames == self.BLOCK_FRAMES:
+            self._block_minima.append(self._block_min)
+            self._block_min = float("inf")
+            self._block_frames = 0
+            self._floor_sq = max(
+                min(self._block_minima) * self.BIAS, self._min_floor_sq
+            )
+
+        if self._speaking:
+            self._speaking = mean_square > self._floor_sq * self._off_ratio_sq
+        else:
+            self._speaking = mean_square > self._floor_sq * self._on_ratio_sq
+        return 1.0 if self._speaking else 0.0
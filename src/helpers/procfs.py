@@ -0,0 +1,53 @@
+import os
+from typing import Dict, Optional
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def read_rss(pid: int) -> Optional[int]:
+    """Resident set size of a process in bytes, or None if it's gone"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def read_start_time(pid: int) -> Optional[float]:
+    """Time a process started, in seconds since the epoch (to about a second),
+    or None if it's gone"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # starttime, in clock ticks after boot, is field 22 in proc(5)
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/stat") as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+    except (OSError, IndexError, ValueError, StopIteration):
+        return None
+    return boot_time + start_ticks / CLOCK_TICKS
+
+
+def read_process_stats(pid: int) -> Optional[Dict[str, float]]:
+    """CPU time, RSS, open file descriptors and thread count of a process,
+    or None if it's gone"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # The command name may contain spaces, so split after its closing paren
+            fields = f.read().rsplit(")", 1)[1].split()
+        open_fds = len(os.listdir(f"/proc/{pid}/fd"))
+    except (OSError, IndexError):
+        return None
+
+    rss = read_rss(pid)
+    if rss is None:
+        return None
+
+    # Fields are numbered from the process state (field 3 in proc(5))
+    utime, stime, threads = int(fields[11]), int(fields[12]), int(fields[17])
+    return {
+        "cpu_seconds": (utime + stime) / CLOCK_TICKS,
+        "rss_bytes": rss,
+        "open_fds": open_fds,
+        "threads": threads,
+    }
@@ -21,31 +21,42 @@ Requirements:
 """
 
 import argparse
+import asyncio
 import os
 from pathlib import Path
-import subprocess
 from contextlib import asynccontextmanager
 import sys
-from typing import Any, Dict
+import time
+from typing import Any, Dict, Optional
 from datetime import datetime
 import uuid
 import aiohttp
 from src.models import Conversation
-from src.supabase_interface import SupabaseInterface
+from src.supabase_interface import SupabaseInterface, close_postgrest_client
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
-
-from fastapi.staticfiles import StaticFiles
-from pipecat.transports.services.helpers.daily_rest import (
-    DailyRESTHelper,
-    DailyRoomParams,
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    PlainTextResponse,
+    RedirectResponse,
 )
 
+from fastapi.staticfiles import StaticFiles
+from pipecat.transports.services.helpers.daily_rest import DailyRESTHelper
+
+from src.admission import AdmissionController, AdmissionRejected
+from src.bot_pool import BotHandle, BotWorkerPool, get_bot_file
+from src.bot_registry import BotRegistry
+from src.room_pool import RoomPool
+from src.state_store import SQLiteStateStore
+from src.write_queue import WriteFlusher, get_write_queue
+from src.scheduler import STRATEGIES, BotScheduler, LocalNode, RemoteBot, RemoteNode
 from src.rooms import fetch_and_delete
-from src.utils import ROOT_DIR
 from src.helpers.datetime import serialize_datetime
+from src.helpers.procfs import read_process_stats, read_rss, read_start_time
+from src.telemetry import Histogram, render_metric
 
 # Load environment variables from .env file
 load_dotenv(override=True)
@@ -53,12 +64,170 @@ load_dotenv(override=True)
 # Maximum number of bot instances allowed per room
 MAX_BOTS_PER_ROOM = 1
 
-# Dictionary to track bot processes: {pid: (process, room_url)}
-bot_procs = {}
+# Number of finished bots remembered for /status lookups
+BOT_HISTORY_SIZE = int(os.getenv("BOT_HISTORY_SIZE", "1000"))
+
+# SQLite database shared by the API workers on this node (unset = single worker)
+STATE_STORE_PATH = os.getenv("STATE_STORE_PATH")
+
+# Bot and room state visible to every API worker
+state_store = (
+    SQLiteStateStore(STATE_STORE_PATH, BOT_HISTORY_SIZE) if STATE_STORE_PATH else None
+)
+
+# Seconds between state store syncs: the shared bot count and this worker's counters
+STATE_SYNC_SECS = 1.0
+
+# Seconds between checks for calls left running by exited API workers
+ORPHAN_CHECK_SECS = 30.0
+
+# Bots running across all API workers, as of the last state store sync
+shared_bots_running = 0
+
+# Running bots and recent history, indexed by pid, room URL and conversation id
+bot_registry = BotRegistry(BOT_HISTORY_SIZE, store=state_store)
+
+# Sends the conversation updates bots on this node queue during calls
+write_queue = get_write_queue()
+write_flusher = WriteFlusher(write_queue) if write_queue else None
+
+
+async def bots_in_room(room_url: str) -> int:
+    """Bots running in the room, across all API workers."""
+    if state_store:
+        return await state_store.bots_in_room(room_url)
+    return bot_registry.bots_in_room(room_url)
+
+
+def local_bot_pids() -> set:
+    """Pids of the bot processes running on this host."""
+    return {
+        entry.pid
+        for entry in bot_registry.running()
+        if not isinstance(entry.handle, RemoteBot)
+    }
+
+
+def bot_rss_used() -> int:
+    """Combined resident memory of the running bot processes, in bytes."""
+    pids = local_bot_pids()
+    return sum(read_rss(pid) or 0 for pid in pids)
+
+
+# Limit concurrent bots so a burst of callers can't oversubscribe the node (0 = no limit)
+admission = AdmissionController(
+    max_bots=int(os.getenv("MAX_CONCURRENT_BOTS", "0")),
+    max_load_per_cpu=float(os.getenv("MAX_LOAD_PER_CPU", "0")),
+    max_rss_bytes=int(os.getenv("MAX_BOTS_RSS_MB", "0")) * 1024 * 1024,
+    queue_size=int(os.getenv("ADMISSION_QUEUE_SIZE", "16")),
+    queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5")),
+    rss_used=bot_rss_used,
+    bots_running=(lambda: shared_bots_running) if state_store else None,
+)
+
+# Server-side latency and call lifetime histograms for /metrics
+create_room_seconds = Histogram(
+    "hotline_create_room_and_token_seconds",
+    "Time to get a Daily room and token for a call",
+)
+bot_spawn_seconds = Histogram(
+    "hotline_bot_spawn_seconds", "Time to launch a bot process or hosted call"
+)
+admission_wait_seconds = Histogram(
+    "hotline_admission_wait_seconds", "Time callers waited for a bot slot"
+)
+bot_join_seconds = Histogram(
+    "hotline_bot_spawn_to_join_seconds",
+    "Time from launching a bot to it joining the Daily room",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+call_duration_seconds = Histogram(
+    "hotline_call_duration_seconds",
+    "Lifetime of finished calls",
+    buckets=(10, 30, 60, 120, 300, 600, 1200, 1800, 3600),
+)
+turn_stop_seconds = Histogram(
+    "hotline_turn_stop_seconds",
+    "Silence that ended each caller turn (the bots' VAD stop_secs)",
+    buckets=(0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 1.0, 1.2),
+)
+# Reported by the bots' end-of-turn controllers
+turn_totals = {"saved_seconds": 0.0, "added_seconds": 0.0, "false_turn_ends": 0}
+
+HISTOGRAMS = (
+    create_room_seconds,
+    bot_spawn_seconds,
+    admission_wait_seconds,
+    bot_join_seconds,
+    call_duration_seconds,
+    turn_stop_seconds,
+)
+
+
+def local_counters() -> Dict[str, float]:
+    """This worker's counter and histogram series, for the state store."""
+    values = {
+        "hotline_admission_rejected_total": admission.rejected_total,
+        "hotline_turn_saved_seconds_total": turn_totals["saved_seconds"],
+        "hotline_turn_added_seconds_total": turn_totals["added_seconds"],
+        "hotline_false_turn_ends_total": turn_totals["false_turn_ends"],
+    }
+    for histogram in HISTOGRAMS:
+        values.update(histogram.snapshot())
+    return values
+
+
+def on_bot_finished(entry):
+    # A bot's admission slot is freed when it exits
+    admission.release()
+    call_duration_seconds.observe(entry.duration)
+
+
+bot_registry.on_finished(on_bot_finished)
+
+
+def on_bot_event(event: Dict[str, Any]):
+    """Handle an event reported by a bot through its event pipe."""
+    if event.get("event") == "finished":
+        bot_registry.finish(event["call_id"], event.get("exit_code"))
+    elif event.get("event") == "joined":
+        entry = bot_registry.mark_joined(event.get("call_id"))
+        if entry:
+            bot_join_seconds.observe(entry.joined_at - entry.started_at)
+    elif event.get("event") == "turn_end":
+        turn_stop_seconds.observe(event["stop_secs"])
+        turn_totals["saved_seconds"] += event["saved_secs"]
+        turn_totals["added_seconds"] += event.get("added_secs", 0.0)
+    elif event.get("event") == "false_turn_end":
+        turn_totals["false_turn_ends"] += 1
+
 
 # Store Daily API helpers
 daily_helpers = {}
 
+# Number of Daily rooms (with tokens) created ahead of time for new calls (0 disables the pool)
+ROOM_POOL_SIZE = int(os.getenv("ROOM_POOL_SIZE", "0"))
+
+# Number of pre-imported bot workers kept ready for new calls (0 disables the pool)
+BOT_POOL_SIZE = int(os.getenv("BOT_POOL_SIZE", "0"))
+
+# Calls served by each pooled worker; above 1, workers host many calls on one event loop
+BOT_HOST_CAPACITY = int(os.getenv("BOT_HOST_CAPACITY", "1"))
+
+# Warm bot worker pool, created during startup
+bot_pool: Optional[BotWorkerPool] = None
+
+# Nodes bots are placed on: "local" and/or worker agent URLs, comma-separated
+WORKER_NODES = [
+    node.strip() for node in os.getenv("WORKER_NODES", "local").split(",") if node.strip()
+]
+
+# How calls are spread across nodes: "least-loaded" or "bin-packing"
+SCHEDULER_STRATEGY = os.getenv("SCHEDULER_STRATEGY", "least-loaded")
+
+# Places each call on a node, created during startup
+scheduler: Optional[BotScheduler] = None
+
 # Initialize Supabase interface for conversations
 conversations_db = SupabaseInterface[Conversation]("conversations")
 
@@ -66,30 +235,159 @@ if os.getenv("DELETE_ROOMS", "false").lower() == "true":
     fetch_and_delete()
 
 
+# Seconds in-flight calls get to finish on shutdown before their bots are stopped
+SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "30"))
+
+# Seconds between SIGTERM and SIGKILL for bots stopped on shutdown
+SHUTDOWN_KILL_TIMEOUT = float(os.getenv("SHUTDOWN_KILL_TIMEOUT", "5"))
+
 # Precompute paths during startup
 VENV_PYTHON = Path(sys.executable)
 
-def cleanup():
-    """Cleanup function to terminate all bot processes.
+# Work that outlives the request that started it, kept referenced until done
+background_tasks = set()
+
+
+def run_in_background(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+
+async def cleanup():
+    """Drain bot processes and shut down the worker pool.
+
+    Called during server shutdown. New calls are refused, in-flight calls get
+    ``SHUTDOWN_DRAIN_TIMEOUT`` seconds to finish, and the bots still running
+    after that are stopped together. Conversations of the calls that were cut
+    short are marked ended in one update.
+    """
+    admission.drain()
+    stopped = await bot_registry.drain(
+        SHUTDOWN_DRAIN_TIMEOUT,
+        SHUTDOWN_KILL_TIMEOUT,
+        # Remote bots are drained by their worker agent
+        select=lambda entry: not isinstance(entry.handle, RemoteBot),
+    )
+    if bot_pool:
+        bot_pool.close(SHUTDOWN_KILL_TIMEOUT)
+
+    conversation_ids = [entry.conversation_id for entry in stopped if entry.conversation_id]
+    if conversation_ids:
+        try:
+            await conversations_db.update_many(
+                conversation_ids,
+                {"status": "ended", "updated_at": serialize_datetime(datetime.now())},
+            )
+        except Exception as e:
+            print(f"Failed to end {len(conversation_ids)} conversations: {e}")
+
+
+async def spawn_bot(
+    room_url: str, token: str, conversation_id: Optional[str] = None
+) -> BotHandle:
+    """Start a bot for the room on the node chosen by the scheduler.
+
+    Local bots use a warm worker when one is available.
+
+    Args:
+        room_url (str): Daily room the bot joins
+        token (str): Meeting token for the room
+        conversation_id (Optional[str]): Conversation record for this call
+
+    Returns:
+        BotHandle: The bot process, or the call's handle in a bot host
+    """
+    call_id = conversation_id or str(uuid.uuid4())
+    with bot_spawn_seconds.time():
+        proc = await scheduler.launch(call_id, room_url, token, conversation_id)
+    bot_registry.add(
+        call_id,
+        proc,
+        room_url,
+        conversation_id,
+        watch=not isinstance(proc, RemoteBot),
+        node=proc.node.name if isinstance(proc, RemoteBot) else "local",
+    )
+    return proc
+
+
+@asynccontextmanager
+async def bot_slot():
+    """Hold an admission slot while a bot is being started.
+
+    Once the bot is registered the slot belongs to it and is released when it
+    exits. If starting the bot fails, the slot is released right away.
 
-    Called during server shutdown.
+    Raises:
+        HTTPException: 503 with Retry-After if the node can't take another bot
     """
-    for entry in bot_procs.values():
-        proc = entry[0]
-        proc.terminate()
-        proc.wait()
-
-
-def get_bot_file():
-    bot_implementation = os.getenv("BOT_IMPLEMENTATION", "openai").lower().strip()
-    # If blank or None, default to openai
-    if not bot_implementation:
-        bot_implementation = "openai"
-    if bot_implementation not in ["openai", "gemini"]:
-        raise ValueError(
-            f"Invalid BOT_IMPLEMENTATION: {bot_implementation}. Must be 'openai' or 'gemini'"
+    try:
+        with admission_wait_seconds.time():
+            await admission.acquire()
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
         )
-    return f"src/bot_{bot_implementation}".replace("-", "_") + ".py"
+    try:
+        yield
+    except BaseException:
+        admission.release()
+        raise
+
+
+async def sync_state_store():
+    """Keep this worker's view of the shared state current.
+
+    Refreshes the running bot count admission checks against, publishes this
+    worker's counters for ``/metrics`` and finishes calls orphaned by exited
+    workers.
+    """
+    global shared_bots_running
+    orphans_checked_at = 0.0
+    while True:
+        try:
+            shared_bots_running = await state_store.running_bots()
+            await state_store.publish_counters(local_counters())
+            if time.monotonic() - orphans_checked_at >= ORPHAN_CHECK_SECS:
+                orphans_checked_at = time.monotonic()
+                await finish_orphaned_bots()
+        except Exception as e:
+            print(f"Failed to sync the state store: {e}")
+        await asyncio.sleep(STATE_SYNC_SECS)
+
+
+async def finish_orphaned_bots():
+    """Finish calls left running by exited API workers once their bots are gone."""
+    finished = 0
+    for bot in await state_store.orphaned_bots():
+        if not await orphan_alive(bot):
+            state_store.finish_bot(bot["call_id"])
+            finished += 1
+    if finished:
+        print(f"Finished {finished} calls left running by exited workers")
+
+
+async def orphan_alive(bot: Dict[str, Any]) -> bool:
+    """Whether the bot of a call whose worker exited is still running."""
+    if bot["node"] == "local":
+        started_at = read_start_time(bot["pid"])
+        # A process started after the call only reused the pid
+        return started_at is not None and started_at <= bot["started_at"] + 1
+    node = next((node for node in scheduler.nodes if node.name == bot["node"]), None)
+    if node is None:
+        return False
+    try:
+        status = await node.call_status(bot["call_id"])
+    except aiohttp.ClientResponseError as e:
+        return e.status != 404
+    except Exception:
+        # Ask again once the agent is reachable
+        return True
+    return status["status"] == "running"
 
 
 @asynccontextmanager
@@ -97,18 +395,85 @@ async def lifespan(app: FastAPI):
     """FastAPI lifespan manager that handles startup and shutdown tasks.
 
     - Creates aiohttp session
-    - Initializes Daily API helper
+    - Initializes Daily API helper and room pool
+    - Warms up the bot worker pool
+    - Connects the scheduler to the worker nodes
+    - Starts flushing the write queue
+    - Syncs with the state store shared by the API workers
     - Cleans up resources on shutdown
     """
+    global bot_pool, scheduler
+    bot_registry.start()
+    if write_flusher:
+        write_flusher.start()
+    bot_pool = BotWorkerPool(
+        get_bot_file(),
+        BOT_POOL_SIZE,
+        BOT_HOST_CAPACITY,
+        python=VENV_PYTHON,
+        on_event=on_bot_event,
+    )
+    bot_pool.start()
+
     aiohttp_session = aiohttp.ClientSession()
+
+    if any(node != "local" for node in WORKER_NODES) and not os.getenv("WORKER_AGENT_TOKEN"):
+        raise RuntimeError("WORKER_AGENT_TOKEN must be set to use remote worker nodes")
+    nodes = []
+    for node in WORKER_NODES:
+        if node == "local":
+            nodes.append(
+                LocalNode(
+                    bot_pool,
+                    lambda: len(local_bot_pids()),
+                    int(os.getenv("NODE_CAPACITY", "0")),
+                )
+            )
+        else:
+            nodes.append(
+                RemoteNode(
+                    node,
+                    aiohttp_session,
+                    auth_token=os.getenv("WORKER_AGENT_TOKEN"),
+                    on_event=on_bot_event,
+                )
+            )
+    scheduler = BotScheduler(nodes, STRATEGIES[SCHEDULER_STRATEGY]())
+    scheduler.start()
+    state_sync = asyncio.create_task(sync_state_store()) if state_store else None
+
     daily_helpers["rest"] = DailyRESTHelper(
         daily_api_key=os.getenv("DAILY_API_KEY", ""),
         daily_api_url=os.getenv("DAILY_API_URL", "https://api.daily.co/v1"),
         aiohttp_session=aiohttp_session,
     )
+    daily_helpers["rooms"] = RoomPool(
+        daily_helpers["rest"],
+        size=ROOM_POOL_SIZE,
+        room_ttl=float(os.getenv("ROOM_TTL", str(2 * 60 * 60))),
+        min_ttl=float(os.getenv("ROOM_MIN_TTL", str(10 * 60))),
+        concurrency=int(os.getenv("ROOM_POOL_CONCURRENCY", "4")),
+        store=state_store,
+    )
+    daily_helpers["rooms"].start()
     yield
+    if state_sync:
+        state_sync.cancel()
+        try:
+            await state_sync
+        except asyncio.CancelledError:
+            pass
+    await cleanup()
+    await scheduler.close()
+    await daily_helpers["rooms"].close()
     await aiohttp_session.close()
-    cleanup()
+    if write_flusher:
+        await write_flusher.close()
+    await close_postgrest_client()
+    bot_registry.stop()
+    if state_store:
+        await state_store.publish_counters(local_counters())
+        await state_store.close()
 
 
 # Initialize FastAPI app with lifespan manager
@@ -125,7 +490,10 @@ app.add_middleware(
 
 
 async def create_room_and_token() -> tuple[str, str]:
-    """Helper function to create a Daily room and generate an access token.
+    """Helper function to get a Daily room and an access token.
+
+    Takes a pre-created room from the pool when one is ready, otherwise creates
+    the room and token on demand.
 
     Returns:
         tuple[str, str]: A tuple containing (room_url, token)
@@ -133,17 +501,43 @@ async def create_room_and_token() -> tuple[str, str]:
     Raises:
         HTTPException: If room creation or token generation fails
     """
-    room = await daily_helpers["rest"].create_room(DailyRoomParams())
-    if not room.url:
-        raise HTTPException(status_code=500, detail="Failed to create room")
+    try:
+        with create_room_seconds.time():
+            return await daily_helpers["rooms"].acquire()
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-    token = await daily_helpers["rest"].get_token(room.url)
-    if not token:
-        raise HTTPException(
-            status_code=500, detail=f"Failed to get token for room: {room.url}"
-        )
 
-    return room.url, token
+async def settle_conversation(insert: asyncio.Task, proc: Optional[BotHandle]):
+    """Reconcile the conversation insert with the bot it was started alongside.
+
+    Runs after /connect has answered. If the insert fails the bot is stopped,
+    since it has no record to save contacts or the transcript to. If the bot
+    never started, a conversation that did get inserted is marked ended.
+
+    Args:
+        insert (asyncio.Task): The in-flight ``conversations_db.create`` call
+        proc (Optional[BotHandle]): The bot, or None if it failed to start
+    """
+    try:
+        conversation = await insert
+    except asyncio.CancelledError:
+        return
+    except Exception as e:
+        print(f"Failed to create conversation: {e}")
+        if proc:
+            print(f"Stopping bot {proc.pid}, it has no conversation record")
+            proc.terminate()
+        return
+
+    if proc is None:
+        try:
+            await conversations_db.update(
+                conversation["id"],
+                {"status": "ended", "updated_at": serialize_datetime(datetime.now())},
+            )
+        except Exception as e:
+            print(f"Failed to end conversation {conversation['id']}: {e}")
 
 
 @app.get("/room")
@@ -158,46 +552,22 @@ async def start_agent(request: Request):
     Raises:
         HTTPException: If room creation, token generation, or bot startup fails
     """
-    print("Creating room")
-    room_url, token = await create_room_and_token()
-    print(f"Room URL: {room_url}")
-
-    # Check if there is already an existing process running in this room
-    num_bots_in_room = sum(
-        1
-        for proc in bot_procs.values()
-        if proc[1] == room_url and proc[0].poll() is None
-    )
-    if num_bots_in_room >= MAX_BOTS_PER_ROOM:
-        raise HTTPException(
-            status_code=500, detail=f"Max bot limit reached for room: {room_url}"
-        )
-
-    # Spawn a new bot process
-    try:
-        bot_file = get_bot_file()
-        # proc = subprocess.Popen(
-        #     [
-        #         f"poetry run python {bot_file} -u {room_url} -t {token}",
-        #     ],
-        #     shell=True,
-        #     bufsize=1,
-        #     cwd=ROOT_DIR,
-        # )
-        proc = subprocess.Popen(
-            [
-                str(VENV_PYTHON),  # Use precomputed Python path
-                bot_file,          # Use precomputed bot file path
-                "-u", room_url,
-                "-t", token
-            ],
-            shell=False,  # Safer and faster without shell
-            bufsize=1,
-            cwd=ROOT_DIR,
-        )
-        bot_procs[proc.pid] = (proc, room_url)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to start subprocess: {e}")
+    async with bot_slot():
+        print("Creating room")
+        room_url, token = await create_room_and_token()
+        print(f"Room URL: {room_url}")
+
+        # Check if there is already an existing process running in this room
+        if await bots_in_room(room_url) >= MAX_BOTS_PER_ROOM:
+            raise HTTPException(
+                status_code=500, detail=f"Max bot limit reached for room: {room_url}"
+            )
+
+        # Spawn a new bot process
+        try:
+            await spawn_bot(room_url, token)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to start subprocess: {e}")
 
     return RedirectResponse(room_url)
 
@@ -212,59 +582,50 @@ async def rtvi_connect(request: Request) -> Dict[Any, Any]:
         Dict[Any, Any]: Authentication bundle containing room_url and token
 
     Raises:
-        HTTPException: If room creation, token generation, or bot startup fails
+        HTTPException: If room creation, token generation, or bot startup fails,
+            or 503 if the node is at capacity
     """
-    print("Creating room for RTVI connection")
-    room_url, token = await create_room_and_token()
-    
-    # Create a new conversation record
-    conversation_id = str(uuid.uuid4())
-    conversation = {
-        "id": conversation_id,
-        "room_url": room_url,
-        "created_at": serialize_datetime(datetime.now()),
-        "contact": None,  # Initialize empty JSONB contact field
-        "status": "active"
-    }
-    await conversations_db.create(conversation)
-    print(f"Room URL: {room_url}")
-
-    # Start the bot process
-    try:
-        bot_file = get_bot_file()
-        # proc = subprocess.Popen(
-        #     [
-        #         f"poetry run python {bot_file} -u {room_url} -t {token}"
-        #     ],
-        #     shell=True,
-        #     bufsize=1,
-        #     cwd=ROOT_DIR,
-        # )
-        proc = subprocess.Popen(
-            [
-                str(VENV_PYTHON),
-                bot_file,
-                "-u", room_url,
-                "-t", token
-            ],
-            shell=False,
-            bufsize=1,
-            cwd=ROOT_DIR,
-        )
-        bot_procs[proc.pid] = (proc, room_url)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to start subprocess: {e}")
+    async with bot_slot():
+        print("Creating room for RTVI connection")
+        room_url, token = await create_room_and_token()
+
+        # Create a new conversation record
+        conversation_id = str(uuid.uuid4())
+        conversation = {
+            "id": conversation_id,
+            "room_url": room_url,
+            "created_at": serialize_datetime(datetime.now()),
+            "contact": None,  # Initialize empty JSONB contact field
+            "status": "active"
+        }
+        # The bot only needs the room credentials, so the insert runs alongside
+        # the bot start and is settled after the response is sent
+        insert = asyncio.create_task(conversations_db.create(conversation))
+        print(f"Room URL: {room_url}")
+
+        # Start the bot process
+        try:
+            proc = await spawn_bot(room_url, token, conversation_id)
+        except Exception as e:
+            run_in_background(settle_conversation(insert, None))
+            raise HTTPException(status_code=500, detail=f"Failed to start subprocess: {e}")
+
+        run_in_background(settle_conversation(insert, proc))
 
     # Return the authentication bundle in format expected by DailyTransport
     return {"room_url": room_url, "token": token}
 
 
 @app.get("/status/{pid}")
-def get_status(pid: int):
+async def get_status(pid: int, node: str = "local"):
     """Get the status of a specific bot process.
 
+    Pids are only unique per node, so bots on worker nodes are looked up with
+    ``?node=<name>``; ``/calls/{call_id}`` works for any node.
+
     Args:
         pid (int): Process ID of the bot
+        node (str): Node the bot runs on
 
     Returns:
         JSONResponse: Status information for the bot
@@ -272,18 +633,164 @@ def get_status(pid: int):
     Raises:
         HTTPException: If the specified bot process is not found
     """
-    # Look up the subprocess
-    proc = bot_procs.get(pid)
+    # Any API worker can answer for bots started by the others
+    status = (
+        await state_store.bot_status(pid, node)
+        if state_store
+        else bot_registry.status(pid, node)
+    )
 
     # If the subprocess doesn't exist, return an error
-    if not proc:
+    if not status:
         raise HTTPException(
             status_code=404, detail=f"Bot with process id: {pid} not found"
         )
+    return JSONResponse(await remote_status(status))
+
+
+@app.get("/calls/{call_id}")
+async def get_call_status(call_id: str):
+    """Get the status of a call on any node.
+
+    Args:
+        call_id (str): Call id of the bot (the conversation id for ``/connect`` calls)
 
-    # Check the status of the subprocess
-    status = "running" if proc[0].poll() is None else "finished"
-    return JSONResponse({"bot_id": pid, "status": status})
+    Returns:
+        JSONResponse: Status information for the call's bot
+
+    Raises:
+        HTTPException: If the call is not known
+    """
+    status = (
+        await state_store.call_status(call_id)
+        if state_store
+        else bot_registry.call_status(call_id)
+    )
+    if not status:
+        raise HTTPException(status_code=404, detail=f"Call {call_id} not found")
+    return JSONResponse(await remote_status(status))
+
+
+async def remote_status(status: Dict[str, Any]) -> Dict[str, Any]:
+    """Ask the agent for the live status of a call running on a worker node."""
+    node = next(
+        (node for node in scheduler.nodes if node.name == status["node"] and not node.local),
+        None,
+    )
+    if node and status["status"] == "running":
+        try:
+            return await node.call_status(status["call_id"])
+        except Exception as e:
+            print(f"Failed to get status from {node.name}: {e}")
+    return status
+
+
+@app.get("/admission")
+def get_admission():
+    """Live admission state: running bots, queue depth and admission latency."""
+    return JSONResponse(admission.stats())
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics: per-bot resource usage, call and latency histograms.
+
+    With a state store, counters, histograms and the running call count cover
+    every API worker; per-bot gauges cover the bots this worker started.
+    """
+    pids = sorted(local_bot_pids())
+    samples = {pid: read_process_stats(pid) for pid in pids}
+    samples = {pid: stats for pid, stats in samples.items() if stats}
+
+    def per_bot(key: str):
+        return [({"pid": str(pid)}, stats[key]) for pid, stats in samples.items()]
+
+    admission_stats = admission.stats()
+    write_stats = (
+        await asyncio.to_thread(write_queue.stats)
+        if write_queue
+        else {"backlog": 0, "oldest_age": 0.0, "failed": 0}
+    )
+    counters = local_counters()
+    calls_running = len(bot_registry.running())
+    if state_store:
+        counters.update(await state_store.counter_totals())
+        calls_running = await state_store.running_bots()
+    lines = [
+        *render_metric(
+            "hotline_bot_cpu_seconds_total", "counter",
+            "CPU time used by each bot process", per_bot("cpu_seconds"),
+        ),
+        *render_metric(
+            "hotline_bot_resident_memory_bytes", "gauge",
+            "Resident memory of each bot process", per_bot("rss_bytes"),
+        ),
+        *render_metric(
+            "hotline_bot_open_fds", "gauge",
+            "Open file descriptors of each bot process", per_bot("open_fds"),
+        ),
+        *render_metric(
+            "hotline_bot_threads", "gauge",
+            "Threads of each bot process", per_bot("threads"),
+        ),
+        *render_metric(
+            "hotline_calls_running", "gauge",
+            "Calls in progress", [({}, calls_running)],
+        ),
+        *render_metric(
+            "hotline_admission_queue_depth", "gauge",
+            "Callers waiting for a bot slot", [({}, admission_stats["queue_depth"])],
+        ),
+        *render_metric(
+            "hotline_admission_rejected_total", "counter",
+            "Callers turned away with 503",
+            [({}, counters["hotline_admission_rejected_total"])],
+        ),
+        *render_metric(
+            "hotline_bot_pool_idle", "gauge",
+            "Calls that can start on a warm bot worker",
+            [({}, bot_pool.idle if bot_pool else 0)],
+        ),
+        *render_metric(
+            "hotline_room_pool_ready", "gauge",
+            "Pre-created Daily rooms ready for new calls",
+            [({}, await daily_helpers["rooms"].ready() if "rooms" in daily_helpers else 0)],
+        ),
+        *render_metric(
+            "hotline_write_queue_backlog", "gauge",
+            "Conversation updates queued on this node, not yet written to Supabase",
+            [({}, write_stats["backlog"])],
+        ),
+        *render_metric(
+            "hotline_write_queue_oldest_seconds", "gauge",
+            "Age of the oldest queued conversation update",
+            [({}, write_stats["oldest_age"])],
+        ),
+        *render_metric(
+            "hotline_write_queue_failed", "gauge",
+            "Queued conversation updates parked after repeated rejections",
+            [({}, write_stats["failed"])],
+        ),
+        *render_metric(
+            "hotline_turn_saved_seconds_total", "counter",
+            "Response delay saved by adaptive end of turn against the fixed stop_secs",
+            [({}, counters["hotline_turn_saved_seconds_total"])],
+        ),
+        *render_metric(
+            "hotline_turn_added_seconds_total", "counter",
+            "Response delay added by adaptive end of turn beyond the fixed stop_secs",
+            [({}, counters["hotline_turn_added_seconds_total"])],
+        ),
+        *render_metric(
+            "hotline_false_turn_ends_total", "counter",
+            "Caller turns ended too early, the caller resumed after the bot answered",
+            [({}, counters["hotline_false_turn_ends_total"])],
+        ),
+        *(line for histogram in HISTOGRAMS for line in histogram.render(counters)),
+    ]
+    return PlainTextResponse(
+        "\n".join(lines) + "\n", media_type="text/plain; version=0.0.4"
+    )
 
 
 @app.get("/health")
@@ -0,0 +1,19 @@
+-- Create conversation_turns table, one row per transcript message
+create table if not exists conversation_turns (
+    conversation_id uuid not null references conversations(id) on delete cascade,
+    seq integer not null,
+    role text,
+    message jsonb not null,
+    created_at timestamp with time zone not null default timezone('utc'::text, now()),
+    primary key (conversation_id, seq)
+);
+
+-- Add comment to table
+comment on table conversation_turns is 'Conversation transcripts, appended message by message during the call';
+
+-- Add comments to columns
+comment on column conversation_turns.conversation_id is 'Conversation the message belongs to';
+comment on column conversation_turns.seq is 'Position of the message in the transcript, from 0; retried writes upsert on (conversation_id, seq)';
+comment on column conversation_turns.role is 'Role of the message (user, assistant, system, tool)';
+comment on column conversation_turns.message is 'The message as stored by the LLM context';
+comment on column conversation_turns.created_at is 'Timestamp when the message was recorded';
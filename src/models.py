@@ -16,3 +16,11 @@ class Conversation(TypedDict):
     contact: Optional[Contact]  # JSONB column for contact information
     status: str  # 'active' or 'ended'
     transcript: Optional[Dict]  # JSONB column storing conversation transcript
+
+class ConversationTurn(TypedDict):
+    """Type definition for conversation transcript messages"""
+    conversation_id: str
+    seq: int  # Position in the transcript, from 0
+    role: Optional[str]
+    message: Dict  # JSONB column storing the context message
+    created_at: datetime
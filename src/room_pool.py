@@ -0,0 +1,201 @@
+"""Pool of pre-provisioned Daily rooms and tokens.
+
+Creating a room and then a meeting token costs two sequential Daily REST round
+trips. ``RoomPool`` does that work ahead of time in the background, so
+``/connect`` can hand out ready credentials. Rooms are created with an expiry;
+pooled entries close to expiring are discarded rather than handed out, and an
+empty pool falls back to creating a room on demand.
+
+With a ``StateStore`` the pooled rooms live in the store, so every API worker
+draws from the same pool, and a lease lets one worker at a time refill it.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional, Tuple
+
+from loguru import logger
+from pipecat.transports.services.helpers.daily_rest import (
+    DailyRESTHelper,
+    DailyRoomParams,
+    DailyRoomProperties,
+)
+
+from src.state_store import StateStore
+
+
+@dataclass
+class PooledRoom:
+    url: str
+    token: str
+    expires_at: float  # Unix time when the room or its token expires
+
+    def ttl(self) -> float:
+        return self.expires_at - time.time()
+
+
+class RoomPool:
+    """Keeps ``size`` rooms with owner tokens ready for new calls."""
+
+    # How often the pool checks for entries about to expire
+    CHECK_INTERVAL_SECS = 60
+    # Shared pools are drained by other workers too, so they're checked more often
+    SHARED_CHECK_INTERVAL_SECS = 5
+    # Pause after a failed refill before trying again
+    RETRY_DELAY_SECS = 5
+
+    def __init__(
+        self,
+        rest: DailyRESTHelper,
+        size: int = 0,
+        room_ttl: float = 2 * 60 * 60,
+        min_ttl: float = 10 * 60,
+        concurrency: int = 4,
+        store: Optional[StateStore] = None,
+    ):
+        """
+        Args:
+            rest (DailyRESTHelper): Daily REST client
+            size (int): Number of rooms to keep ready
+            room_ttl (float): Lifetime of new rooms and tokens, in seconds
+            min_ttl (float): Rooms with less lifetime left are discarded
+            concurrency (int): Rooms created in parallel while refilling
+            store (Optional[StateStore]): Shared state holding the pooled
+                rooms, for pools shared by several API workers
+        """
+        self.rest = rest
+        self.size = max(size, 0)
+        self.room_ttl = room_ttl
+        self.min_ttl = min_ttl
+        self.concurrency = max(concurrency, 1)
+        self.store = store
+        self._rooms: Deque[PooledRoom] = deque()
+        self._wanted = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def ready(self) -> int:
+        """Number of rooms ready to hand out."""
+        if self.store:
+            return await self.store.count_rooms(time.time() + self.min_ttl)
+        return len(self._rooms)
+
+    def start(self):
+        """Start the background refill. Must be called from the event loop."""
+        if self.size and self._task is None:
+            self._task = asyncio.create_task(self._maintain())
+
+    async def close(self):
+        """Stop refilling. Unused rooms are left to expire on their own."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def acquire(self) -> Tuple[str, str]:
+        """Take a room and token, creating them on demand if the pool is empty.
+
+        Returns:
+            Tuple[str, str]: (room_url, token)
+
+        Raises:
+            ValueError: If room creation or token generation fails
+        """
+        self._wanted.set()
+        if self.store:
+            pooled = await self.store.take_room(time.time() + self.min_ttl)
+            if pooled:
+                return pooled[0], pooled[1]
+        while self._rooms:
+            room = self._rooms.popleft()
+            if room.ttl() >= self.min_ttl:
+                return room.url, room.token
+
+        room = await self.create()
+        return room.url, room.token
+
+    async def create(self) -> PooledRoom:
+        """Create a room and an owner token for it.
+
+        Raises:
+            ValueError: If room creation or token generation fails
+        """
+        expires_at = time.time() + self.room_ttl
+        room = await self.rest.create_room(
+            DailyRoomParams(properties=DailyRoomProperties(exp=expires_at))
+        )
+        if not room.url:
+            raise ValueError("Failed to create room")
+
+        token = await self.rest.get_token(room.url, self.room_ttl)
+        if not token:
+            raise ValueError(f"Failed to get token for room: {room.url}")
+
+        return PooledRoom(room.url, token, expires_at)
+
+    async def _maintain(self):
+        interval = (
+            self.SHARED_CHECK_INTERVAL_SECS if self.store else self.CHECK_INTERVAL_SECS
+        )
+        while True:
+            # Cleared before counting, so a room taken during the refill
+            # wakes the next pass instead of being lost
+            self._wanted.clear()
+
+            try:
+                refilled = await self._refill(interval)
+            except Exception:
+                # The store or the Daily API failed; the pool keeps trying
+                logger.exception("Room pool refill failed")
+                refilled = False
+            if not refilled:
+                await asyncio.sleep(self.RETRY_DELAY_SECS)
+                continue
+
+            try:
+                await asyncio.wait_for(self._wanted.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _refill(self, interval: float) -> bool:
+        """Top the pool up to ``size``.
+
+        Returns:
+            bool: False if some rooms couldn't be created
+        """
+        # Drop rooms that would expire too soon to be worth handing out
+        self._rooms = deque(room for room in self._rooms if room.ttl() >= self.min_ttl)
+
+        # A shared pool is refilled by whichever worker holds the lease
+        refill = not self.store or await self.store.acquire_lease(
+            "room_pool", 3 * interval
+        )
+        missing = self.size - await self.ready() if refill else 0
+        if missing <= 0:
+            return True
+
+        created = await self._create_many(missing)
+        for room in created:
+            if self.store:
+                await self.store.put_room(room.url, room.token, room.expires_at)
+            else:
+                self._rooms.append(room)
+        return len(created) == missing
+
+    async def _create_many(self, count: int):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def create_one() -> Optional[PooledRoom]:
+            async with semaphore:
+                try:
+                    return await self.create()
+                except Exception as e:
+                    logger.error(f"Failed to pre-create room: {e}")
+                    return None
+
+        rooms = await asyncio.gather(*(create_one() for _ in range(count)))
+        return [room for room in rooms if room]
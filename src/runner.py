@@ -30,7 +30,7 @@ async def configure(aiohttp_session: aiohttp.ClientSession):
         "--conversation-id",
         type=str,
         required=False,
-        help="Conversation ID (needed to create a conversation token for the room)",
+        help="Conversation ID of the record the bot writes contacts and the transcript to",
     )
 
     args, unknown = parser.parse_known_args()
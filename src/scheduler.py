@@ -0,0 +1,305 @@
+"""Placement of bots across worker nodes.
+
+The API server is the control plane: for each call it asks a ``BotScheduler``
+to pick a node and launch the bot there. A node is either this host
+(``LocalNode``, spawning through the local ``BotWorkerPool``) or a remote
+machine running ``src/worker_agent.py`` (``RemoteNode``, driven over HTTP).
+Remote nodes are polled for their capacity and for calls that have ended.
+
+Placement strategies:
+
+- ``least-loaded``: the node with the lowest running/capacity ratio, which
+  spreads calls evenly
+- ``bin-packing``: the fullest node that still has room, which keeps whole
+  nodes idle so they can be scaled down
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+import aiohttp
+from loguru import logger
+
+from src.bot_pool import BotHandle, BotWorkerPool
+
+
+class RemoteBot:
+    """Handle for a bot running on a ``RemoteNode``.
+
+    Offers the same ``pid``/``poll()``/``terminate()``/``kill()``/``wait()``
+    surface as local bots. ``returncode`` is filled in when the node reports
+    the call as finished.
+    """
+
+    def __init__(self, node: "RemoteNode", pid: int, call_id: str):
+        self.node = node
+        self.pid = pid
+        self.call_id = call_id
+        self.returncode: Optional[int] = None
+        self.launched_at = time.monotonic()
+
+    def poll(self) -> Optional[int]:
+        return self.returncode
+
+    def terminate(self):
+        if self.returncode is None:
+            task = asyncio.create_task(self.node.kill(self.call_id))
+            self.node.pending.add(task)
+            task.add_done_callback(self.node.pending.discard)
+
+    kill = terminate
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        # The remote node owns the process; there is nothing to wait on here
+        return self.returncode
+
+
+class WorkerNode(ABC):
+    """A machine that can run bots."""
+
+    local = False
+
+    def __init__(self, name: str, capacity: int = 0):
+        """
+        Args:
+            name (str): Node name used in logs and status responses
+            capacity (int): Maximum concurrent calls (0 = unlimited)
+        """
+        self.name = name
+        self.capacity = capacity
+        self.healthy = True
+
+    @property
+    @abstractmethod
+    def running(self) -> int:
+        """Number of calls running on the node."""
+
+    @property
+    def free(self) -> float:
+        if not self.capacity:
+            return float("inf")
+        return self.capacity - self.running
+
+    @property
+    def utilization(self) -> float:
+        if not self.capacity:
+            return 0.0
+        return self.running / self.capacity
+
+    @abstractmethod
+    async def launch(
+        self, call_id: str, room_url: str, token: str, conversation_id: Optional[str]
+    ) -> BotHandle:
+        """Start a bot for the call on the node."""
+
+    async def refresh(self):
+        """Update capacity and finished calls from the node."""
+        pass
+
+
+class LocalNode(WorkerNode):
+    """Runs bots on this host through the local worker pool."""
+
+    local = True
+
+    def __init__(
+        self, pool: BotWorkerPool, running: Callable[[], int], capacity: int = 0
+    ):
+        """
+        Args:
+            pool (BotWorkerPool): Local bot worker pool
+            running (Callable[[], int]): Returns the number of local calls running
+            capacity (int): Maximum concurrent calls (0 = unlimited)
+        """
+        super().__init__("local", capacity)
+        self.pool = pool
+        self._running = running
+
+    @property
+    def running(self) -> int:
+        return self._running()
+
+    async def launch(
+        self, call_id: str, room_url: str, token: str, conversation_id: Optional[str]
+    ) -> BotHandle:
+        return await self.pool.launch(call_id, room_url, token, conversation_id)
+
+
+class RemoteNode(WorkerNode):
+    """A bot host running ``src/worker_agent.py``."""
+
+    def __init__(
+        self,
+        url: str,
+        session: aiohttp.ClientSession,
+        auth_token: Optional[str] = None,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        timeout: float = 10.0,
+    ):
+        """
+        Args:
+            url (str): Base URL of the worker agent
+            session (aiohttp.ClientSession): HTTP session for agent requests
+            auth_token (Optional[str]): Shared secret expected by the agent
+            on_event (Optional[Callable[[Dict[str, Any]], None]]): Receives a
+                ``finished`` event for each call the node reports as ended
+            timeout (float): Seconds an agent request may take
+        """
+        super().__init__(url.rstrip("/"))
+        self.url = url.rstrip("/")
+        self.session = session
+        self.headers = {"Authorization": f"Bearer {auth_token}"} if auth_token else {}
+        self.on_event = on_event
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.calls: Dict[str, RemoteBot] = {}
+        # Kill requests in flight, kept referenced until they complete
+        self.pending = set()
+
+    @property
+    def running(self) -> int:
+        return len(self.calls)
+
+    async def launch(
+        self, call_id: str, room_url: str, token: str, conversation_id: Optional[str]
+    ) -> BotHandle:
+        response = await self._request(
+            "POST",
+            "/spawn",
+            json={
+                "call_id": call_id,
+                "room_url": room_url,
+                "token": token,
+                "conversation_id": conversation_id,
+            },
+        )
+        bot = RemoteBot(self, response["pid"], call_id)
+        self.calls[call_id] = bot
+        return bot
+
+    async def kill(self, call_id: str):
+        try:
+            await self._request("POST", f"/kill/{call_id}")
+        except Exception as e:
+            logger.error(f"Failed to stop call {call_id} on {self.name}: {e}")
+
+    async def call_status(self, call_id: str) -> Dict[str, Any]:
+        return await self._request("GET", f"/calls/{call_id}")
+
+    async def refresh(self):
+        requested_at = time.monotonic()
+        try:
+            report = await self._request("GET", "/capacity")
+        except Exception as e:
+            if self.healthy:
+                logger.warning(f"Worker node {self.name} is unreachable: {e}")
+            self.healthy = False
+            return
+
+        # A draining node finishes its calls but takes no new ones
+        self.healthy = not report.get("draining", False)
+        self.capacity = report["capacity"]
+        running = set(report["running"])
+        ended = [
+            call_id
+            for call_id, bot in self.calls.items()
+            # Calls launched after the report was requested may not be in it yet
+            if call_id not in running and bot.launched_at < requested_at
+        ]
+        for call_id in ended:
+            bot = self.calls.pop(call_id)
+            bot.returncode = report["finished"].get(call_id, 0)
+            if self.on_event:
+                self.on_event(
+                    {"event": "finished", "call_id": call_id, "exit_code": bot.returncode}
+                )
+
+    async def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        async with self.session.request(
+            method, f"{self.url}{path}", headers=self.headers, timeout=self.timeout, **kwargs
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
+
+class PlacementStrategy(ABC):
+    @abstractmethod
+    def choose(self, nodes: List[WorkerNode]) -> Optional[WorkerNode]:
+        """Pick a node for the next call from nodes that have room."""
+
+
+class LeastLoadedStrategy(PlacementStrategy):
+    """Spread calls evenly: pick the node with the lowest utilization."""
+
+    def choose(self, nodes: List[WorkerNode]) -> Optional[WorkerNode]:
+        return min(nodes, key=lambda node: (node.utilization, node.running), default=None)
+
+
+class BinPackingStrategy(PlacementStrategy):
+    """Fill nodes up one at a time: pick the fullest node that still has room."""
+
+    def choose(self, nodes: List[WorkerNode]) -> Optional[WorkerNode]:
+        return max(nodes, key=lambda node: (node.utilization, node.running), default=None)
+
+
+STRATEGIES = {
+    "least-loaded": LeastLoadedStrategy,
+    "bin-packing": BinPackingStrategy,
+}
+
+
+class BotScheduler:
+    """Chooses a node for each call and keeps remote node state current."""
+
+    # How often remote nodes are polled for capacity and finished calls
+    REFRESH_SECS = 2.0
+
+    def __init__(self, nodes: List[WorkerNode], strategy: PlacementStrategy):
+        self.nodes = nodes
+        self.strategy = strategy
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start polling remote nodes. Must be called from the event loop."""
+        if any(not node.local for node in self.nodes):
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def launch(
+        self,
+        call_id: str,
+        room_url: str,
+        token: str,
+        conversation_id: Optional[str] = None,
+    ) -> BotHandle:
+        """Place the call on a node and start its bot.
+
+        Raises:
+            RuntimeError: If no healthy node has room for another call
+        """
+        candidates = [node for node in self.nodes if node.healthy and node.free > 0]
+        while candidates:
+            node = self.strategy.choose(candidates)
+            logger.debug(f"Placing call {call_id} on {node.name}")
+            try:
+                return await node.launch(call_id, room_url, token, conversation_id)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # Skip the node until its next successful refresh
+                logger.error(f"Failed to launch bot on {node.name}: {e}")
+                node.healthy = False
+                candidates.remove(node)
+        raise RuntimeError("No worker node has capacity for another bot")
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.gather(*(node.refresh() for node in self.nodes))
+            await asyncio.sleep(self.REFRESH_SECS)
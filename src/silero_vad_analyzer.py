@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+from importlib import resources
+from typing import Dict
+
+import numpy as np
+from loguru import logger
+
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
+
+try:
+    import onnxruntime
+except ModuleNotFoundError as e:
+    logger.error(f"Exception: {e}")
+    logger.error("You need to install `onnxruntime` to use Silero VAD. Please run `pip install onnxruntime`.")
+    raise Exception(f"Missing module(s): {e}")
+
+# Model shipped with pipecat
+MODEL_PACKAGE = "pipecat.audio.vad.data"
+MODEL_NAME = "silero_vad.onnx"
+
+# Threads each ONNX session may use. Every call in a process shares the
+# session, so these bound the VAD's CPU use instead of one pool per call.
+INTRA_OP_THREADS = int(os.getenv("SILERO_INTRA_OP_THREADS", "1"))
+INTER_OP_THREADS = int(os.getenv("SILERO_INTER_OP_THREADS", "1"))
+
+# Stream state is reset this often, like pipecat's analyzer, so it doesn't
+# drift over long calls
+STATE_RESET_SECS = 5.0
+
+
+class SileroModel:
+    """A Silero ONNX session for one sample rate, shared by many streams.
+
+    The session holds no per-stream state (the recurrent state and audio
+    context are inputs and outputs of each run), and ``InferenceSession.run``
+    is thread-safe, so analyzers of different calls can use it at once.
+    """
+
+    def __init__(self, sample_rate: int):
+        """
+        Args:
+            sample_rate (int): 8000 or 16000
+        """
+        if sample_rate not in (8000, 16000):
+            raise ValueError("Silero VAD requires a sample rate of 8000 or 16000 Hz")
+        self.sample_rate = sample_rate
+        self.num_samples = 512 if sample_rate == 16000 else 256
+        self.context_size = 64 if sample_rate == 16000 else 32
+        self._sr = np.array(sample_rate, dtype=np.int64)
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = INTRA_OP_THREADS
+        options.inter_op_num_threads = INTER_OP_THREADS
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        path = str(resources.files(MODEL_PACKAGE).joinpath(MODEL_NAME))
+        self._session = onnxruntime.InferenceSession(
+            path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+    def run(self, audio: np.ndarray, state: np.ndarray):
+        """Score one frame (with its context samples prepended).
+
+        Returns:
+            tuple: (speech probability, next recurrent state)
+        """
+        out, state = self._session.run(
+            None, {"input": audio, "state": state, "sr": self._sr}
+        )
+        return float(out[0][0]), state
+
+
+_models: Dict[int, SileroModel] = {}
+_models_lock = threading.Lock()
+
+
+def get_silero_model(sample_rate: int) -> SileroModel:
+    """The process-wide model for a sample rate, created on first use.
+
+    Args:
+        sample_rate (int): 8000 or 16000
+
+    Returns:
+        SileroModel: The shared model
+    """
+    model = _models.get(sample_rate)
+    if model is None:
+        with _models_lock:
+            model = _models.get(sample_rate)
+            if model is None:
+                logger.debug(f"Loading Silero VAD model for {sample_rate} Hz...")
+                model = _models[sample_rate] = SileroModel(sample_rate)
+                logger.debug("Loaded Silero VAD")
+    return model
+
+
+class SileroVADAnalyzer(VADAnalyzer):
+    """Silero voice activity detection on a session shared by the process.
+
+    Only the recurrent state and the trailing context samples belong to the
+    analyzer; the ONNX session and its thread pools come from
+    ``get_silero_model()``.
+    """
+
+    def __init__(self, *, sample_rate: int = 16000, params: VADParams = VADParams()):
+        # set_params() in the base class asks num_frames_required() of the model
+        self._model = get_silero_model(sample_rate)
+        super().__init__(sample_rate=sample_rate, num_channels=1, params=params)
+        # Context samples followed by the frame, reused for every frame
+        self._input = np.zeros(
+            (1, self._model.context_size + self._model.num_samples), dtype=np.float32
+        )
+        self._reset_state()
+
+    def num_frames_required(self) -> int:
+        return self._model.num_samples
+
+    def voice_confidence(self, buffer) -> float:
+        try:
+            context_size = self._model.context_size
+            audio = np.frombuffer(buffer, dtype=np.int16)
+            self._input[0, context_size:] = audio
+            self._input[0, context_size:] *= 1 / 32768
+            confidence, self._state = self._model.run(self._input, self._state)
+            self._input[0, :context_size] = self._input[0, -context_size:]
+
+            if time.time() - self._last_reset_time >= STATE_RESET_SECS:
+                self._reset_state()
+            return confidence
+        except Exception as e:
+            logger.error(f"Error analyzing audio with Silero VAD: {e}")
+            return 0.0
+
+    def skip_frame(self, buffer):
+        """Advance the audio context over a frame the model doesn't score.
+
+        Used by ``CascadedVADAnalyzer`` so the next scored frame is preceded
+        by the samples that really came before it.
+        """
+        context_size = self._model.context_size
+        audio = np.frombuffer(buffer, dtype=np.int16)[-context_size:]
+        self._input[0, :context_size] = audio
+        self._input[0, :context_size] *= 1 / 32768
+
+    def _reset_state(self):
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._input[0, : self._model.context_size] = 0
+        self._last_reset_time = time.time()
@@ -0,0 +1,208 @@
+"""Avatar sprite frames backed by a memory-mapped atlas.
+
+Decoding the robot PNGs with PIL takes time and leaves every bot process with
+its own ~22 MB copy of identical raw frames. Instead, the frames are decoded
+once at build time into ``assets/robot.atlas``::
+
+    python src/sprites.py
+
+The atlas starts with ``MAGIC``, a little-endian u32 length and a JSON index
+of ``{"offset", "length", "size", "format"}`` per frame, followed by the raw
+frame bytes. Offsets are relative to the first aligned byte after the index.
+Bots map the atlas read-only and copy each frame out as ``bytes``, which is
+what the output transport is known to accept; that's a memcpy per frame
+instead of a PNG decode.
+
+Atlases can be built pre-scaled to the camera size (``--size 1024x576``,
+written to ``assets/robot-1024x576.atlas``), so the output transport never has
+to resize a frame. Nothing rebuilds them when the camera size changes, so an
+up-to-date atlas whose frames don't have the requested size is an error.
+Without an atlas (or with PNGs newer than it) the frames are decoded from the
+PNGs, and resized if needed.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from loguru import logger
+from pipecat.frames.frames import OutputImageRawFrame, SpriteFrame
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
+ATLAS_FILE = os.path.join(ASSETS_DIR, "robot.atlas")
+SPRITE_FILES = [os.path.join(ASSETS_DIR, f"robot0{i}.png") for i in range(1, 26)]
+
+MAGIC = b"SPRITES1"
+# Frame data starts on a cache-line boundary
+ALIGNMENT = 64
+
+
+def atlas_path_for(size: Optional[Tuple[int, int]] = None) -> str:
+    """Atlas file for sprites scaled to ``size``, or at their own size if None."""
+    if size is None:
+        return ATLAS_FILE
+    width, height = size
+    return os.path.join(ASSETS_DIR, f"robot-{width}x{height}.atlas")
+
+
+def build_atlas(
+    paths: List[str] = SPRITE_FILES,
+    atlas_path: Optional[str] = None,
+    size: Optional[Tuple[int, int]] = None,
+):
+    """Decode the sprite PNGs and pack the raw frames into an atlas file.
+
+    Args:
+        paths (List[str]): Sprite images, in animation order
+        atlas_path (Optional[str]): Atlas file to write, by default the one for ``size``
+        size (Optional[Tuple[int, int]]): Scale frames to this (width, height)
+    """
+    atlas_path = atlas_path or atlas_path_for(size)
+    frames = [_decode(path, size) for path in paths]
+
+    index = []
+    offset = 0
+    for data, size, format in frames:
+        index.append(
+            {"offset": offset, "length": len(data), "size": list(size), "format": format}
+        )
+        offset = _align(offset + len(data))
+
+    header = json.dumps(index).encode()
+    data_start = _align(len(MAGIC) + 4 + len(header))
+
+    tmp_path = f"{atlas_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for entry, (data, _, _) in zip(index, frames):
+            f.seek(data_start + entry["offset"])
+            f.write(data)
+    os.replace(tmp_path, atlas_path)
+
+
+def load_sprites(
+    paths: List[str] = SPRITE_FILES, size: Optional[Tuple[int, int]] = None
+) -> List[OutputImageRawFrame]:
+    """Load the sprite frames, from an atlas when one is up to date.
+
+    Args:
+        paths (List[str]): Sprite images, in animation order
+        size (Optional[Tuple[int, int]]): (width, height) the frames must have
+
+    Returns:
+        List[OutputImageRawFrame]: One frame per sprite, in animation order
+
+    Raises:
+        ValueError: If the up-to-date atlases hold frames of another size
+    """
+    mismatched = []
+    for atlas_path in dict.fromkeys([atlas_path_for(size), ATLAS_FILE]):
+        if _atlas_is_current(paths, atlas_path):
+            sprites = _map_atlas(atlas_path)
+            if size is None or all(sprite.size == size for sprite in sprites):
+                return sprites
+            mismatched.append(atlas_path)
+
+    if mismatched:
+        width, height = size
+        raise ValueError(
+            f"{', '.join(mismatched)} has no {width}x{height} frames; "
+            f"run `python src/sprites.py --size {width}x{height}`"
+        )
+
+    logger.warning(
+        f"No up-to-date {atlas_path_for(size)}, decoding sprites (run src/sprites.py)"
+    )
+    return [
+        OutputImageRawFrame(image=data, size=frame_size, format=format)
+        for data, frame_size, format in (_decode(path, size) for path in paths)
+    ]
+
+
+@lru_cache(maxsize=None)
+def load_sprite_frames(
+    size: Optional[Tuple[int, int]] = None,
+) -> Tuple[OutputImageRawFrame, SpriteFrame]:
+    """The listening frame and the talking animation, loaded once per process.
+
+    Args:
+        size (Optional[Tuple[int, int]]): (width, height) the frames must have
+
+    Returns:
+        Tuple[OutputImageRawFrame, SpriteFrame]: (quiet_frame, talking_frame)
+    """
+    sprites = load_sprites(size=size)
+    # Create a smooth animation by adding reversed frames
+    sprites.extend(sprites[::-1])
+    return sprites[0], SpriteFrame(images=sprites)
+
+
+def _decode(path: str, size: Optional[Tuple[int, int]] = None):
+    from PIL import Image
+
+    with Image.open(path) as img:
+        # Frames keep the PNG's format name, as they always have
+        format = img.format
+        if size and img.size != size:
+            img = img.resize(size)
+        return img.tobytes(), img.size, format
+
+
+def _map_atlas(atlas_path: str) -> List[OutputImageRawFrame]:
+    with open(atlas_path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as atlas:
+        if atlas[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{atlas_path} is not a sprite atlas")
+        (header_length,) = struct.unpack_from("<I", atlas, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        index = json.loads(atlas[header_start : header_start + header_length])
+        data_start = _align(header_start + header_length)
+
+        sprites = []
+        for entry in index:
+            start = data_start + entry["offset"]
+            sprites.append(
+                OutputImageRawFrame(
+                    image=atlas[start : start + entry["length"]],
+                    size=tuple(entry["size"]),
+                    format=entry["format"],
+                )
+            )
+        return sprites
+
+
+def _atlas_is_current(paths: List[str], atlas_path: str) -> bool:
+    try:
+        built_at = os.stat(atlas_path).st_mtime
+    except FileNotFoundError:
+        return False
+    return all(os.stat(path).st_mtime <= built_at for path in paths)
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _parse_size(value: str) -> Tuple[int, int]:
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the sprite atlas")
+    parser.add_argument(
+        "--size",
+        type=_parse_size,
+        action="append",
+        help="Also build an atlas scaled to WIDTHxHEIGHT (repeatable)",
+    )
+    args = parser.parse_args()
+    for size in [None, *(args.size or [])]:
+        build_atlas(size=size)
+        print(f"Wrote {len(SPRITE_FILES)} frames to {atlas_path_for(size)}", file=sys.stderr)
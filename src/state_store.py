@@ -0,0 +1,381 @@
+"""Control-plane state shared between API worker processes.
+
+Each uvicorn worker has its own event loop, bot registry and room pool. To run
+the API with several workers, the state every worker needs is kept in a
+``StateStore``:
+
+- bots: one row per call, so any worker can answer ``/status/{pid}`` and
+  ``/calls/{call_id}`` and count the bots in a room for ``MAX_BOTS_PER_ROOM``
+- rooms: the pre-created Daily rooms, so the workers share one room pool
+- leases: so only one worker at a time refills the room pool
+
+- counters: each worker's metric totals, so ``/metrics`` reports the node
+
+The worker that started a bot still owns its process: it reaps the bot and
+records the result in the store. ``SQLiteStateStore`` keeps the state in a
+SQLite database in WAL mode, where readers in every worker carry on while one
+worker writes. Its queries run on a thread of their own, since a write can
+wait up to the busy timeout for another worker's lock.
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+class StateStore(ABC):
+    """Interface for state shared by the API workers on a node.
+
+    ``add_bot`` and ``finish_bot`` are called from process exit callbacks, so
+    they queue the write and return at once; queued writes are applied in
+    order. Everything else is a coroutine.
+    """
+
+    @abstractmethod
+    def add_bot(
+        self,
+        call_id: str,
+        pid: int,
+        room_url: str,
+        conversation_id: Optional[str] = None,
+        node: str = "local",
+    ):
+        """Record a newly launched bot."""
+
+    @abstractmethod
+    def finish_bot(self, call_id: str, exit_code: Optional[int] = None):
+        """Record that a call finished."""
+
+    @abstractmethod
+    async def bots_in_room(self, room_url: str) -> int:
+        """Number of bots currently running in the room."""
+
+    @abstractmethod
+    async def running_bots(self) -> int:
+        """Number of calls in progress across all workers."""
+
+    @abstractmethod
+    async def bot_status(self, pid: int, node: str = "local") -> Optional[Dict[str, Any]]:
+        """Status of a bot process on a node for ``/status/{pid}``, or None if unknown."""
+
+    @abstractmethod
+    async def call_status(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a call for ``/calls/{call_id}``, or None if unknown."""
+
+    @abstractmethod
+    async def orphaned_bots(self) -> List[Dict[str, Any]]:
+        """Calls still marked running whose owning worker is gone.
+
+        Their bots may outlive the worker; finish them with ``finish_bot``
+        once they have exited.
+
+        Returns:
+            List[Dict[str, Any]]: ``call_id``, ``pid``, ``node`` and
+                ``started_at`` of each call
+        """
+
+    @abstractmethod
+    async def put_room(self, url: str, token: str, expires_at: float):
+        """Add a pre-created room to the shared pool."""
+
+    @abstractmethod
+    async def take_room(self, min_expires_at: float) -> Optional[Tuple[str, str, float]]:
+        """Claim a pooled room that expires no earlier than ``min_expires_at``.
+
+        Rooms expiring sooner are discarded.
+
+        Returns:
+            Optional[Tuple[str, str, float]]: (url, token, expires_at), or None
+                if the pool is empty
+        """
+
+    @abstractmethod
+    async def count_rooms(self, min_expires_at: float) -> int:
+        """Number of pooled rooms that expire no earlier than ``min_expires_at``."""
+
+    @abstractmethod
+    async def acquire_lease(self, name: str, ttl: float) -> bool:
+        """Take or renew a named lease for this worker.
+
+        Returns:
+            bool: True if this worker holds the lease for the next ``ttl`` seconds
+        """
+
+    @abstractmethod
+    async def publish_counters(self, values: Dict[str, float]):
+        """Record this worker's current counter totals, keyed by series."""
+
+    @abstractmethod
+    async def counter_totals(self) -> Dict[str, float]:
+        """Counter totals summed over every worker, including exited ones."""
+
+    async def close(self):
+        pass
+
+
+class SQLiteStateStore(StateStore):
+    """``StateStore`` backed by a SQLite database in WAL mode.
+
+    Suitable for the workers of one node; every worker opens the same file.
+    Queries run one at a time on the store's own thread, which also keeps
+    the queued bot writes in order.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS bots (
+            call_id TEXT PRIMARY KEY,
+            pid INTEGER NOT NULL,
+            room_url TEXT NOT NULL,
+            conversation_id TEXT,
+            node TEXT NOT NULL,
+            owner INTEGER NOT NULL,
+            started_at REAL NOT NULL,
+            ended_at REAL,
+            exit_code INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS bots_pid ON bots (pid, started_at);
+        CREATE INDEX IF NOT EXISTS bots_node_pid ON bots (node, pid, started_at);
+        CREATE INDEX IF NOT EXISTS bots_running_room ON bots (room_url)
+            WHERE ended_at IS NULL;
+        CREATE INDEX IF NOT EXISTS bots_ended ON bots (ended_at);
+        CREATE TABLE IF NOT EXISTS rooms (
+            url TEXT PRIMARY KEY,
+            token TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            owner INTEGER NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS counters (
+            owner INTEGER NOT NULL,
+            series TEXT NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (owner, series)
+        );
+    """
+
+    def __init__(self, path: str, history_size: int = 1000):
+        """
+        Args:
+            path (str): Database file shared by the workers
+            history_size (int): Number of finished calls kept for status lookups
+        """
+        self.path = path
+        self.history_size = history_size
+        self.owner = os.getpid()
+        # Autocommit; multi-statement updates use explicit transactions
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.executescript(self.SCHEMA)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="state-store")
+
+    def add_bot(
+        self,
+        call_id: str,
+        pid: int,
+        room_url: str,
+        conversation_id: Optional[str] = None,
+        node: str = "local",
+    ):
+        self._submit(
+            self._db.execute,
+            "INSERT OR REPLACE INTO bots "
+            "(call_id, pid, room_url, conversation_id, node, owner, started_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (call_id, pid, room_url, conversation_id, node, self.owner, time.time()),
+        )
+
+    def finish_bot(self, call_id: str, exit_code: Optional[int] = None):
+        self._submit(self._finish_bot, call_id, exit_code, time.time())
+
+    async def bots_in_room(self, room_url: str) -> int:
+        return await self._run(
+            self._count, "SELECT COUNT(*) FROM bots WHERE room_url = ? AND ended_at IS NULL",
+            (room_url,),
+        )
+
+    async def running_bots(self) -> int:
+        return await self._run(self._count, "SELECT COUNT(*) FROM bots WHERE ended_at IS NULL")
+
+    async def bot_status(self, pid: int, node: str = "local") -> Optional[Dict[str, Any]]:
+        # Pids are only unique per node
+        rows = await self._run(
+            self._fetchall,
+            "SELECT call_id, pid, node, started_at, ended_at, exit_code FROM bots "
+            "WHERE node = ? AND pid = ? ORDER BY started_at DESC",
+            (node, pid),
+        )
+        if not rows:
+            return None
+        # A bot host can serve several calls; report on the most recent one
+        running = any(row[4] is None for row in rows)
+        return {
+            **self._status(rows[0]),
+            "status": "running" if running else "finished",
+        }
+
+    async def call_status(self, call_id: str) -> Optional[Dict[str, Any]]:
+        rows = await self._run(
+            self._fetchall,
+            "SELECT call_id, pid, node, started_at, ended_at, exit_code FROM bots "
+            "WHERE call_id = ?",
+            (call_id,),
+        )
+        return self._status(rows[0]) if rows else None
+
+    async def orphaned_bots(self) -> List[Dict[str, Any]]:
+        rows = await self._run(
+            self._fetchall,
+            "SELECT call_id, pid, node, started_at, owner FROM bots WHERE ended_at IS NULL",
+        )
+        return [
+            {"call_id": call_id, "pid": pid, "node": node, "started_at": started_at}
+            for call_id, pid, node, started_at, owner in rows
+            if owner != self.owner and not _process_exists(owner)
+        ]
+
+    async def put_room(self, url: str, token: str, expires_at: float):
+        await self._run(
+            self._db.execute,
+            "INSERT OR REPLACE INTO rooms (url, token, expires_at) VALUES (?, ?, ?)",
+            (url, token, expires_at),
+        )
+
+    async def take_room(self, min_expires_at: float) -> Optional[Tuple[str, str, float]]:
+        return await self._run(self._take_room, min_expires_at)
+
+    async def count_rooms(self, min_expires_at: float) -> int:
+        return await self._run(
+            self._count, "SELECT COUNT(*) FROM rooms WHERE expires_at >= ?", (min_expires_at,)
+        )
+
+    async def acquire_lease(self, name: str, ttl: float) -> bool:
+        now = time.time()
+        cursor = await self._run(
+            self._db.execute,
+            "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, "
+            "expires_at = excluded.expires_at "
+            "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+            (name, self.owner, now + ttl, now),
+        )
+        return cursor.rowcount > 0
+
+    async def publish_counters(self, values: Dict[str, float]):
+        await self._run(self._publish_counters, values)
+
+    async def counter_totals(self) -> Dict[str, float]:
+        rows = await self._run(
+            self._fetchall, "SELECT series, SUM(value) FROM counters GROUP BY series"
+        )
+        return dict(rows)
+
+    async def close(self):
+        """Apply the queued writes, then close the database."""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        self._db.close()
+
+    async def _run(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method, *args)
+
+    def _submit(self, method, *args):
+        self._executor.submit(method, *args).add_done_callback(_log_failure)
+
+    def _count(self, query: str, params: tuple = ()) -> int:
+        (count,) = self._db.execute(query, params).fetchone()
+        return count
+
+    def _fetchall(self, query: str, params: tuple = ()) -> List[tuple]:
+        return self._db.execute(query, params).fetchall()
+
+    def _finish_bot(self, call_id: str, exit_code: Optional[int], ended_at: float):
+        self._db.execute(
+            "UPDATE bots SET ended_at = ?, exit_code = ? "
+            "WHERE call_id = ? AND ended_at IS NULL",
+            (ended_at, exit_code, call_id),
+        )
+        self._db.execute(
+            "DELETE FROM bots WHERE ended_at <= ("
+            "SELECT ended_at FROM bots WHERE ended_at IS NOT NULL "
+            "ORDER BY ended_at DESC LIMIT 1 OFFSET ?)",
+            (self.history_size,),
+        )
+
+    def _take_room(self, min_expires_at: float) -> Optional[Tuple[str, str, float]]:
+        # The write lock makes the claim atomic across workers
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.execute("DELETE FROM rooms WHERE expires_at < ?", (min_expires_at,))
+            row = self._db.execute(
+                "SELECT url, token, expires_at FROM rooms ORDER BY expires_at LIMIT 1"
+            ).fetchone()
+            if row:
+                self._db.execute("DELETE FROM rooms WHERE url = ?", (row[0],))
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return row
+
+    def _publish_counters(self, values: Dict[str, float]):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO counters (owner, series, value) VALUES (?, ?, ?)",
+                [(self.owner, series, value) for series, value in values.items()],
+            )
+            # Totals of exited workers are kept, folded into owner 0, so the
+            # node's counters never go backwards
+            for (owner,) in self._db.execute(
+                "SELECT DISTINCT owner FROM counters WHERE owner NOT IN (0, ?)", (self.owner,)
+            ).fetchall():
+                if not _process_exists(owner):
+                    self._db.execute(
+                        "INSERT INTO counters (owner, series, value) "
+                        "SELECT 0, series, value FROM counters WHERE owner = ? "
+                        "ON CONFLICT (owner, series) DO UPDATE "
+                        "SET value = value + excluded.value",
+                        (owner,),
+                    )
+                    self._db.execute("DELETE FROM counters WHERE owner = ?", (owner,))
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _status(row: tuple) -> Dict[str, Any]:
+        call_id, pid, node, started_at, ended_at, exit_code = row
+        return {
+            "bot_id": pid,
+            "call_id": call_id,
+            "node": node,
+            "status": "running" if ended_at is None else "finished",
+            "exit_code": exit_code,
+            "duration": round((ended_at or time.time()) - started_at, 3),
+        }
+
+
+def _process_exists(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _log_failure(future: Future):
+    if not future.cancelled() and future.exception():
+        logger.error(f"State store write failed: {future.exception()}")
@@ -1,13 +1,154 @@
-from typing import Any, Dict, List, Optional, TypeVar, Generic
-from supabase import AsyncClient, create_client
+import asyncio
+import json
 import os
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar, Generic
+
+import httpx
 from dotenv import load_dotenv
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+from postgrest.exceptions import APIError
+from postgrest.types import CountMethod, ReturnMethod
 
 # Load environment variables
 load_dotenv()
 
 T = TypeVar('T')
 
+# HTTP settings of the shared PostgREST connection pool
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "10"))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+SUPABASE_HTTP2 = os.getenv("SUPABASE_HTTP2", "true").lower() == "true"
+
+# Rows per request and requests in flight for bulk writes
+SUPABASE_BULK_CHUNK_SIZE = int(os.getenv("SUPABASE_BULK_CHUNK_SIZE", "500"))
+SUPABASE_BULK_CONCURRENCY = int(os.getenv("SUPABASE_BULK_CONCURRENCY", "4"))
+
+# Retries of a bulk chunk that failed transiently, and the first retry delay
+BULK_RETRIES = 2
+BULK_RETRY_DELAY_SECS = 0.5
+
+# PostgreSQL error classes worth retrying: connection exceptions, transaction
+# rollbacks (serialization failures, deadlocks), insufficient resources,
+# lock timeouts, operator intervention (e.g. statement timeouts), system and
+# internal errors
+TRANSIENT_SQLSTATES = ("08", "40", "53", "55P03", "57", "58", "XX")
+
+
+def is_permanent_error(error: BaseException) -> bool:
+    """
+    Whether a failed request would fail again if sent unchanged.
+    
+    Requests PostgREST rejected (4xx: constraint violations, unknown columns,
+    invalid input) are permanent. Timeouts, connection errors, 5xx responses
+    and the database errors in ``TRANSIENT_SQLSTATES`` are transient, and so
+    is anything unrecognised. The errors this module wraps are unwrapped.
+    
+    Args:
+        error (BaseException): Error raised by a request
+        
+    Returns:
+        bool: True if retrying the same request is pointless
+    """
+    while error is not None and not isinstance(error, APIError):
+        error = error.__cause__
+    if error is None or not error.code:
+        return False
+    code = str(error.code)
+    if code.isdigit() and len(code) == 3:
+        # An error response without a PostgREST body carries the HTTP status
+        return 400 <= int(code) < 500 and int(code) not in (408, 429)
+    if code.startswith("PGRST0"):
+        # PostgREST couldn't reach the database
+        return False
+    return not code.startswith(TRANSIENT_SQLSTATES)
+
+
+@dataclass
+class BulkResult(Generic[T]):
+    """
+    Outcome of a bulk write.
+    
+    Attributes:
+        written (int): Rows the database reports as written
+        records (List[T]): Written records, if they were asked for
+        failed (List[Tuple[Dict[str, Any], str]]): Rows that could not be
+            written, with the error for each
+    """
+    written: int = 0
+    records: List[T] = field(default_factory=list)
+    failed: List[Tuple[Dict[str, Any], str]] = field(default_factory=list)
+
+
+class PooledPostgrestClient(AsyncPostgrestClient):
+    """Async PostgREST client whose HTTP session has explicit pool limits."""
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            http2=SUPABASE_HTTP2,
+            limits=httpx.Limits(
+                max_connections=SUPABASE_MAX_CONNECTIONS,
+                max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
+                keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+            ),
+            follow_redirects=True,
+        )
+
+
+# One client per event loop, since pooled connections belong to the loop
+# that opened them
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, PooledPostgrestClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_postgrest_client() -> PooledPostgrestClient:
+    """
+    The shared PostgREST client of the running event loop, created on first use.
+    
+    Returns:
+        PooledPostgrestClient: Client for the Supabase REST API
+        
+    Raises:
+        ValueError: If SUPABASE_URL or SUPABASE_KEY is not set
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        supabase_url = os.getenv("SUPABASE_URL")
+        supabase_key = os.getenv("SUPABASE_KEY")
+        
+        if not supabase_url or not supabase_key:
+            raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
+        
+        client = _clients[loop] = PooledPostgrestClient(
+            f"{supabase_url.rstrip('/')}/rest/v1",
+            headers={
+                **DEFAULT_POSTGREST_CLIENT_HEADERS,
+                "apiKey": supabase_key,
+                "Authorization": f"Bearer {supabase_key}",
+            },
+            timeout=SUPABASE_TIMEOUT,
+        )
+    return client
+
+
+async def close_postgrest_client():
+    """Close the running event loop's shared client and its connections."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client:
+        await client.aclose()
+
+
 class SupabaseInterface(Generic[T]):
     """
     A generic interface for Supabase CRUD operations.
@@ -15,20 +156,25 @@ class SupabaseInterface(Generic[T]):
     
     def __init__(self, table_name: str):
         """
-        Initialize Supabase client and set table name.
+        Set the table name. Requests go through the process's shared, pooled
+        async client (see ``get_postgrest_client``), so they don't block the
+        event loop and reuse keep-alive connections.
         
         Args:
             table_name (str): Name of the table to perform operations on
+            
+        Raises:
+            ValueError: If SUPABASE_URL or SUPABASE_KEY is not set
         """
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_KEY")
-        
-        if not supabase_url or not supabase_key:
+        if not os.getenv("SUPABASE_URL") or not os.getenv("SUPABASE_KEY"):
             raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
         
-        self.client: AsyncClient = create_client(supabase_url, supabase_key)
         self.table_name = table_name
 
+    @property
+    def client(self) -> PooledPostgrestClient:
+        return get_postgrest_client()
+
     async def create(self, data: Dict[str, Any]) -> T:
         """
         Create a new record in the table.
@@ -43,16 +189,12 @@ class SupabaseInterface(Generic[T]):
             Exception: If creation fails
         """
         try:
-            # Ensure client is initialized
-            if not self.client:
-                raise ValueError("Supabase client not initialized")
-                
             # Print debug information
             print(f"Creating record in table {self.table_name}")
             print(f"Data: {data}")
             
             # Execute insert
-            response = self.client.table(self.table_name).insert(data).execute()
+            response = await self.client.table(self.table_name).insert(data).execute()
             
             if not response.data:
                 raise ValueError("No data returned from insert operation")
@@ -79,7 +221,7 @@ class SupabaseInterface(Generic[T]):
             Exception: If read fails
         """
         try:
-            response = self.client.table(self.table_name).select("*").eq("id", id).execute()
+            response = await self.client.table(self.table_name).select("*").eq("id", id).execute()
             return response.data[0] if response.data else None
         except Exception as e:
             raise Exception(f"Failed to read record: {str(e)}")
@@ -102,7 +244,7 @@ class SupabaseInterface(Generic[T]):
             if query:
                 for key, value in query.items():
                     builder = builder.eq(key, value)
-            response = builder.execute()
+            response = await builder.execute()
             return response.data
         except Exception as e:
             raise Exception(f"Failed to read records: {str(e)}")
@@ -122,11 +264,73 @@ class SupabaseInterface(Generic[T]):
             Exception: If update fails
         """
         try:
-            response = self.client.table(self.table_name).update(data).eq("id", id).execute()
+            response = await self.client.table(self.table_name).update(data).eq("id", id).execute()
             return response.data[0]
         except Exception as e:
             raise Exception(f"Failed to update record: {str(e)}")
 
+    async def patch(self, id: str, data: Dict[str, Any]) -> int:
+        """
+        Update a record by ID without reading it back.
+        
+        Args:
+            id (str): Record ID
+            data (Dict[str, Any]): Updated data
+            
+        Returns:
+            int: Number of records updated (0 if the ID doesn't exist)
+            
+        Raises:
+            Exception: If update fails
+        """
+        return await self.patch_where({"id": id}, data)
+
+    async def patch_where(self, query: Dict[str, Any], data: Dict[str, Any]) -> int:
+        """
+        Update the records matching a query without reading them back.
+        
+        Args:
+            query (Dict[str, Any]): Column values the records must equal
+            data (Dict[str, Any]): Updated data
+            
+        Returns:
+            int: Number of records updated
+            
+        Raises:
+            Exception: If update fails
+        """
+        try:
+            builder = self.client.table(self.table_name).update(
+                data, count=CountMethod.exact, returning=ReturnMethod.minimal
+            )
+            for key, value in query.items():
+                builder = builder.eq(key, value)
+            response = await builder.execute()
+            return response.count or 0
+        except Exception as e:
+            raise Exception(f"Failed to update records: {str(e)}") from e
+
+    async def update_many(self, ids: List[str], data: Dict[str, Any]) -> List[T]:
+        """
+        Apply the same update to several records by ID, in chunks.
+        
+        Args:
+            ids (List[str]): Record IDs
+            data (Dict[str, Any]): Updated data
+            
+        Returns:
+            List[T]: Updated records
+            
+        Raises:
+            Exception: If any record fails to update
+        """
+        result = await self.bulk_update(
+            [{"id": id, **data} for id in ids], return_records=True
+        )
+        if result.failed:
+            raise Exception(f"Failed to update records: {self._describe_failures(result)}")
+        return result.records
+
     async def delete(self, id: str) -> bool:
         """
         Delete a record by ID.
@@ -141,7 +345,7 @@ class SupabaseInterface(Generic[T]):
             Exception: If deletion fails
         """
         try:
-            self.client.table(self.table_name).delete().eq("id", id).execute()
+            await self.client.table(self.table_name).delete().eq("id", id).execute()
             return True
         except Exception as e:
             raise Exception(f"Failed to delete record: {str(e)}")
@@ -161,10 +365,10 @@ class SupabaseInterface(Generic[T]):
             Exception: If upsert fails
         """
         try:
-            response = self.client.table(self.table_name).upsert(data, on_conflict=",".join(unique_columns)).execute()
+            response = await self.client.table(self.table_name).upsert(data, on_conflict=",".join(unique_columns)).execute()
             return response.data[0]
         except Exception as e:
-            raise Exception(f"Failed to upsert record: {str(e)}")
+            raise Exception(f"Failed to upsert record: {str(e)}") from e
 
     async def batch_create(self, data_list: List[Dict[str, Any]]) -> List[T]:
         """
@@ -187,7 +391,7 @@ class SupabaseInterface(Generic[T]):
 
     async def batch_update(self, updates: List[Dict[str, Any]], id_field: str = "id") -> List[T]:
         """
-        Update multiple records in a single operation.
+        Update multiple records, each with its own data.
         
         Args:
             updates (List[Dict[str, Any]]): List of records with updates
@@ -197,18 +401,181 @@ class SupabaseInterface(Generic[T]):
             List[T]: List of updated records
             
         Raises:
-            Exception: If batch update fails
+            Exception: If any record fails to update
         """
-        try:
-            # Group updates by their IDs
-            updates_by_id = {update[id_field]: update for update in updates}
-            ids = list(updates_by_id.keys())
-            
-            # Perform batch update
-            response = self.client.table(self.table_name)\
-                .update([updates_by_id[id_] for id_ in ids])\
-                .in_(id_field, ids)\
-                .execute()
-            return response.data
-        except Exception as e:
-            raise Exception(f"Failed to batch update records: {str(e)}")
+        result = await self.bulk_update(updates, id_field, return_records=True)
+        if result.failed:
+            raise Exception(f"Failed to batch update records: {self._describe_failures(result)}")
+        return result.records
+
+    async def bulk_upsert(
+        self,
+        rows: List[Dict[str, Any]],
+        unique_columns: Optional[List[str]] = None,
+        chunk_size: int = SUPABASE_BULK_CHUNK_SIZE,
+        concurrency: int = SUPABASE_BULK_CONCURRENCY,
+        return_records: bool = False,
+    ) -> BulkResult[T]:
+        """
+        Insert or update many complete rows, several hundred per request.
+        
+        Rows are grouped by the columns they set, since a multi-row upsert
+        writes the same columns for every row. A chunk the database rejects
+        is split and retried until the failing rows are isolated, so one bad
+        row doesn't fail its neighbours. A chunk that fails transiently is
+        retried whole, and reported as failed if it keeps failing.
+        
+        Args:
+            rows (List[Dict[str, Any]]): Rows to write; each must have every
+                NOT NULL column, as new rows are inserted
+            unique_columns (Optional[List[str]]): Columns that determine
+                uniqueness, ``["id"]`` if None
+            chunk_size (int): Rows per request
+            concurrency (int): Requests in flight at once
+            return_records (bool): Collect the written records in the result
+            
+        Returns:
+            BulkResult[T]: Rows written and the rows that failed, with errors
+        """
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+
+        async def write(chunk: List[Dict[str, Any]]):
+            return await self.client.table(self.table_name).upsert(
+                chunk,
+                on_conflict=",".join(unique_columns or ["id"]),
+                count=CountMethod.exact,
+                returning=ReturnMethod.representation if return_records else ReturnMethod.minimal,
+            ).execute()
+
+        return await self._bulk_write(
+            [
+                group[i : i + chunk_size]
+                for group in groups.values()
+                for i in range(0, len(group), chunk_size)
+            ],
+            write,
+            concurrency,
+            return_records,
+        )
+
+    async def bulk_update(
+        self,
+        updates: List[Dict[str, Any]],
+        id_field: str = "id",
+        chunk_size: int = SUPABASE_BULK_CHUNK_SIZE,
+        concurrency: int = SUPABASE_BULK_CONCURRENCY,
+        return_records: bool = False,
+    ) -> BulkResult[T]:
+        """
+        Update many existing records by ID.
+        
+        Records getting the same data (e.g. a status sweep) are updated
+        together, one request per chunk of IDs; records with different data
+        take one request each. A chunk the database rejects is split and
+        retried until the failing records are isolated; a chunk that fails
+        transiently is retried whole. IDs that match no record are reported
+        as failed.
+        
+        Args:
+            updates (List[Dict[str, Any]]): Records with their ID and the
+                columns to set
+            id_field (str): Name of the ID field
+            chunk_size (int): IDs per request
+            concurrency (int): Requests in flight at once
+            return_records (bool): Collect the updated records in the result
+            
+        Returns:
+            BulkResult[T]: Rows written and the records that failed, with errors
+        """
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for update in updates:
+            data = {key: value for key, value in update.items() if key != id_field}
+            groups.setdefault(json.dumps(data, sort_keys=True, default=str), []).append(update)
+
+        async def write(chunk: List[Dict[str, Any]]):
+            data = {key: value for key, value in chunk[0].items() if key != id_field}
+            # The updated records are always returned, to find IDs that matched none
+            return await self.client.table(self.table_name).update(
+                data, count=CountMethod.exact, returning=ReturnMethod.representation
+            ).in_(id_field, [update[id_field] for update in chunk]).execute()
+
+        def missing(chunk: List[Dict[str, Any]], response) -> List[Dict[str, Any]]:
+            updated = {str(record[id_field]) for record in response.data}
+            return [update for update in chunk if str(update[id_field]) not in updated]
+
+        return await self._bulk_write(
+            [
+                group[i : i + chunk_size]
+                for group in groups.values()
+                for i in range(0, len(group), chunk_size)
+            ],
+            write,
+            concurrency,
+            return_records,
+            missing,
+        )
+
+    async def _bulk_write(
+        self,
+        chunks: List[List[Dict[str, Any]]],
+        write: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+        concurrency: int,
+        return_records: bool,
+        missing: Optional[Callable[[List[Dict[str, Any]], Any], List[Dict[str, Any]]]] = None,
+    ) -> BulkResult[T]:
+        """
+        Write chunks with bounded concurrency.
+        
+        Chunks the database rejects are bisected to isolate the bad rows.
+        Chunks that fail transiently (timeouts, connection errors, 5xx) are
+        retried ``BULK_RETRIES`` times with backoff, then all of their rows
+        are reported as failed.
+        
+        Args:
+            chunks (List[List[Dict[str, Any]]]): Rows, grouped per request
+            write (Callable): Sends one chunk and returns the response
+            concurrency (int): Requests in flight at once
+            return_records (bool): Collect the written records in the result
+            missing (Optional[Callable]): Given a chunk and its response,
+                returns the rows that weren't written
+            
+        Returns:
+            BulkResult[T]: Combined result of all chunks
+        """
+        result: BulkResult[T] = BulkResult()
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def send(chunk: List[Dict[str, Any]]):
+            for attempt in range(BULK_RETRIES + 1):
+                try:
+                    async with semaphore:
+                        response = await write(chunk)
+                    break
+                except Exception as e:
+                    if is_permanent_error(e):
+                        if len(chunk) == 1:
+                            result.failed.append((chunk[0], str(e)))
+                            return
+                        middle = len(chunk) // 2
+                        await asyncio.gather(send(chunk[:middle]), send(chunk[middle:]))
+                        return
+                    if attempt == BULK_RETRIES:
+                        result.failed.extend((row, str(e)) for row in chunk)
+                        return
+                    await asyncio.sleep(BULK_RETRY_DELAY_SECS * 2**attempt)
+
+            result.written += response.count if response.count is not None else len(response.data)
+            if return_records:
+                result.records.extend(response.data)
+            if missing:
+                result.failed.extend((row, "no matching record") for row in missing(chunk, response))
+
+        await asyncio.gather(*(send(chunk) for chunk in chunks))
+        return result
+
+    @staticmethod
+    def _describe_failures(result: BulkResult) -> str:
+        row, error = result.failed[0]
+        return f"{len(result.failed)} rows failed, first {row}: {error}"
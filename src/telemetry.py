@@ -0,0 +1,85 @@
+"""Minimal Prometheus text-format instrumentation for the server.
+
+Only what ``/metrics`` needs: cumulative histograms and helpers that render
+gauges and counters from current values at scrape time.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, suited to REST calls and process spawns
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Sample = Tuple[Dict[str, str], float]
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets."""
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self._counts[i] += 1
+                break
+
+    @contextmanager
+    def time(self):
+        """Observe how long the ``with`` block takes, including any awaits."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Current value of each series, keyed by its name and labels."""
+        values = {}
+        cumulative = 0
+        for bound, count in zip(self.buckets, self._counts):
+            cumulative += count
+            values[f'{self.name}_bucket{{le="{bound:g}"}}'] = cumulative
+        values[f'{self.name}_bucket{{le="+Inf"}}'] = self.count
+        values[f"{self.name}_sum"] = self.sum
+        values[f"{self.name}_count"] = self.count
+        return values
+
+    def render(self, totals: Optional[Dict[str, float]] = None) -> List[str]:
+        """Render the histogram, taking series found in ``totals`` (e.g.
+        summed over several processes) from there."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for series, value in self.snapshot().items():
+            lines.append(f"{series} {(totals or {}).get(series, value):g}")
+        return lines
+
+
+def render_metric(name: str, kind: str, help: str, samples: Iterable[Sample]) -> List[str]:
+    """Render a gauge or counter family.
+
+    Args:
+        name (str): Metric name
+        kind (str): ``gauge`` or ``counter``
+        help (str): Help text
+        samples (Iterable[Sample]): (labels, value) pairs
+
+    Returns:
+        List[str]: Lines in Prometheus text exposition format
+    """
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        if labels:
+            label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value:g}")
+        else:
+            lines.append(f"{name} {value:g}")
+    return lines
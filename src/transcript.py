@@ -0,0 +1,79 @@
+"""Streams the call transcript to the database as the conversation goes.
+
+``TranscriptRecorder`` sits at the end of the pipeline and, whenever the user
+or the bot finishes speaking, writes the context messages added since the
+last time as ``conversation_turns`` rows. Each write is one message, so there
+is no large transcript payload at the end of the call, and a bot that crashes
+only loses the turn in progress. Bots without a conversation id (started
+through ``/room`` or by hand) keep writing the whole transcript at the end.
+"""
+
+from loguru import logger
+
+from pipecat.frames.frames import (
+    BotStoppedSpeakingFrame,
+    Frame,
+    UserStoppedSpeakingFrame,
+)
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from src.conversations import ConversationRecord
+
+
+class TranscriptRecorder(FrameProcessor):
+    """Writes new context messages to the conversation at turn boundaries."""
+
+    def __init__(self, conversation: ConversationRecord, context: OpenAILLMContext):
+        """
+        Args:
+            conversation (ConversationRecord): The call's conversation record
+            context (OpenAILLMContext): The LLM context the transcript comes from
+        """
+        super().__init__()
+        self._conversation = conversation
+        self._context = context
+        # Messages written so far; the next one gets this sequence number
+        self._recorded = 0
+
+    @property
+    def streaming(self) -> bool:
+        """Whether turns are written as they happen (the call has an id)."""
+        return bool(self._conversation.conversation_id)
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, (UserStoppedSpeakingFrame, BotStoppedSpeakingFrame)):
+            await self.record()
+
+        await self.push_frame(frame, direction)
+
+    async def record(self):
+        """Write the messages added to the context since the last call."""
+        if not self.streaming:
+            return
+        messages = self._context.get_messages_for_persistent_storage()
+        try:
+            for seq in range(self._recorded, len(messages)):
+                await self._conversation.add_turn(seq, messages[seq])
+                self._recorded = seq + 1
+        except Exception as e:
+            # Retried from the first unwritten message at the next turn
+            logger.error(f"Failed to record transcript turn {self._recorded}: {e}")
+
+    async def finish(self):
+        """Write the rest of the transcript and mark the conversation ended.
+
+        Never raises: the call is ended right after this, whether or not the
+        database took the write.
+        """
+        data = {"status": "ended"}
+        if self.streaming:
+            await self.record()
+        else:
+            data["transcript"] = self._context.get_messages_for_persistent_storage()
+        try:
+            await self._conversation.update(data)
+        except Exception as e:
+            logger.error(f"Failed to mark the conversation ended: {e}")
@@ -0,0 +1,55 @@
+"""Voice activity detection engines, imported on demand.
+
+Each engine brings its own dependencies (Silero loads onnxruntime and its
+model, the WebRTC analyzer needs ``webrtcvad``), so bots look engines up here
+by name and only import the one ``AMD_ENGINE`` selects.
+"""
+
+import importlib
+from typing import Optional, Type
+
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
+
+# Engine name -> "module:class"
+VAD_ENGINES = {
+    "SileroVADAnalyzer": "silero_vad_analyzer:SileroVADAnalyzer",
+    "WebRTCVADAnalyzer": "webrtc_vad_analyzer:WebRTCVADAnalyzer",
+    "EnergyBaseVADAnalyzer": "energy_vad_analyzer:EnergyBaseVADAnalyzer",
+    "AdaptiveEnergyVADAnalyzer": "energy_vad_analyzer:AdaptiveEnergyVADAnalyzer",
+    # Energy gate in front of the model, which then only runs on likely speech
+    "CascadedSileroVADAnalyzer": "cascaded_vad_analyzer:CascadedSileroVADAnalyzer",
+    "CascadedWebRTCVADAnalyzer": "cascaded_vad_analyzer:CascadedWebRTCVADAnalyzer",
+}
+
+# Used for unknown or empty engine names. The adaptive energy VAD ignores
+# steady line noise that the fixed threshold takes for speech.
+DEFAULT_VAD_ENGINE = "AdaptiveEnergyVADAnalyzer"
+
+
+def load_vad_analyzer(engine: str) -> Type[VADAnalyzer]:
+    """Import the analyzer class for an engine.
+
+    Args:
+        engine (str): Engine name, e.g. the value of ``AMD_ENGINE``
+
+    Returns:
+        Type[VADAnalyzer]: The analyzer class
+    """
+    module_name, class_name = VAD_ENGINES.get(
+        engine, VAD_ENGINES[DEFAULT_VAD_ENGINE]
+    ).split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_vad_analyzer(engine: str, params: Optional[VADParams] = None) -> VADAnalyzer:
+    """Create an analyzer for an engine.
+
+    Args:
+        engine (str): Engine name, e.g. the value of ``AMD_ENGINE``
+        params (Optional[VADParams]): Analyzer parameters, engine defaults if None
+
+    Returns:
+        VADAnalyzer: The analyzer
+    """
+    analyzer_class = load_vad_analyzer(engine)
+    return analyzer_class(params=params) if params else analyzer_class()
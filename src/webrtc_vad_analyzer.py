@@ -1,3 +1,6 @@
+import os
+from typing import Optional
+
 import numpy as np
 from loguru import logger
 
@@ -10,61 +13,145 @@ except ModuleNotFoundError as e:
     logger.error("You need to install `webrtcvad` to use WebRTC VAD. Please run `pip install webrtcvad`.")
     raise Exception(f"Missing module(s): {e}")
 
-class WebRTCVADModel:
-    def __init__(self, aggressiveness=1):
-        self.vad = webrtcvad.Vad(aggressiveness)
-        self.sample_rates = [8000, 16000]
-        self.frame_duration_ms = 30
+# Sample rates webrtcvad analyzes directly; other rates are resampled
+NATIVE_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+# Rate other inputs are resampled to
+ANALYSIS_SAMPLE_RATE = 16000
+# Frame durations webrtcvad accepts
+FRAME_DURATIONS_MS = (10, 20, 30)
+
+# 0 (least aggressive about filtering out non-speech) to 3 (most)
+AGGRESSIVENESS = int(os.getenv("WEBRTC_VAD_AGGRESSIVENESS", "1"))
+FRAME_DURATION_MS = int(os.getenv("WEBRTC_VAD_FRAME_MS", "30"))
+
+
+class PCMResampler:
+    """Resamples fixed-size 16-bit PCM frames with linear interpolation.
+
+    Sample positions and weights are computed once for the frame size, so each
+    frame costs a handful of vectorized numpy operations. When downsampling,
+    a box filter as wide as the rate ratio is applied first to limit aliasing.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, in_samples: int, out_samples: int):
+        """
+        Args:
+            in_rate (int): Input sample rate
+            out_rate (int): Output sample rate
+            in_samples (int): Samples per input frame
+            out_samples (int): Samples per output frame
+        """
+        self.in_samples = in_samples
+        self.out_samples = out_samples
+        positions = np.arange(out_samples, dtype=np.float64) * (in_rate / out_rate)
+        self._left = np.minimum(positions.astype(np.int64), in_samples - 1)
+        self._right = np.minimum(self._left + 1, in_samples - 1)
+        self._weight = (positions - self._left).astype(np.float32)
+        box = max(int(round(in_rate / out_rate)), 1)
+        self._kernel = np.full(box, 1 / box, dtype=np.float32) if box > 1 else None
+
+    def __call__(self, buffer) -> bytes:
+        x = np.frombuffer(buffer, dtype=np.int16)[: self.in_samples].astype(np.float32)
+        if self._kernel is not None:
+            x = np.convolve(x, self._kernel, mode="same")
+        y = x[self._left] * (1 - self._weight) + x[self._right] * self._weight
+        return np.rint(y).astype(np.int16).tobytes()
 
-    def _validate_input(self, x, sr: int):
-        if sr not in self.sample_rates:
-            raise ValueError(f"Supported sample rates: {self.sample_rates}")
-        if np.ndim(x) != 1:
-            raise ValueError("Input audio must be one-dimensional.")
-        return x, sr
 
-    def reset_states(self, batch_size=1):
-        pass
+class WebRTCVADModel:
+    """``webrtcvad.Vad`` for one sample rate and frame duration.
+
+    Frames are 16-bit mono PCM and are handed to the C implementation as-is.
+    """
 
-    def __call__(self, x, sr: int):
-        x, sr = self._validate_input(x, sr)
-        frame_length = int(sr * self.frame_duration_ms / 1000)
+    def __init__(
+        self,
+        aggressiveness: int = 1,
+        sample_rate: int = 16000,
+        frame_duration_ms: int = 30,
+    ):
+        if sample_rate not in NATIVE_SAMPLE_RATES:
+            raise ValueError(f"Supported sample rates: {NATIVE_SAMPLE_RATES}")
+        if frame_duration_ms not in FRAME_DURATIONS_MS:
+            raise ValueError(f"Supported frame durations: {FRAME_DURATIONS_MS} ms")
+        self.vad = webrtcvad.Vad(aggressiveness)
+        self.sample_rate = sample_rate
+        self.frame_duration_ms = frame_duration_ms
+        self.frame_bytes = sample_rate * frame_duration_ms // 1000 * 2
 
-        if len(x) != frame_length:
-            raise ValueError(f"Expected {frame_length} samples for a {self.frame_duration_ms}ms frame at {sr}Hz.")
+    def is_speech(self, pcm) -> bool:
+        return self.vad.is_speech(pcm, self.sample_rate)
 
-        pcm_data = (x * 32768).astype(np.int16).tobytes()
-        is_speech = self.vad.is_speech(pcm_data, sr)
-        confidence = np.array([1.0 if is_speech else 0.0], dtype=np.float32)
-        return confidence
 
 class WebRTCVADAnalyzer(VADAnalyzer):
-    def __init__(self, *, sample_rate: int = 16000, params: VADParams = VADParams()):
-        self.frame_duration_ms = 30
+    """Voice activity detection with the WebRTC (GMM) VAD.
+
+    Input at 8, 16, 32 or 48 kHz is analyzed directly; other rates (e.g.
+    24 kHz) are resampled to 16 kHz first.
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_rate: int = 16000,
+        params: VADParams = VADParams(),
+        aggressiveness: int = AGGRESSIVENESS,
+        frame_duration_ms: int = FRAME_DURATION_MS,
+    ):
+        """
+        Args:
+            sample_rate (int): Input sample rate
+            params (VADParams): Pipecat VAD parameters
+            aggressiveness (int): 0 (least aggressive) to 3 (most)
+            frame_duration_ms (int): 10, 20 or 30
+        """
+        if frame_duration_ms not in FRAME_DURATIONS_MS:
+            raise ValueError(f"WebRTC VAD frames must be one of {FRAME_DURATIONS_MS} ms")
+        self.frame_duration_ms = frame_duration_ms
         super().__init__(sample_rate=sample_rate, num_channels=1, params=params)
-        if sample_rate not in [8000, 16000]:
-            raise ValueError("WebRTC VAD requires a sample rate of 8000 or 16000 Hz")
 
         logger.debug("Initializing WebRTC VAD...")
-        self._model = WebRTCVADModel()
+        self._resampler: Optional[PCMResampler] = None
+        analysis_rate = sample_rate
+        if sample_rate not in NATIVE_SAMPLE_RATES:
+            analysis_rate = ANALYSIS_SAMPLE_RATE
+            self._resampler = PCMResampler(
+                sample_rate,
+                analysis_rate,
+                self.num_frames_required(),
+                analysis_rate * frame_duration_ms // 1000,
+            )
+        self._model = WebRTCVADModel(aggressiveness, analysis_rate, frame_duration_ms)
         logger.debug("WebRTC VAD initialized")
 
     def num_frames_required(self) -> int:
         return int(self.sample_rate * self.frame_duration_ms / 1000)
 
-    # def voice_confidence(self, buffer) -> float:
-    #     try:
-    #         audio_int16 = np.frombuffer(buffer, dtype=np.int16)
-    #         audio_float32 = audio_int16.astype(np.float32) / 32768.0
-    #         confidence = self._model(audio_float32, self.sample_rate)[0]
-    #         return confidence
-    #     except Exception as e:
-    #         logger.error(f"Error analyzing audio with WebRTC VAD: {e}")
-    #         return 0.0
-
     def voice_confidence(self, buffer) -> float:
-        audio_int16 = np.frombuffer(buffer, dtype=np.int16)
-        rms = np.sqrt(np.mean(audio_int16.astype(np.float32) ** 2))
-        threshold = 500  # Adjust based on testing
-        confidence = 1.0 if rms > threshold else 0.0
-        return confidence
\ No newline at end of file
+        try:
+            pcm = self._resampler(buffer) if self._resampler else buffer
+            return 1.0 if self._model.is_speech(pcm) else 0.0
+        except Exception as e:
+            logger.error(f"Error analyzing audio with WebRTC VAD: {e}")
+            return 0.0
+
+    def voice_confidences(self, buffer) -> np.ndarray:
+        """Score every whole frame in ``buffer``.
+
+        Args:
+            buffer: 16-bit PCM holding one or more frames of
+                ``num_frames_required()`` samples; a trailing partial frame is
+                ignored
+
+        Returns:
+            np.ndarray: Confidence (0.0 or 1.0) for each frame, in order
+        """
+        frame_bytes = self.num_frames_required() * 2
+        view = memoryview(buffer)
+        return np.array(
+            [
+                self.voice_confidence(view[offset : offset + frame_bytes])
+                for offset in range(0, len(view) - frame_bytes + 1, frame_bytes)
+            ],
+            dtype=np.float32,
+        )
@@ -0,0 +1,185 @@
+"""Worker agent for running bots on behalf of a remote control plane.
+
+Runs on each bot host. The API server (``src/main.py`` with ``WORKER_NODES``
+set) places calls on agents through its scheduler, and each agent starts and
+stops the bots with the same worker pool and registry the server uses for
+local bots.
+
+Endpoints:
+- ``POST /spawn`` - Start a bot: ``{"call_id", "room_url", "token", "conversation_id"}``
+- ``POST /kill/{call_id}`` - Stop a call
+- ``GET /status/{pid}`` - Status of a bot process
+- ``GET /calls/{call_id}`` - Status of a call
+- ``GET /capacity`` - Capacity, running calls, recently finished calls and the
+  write queue backlog
+
+Run with::
+
+    uvicorn src.worker_agent:app --host 0.0.0.0 --port 7870
+"""
+
+import hmac
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+import sys
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from src.bot_pool import BotWorkerPool, get_bot_file
+from src.bot_registry import BotRegistry
+from src.write_queue import WriteFlusher, get_write_queue
+
+# Load environment variables from .env file
+load_dotenv(override=True)
+
+# Maximum calls this node accepts (0 = no limit)
+NODE_CAPACITY = int(os.getenv("NODE_CAPACITY", "0"))
+
+# Seconds in-flight calls get to finish on shutdown before their bots are stopped
+SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "30"))
+
+# Seconds between SIGTERM and SIGKILL for bots stopped on shutdown
+SHUTDOWN_KILL_TIMEOUT = float(os.getenv("SHUTDOWN_KILL_TIMEOUT", "5"))
+
+# Shared secret the control plane must send as a bearer token; the agent
+# won't start without one
+WORKER_AGENT_TOKEN = os.getenv("WORKER_AGENT_TOKEN")
+
+bot_registry = BotRegistry(int(os.getenv("BOT_HISTORY_SIZE", "1000")))
+
+bot_pool: Optional[BotWorkerPool] = None
+
+# Sends the conversation updates this node's bots queue
+write_queue = get_write_queue()
+write_flusher = WriteFlusher(write_queue) if write_queue else None
+
+# Set on shutdown; the agent then refuses new calls while running ones finish
+draining = False
+
+
+def on_bot_event(event: Dict[str, Any]):
+    if event.get("event") == "finished":
+        bot_registry.finish(event["call_id"], event.get("exit_code"))
+    elif event.get("event") == "joined":
+        bot_registry.mark_joined(event.get("call_id"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global bot_pool, draining
+    if not WORKER_AGENT_TOKEN:
+        raise RuntimeError("WORKER_AGENT_TOKEN must be set to run a worker agent")
+    bot_registry.start()
+    bot_pool = BotWorkerPool(
+        get_bot_file(),
+        int(os.getenv("BOT_POOL_SIZE", "0")),
+        int(os.getenv("BOT_HOST_CAPACITY", "1")),
+        python=Path(sys.executable),
+        on_event=on_bot_event,
+    )
+    bot_pool.start()
+    if write_flusher:
+        write_flusher.start()
+    yield
+    draining = True
+    await bot_registry.drain(SHUTDOWN_DRAIN_TIMEOUT, SHUTDOWN_KILL_TIMEOUT)
+    bot_pool.close(SHUTDOWN_KILL_TIMEOUT)
+    if write_flusher:
+        await write_flusher.close()
+    bot_registry.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def check_auth(request: Request):
+    authorization = request.headers.get("Authorization", "")
+    if not WORKER_AGENT_TOKEN or not hmac.compare_digest(
+        authorization.encode(), f"Bearer {WORKER_AGENT_TOKEN}".encode()
+    ):
+        raise HTTPException(status_code=401, detail="Invalid agent token")
+
+
+class SpawnRequest(BaseModel):
+    call_id: str
+    room_url: str
+    token: str
+    conversation_id: Optional[str] = None
+
+
+@app.post("/spawn")
+async def spawn(body: SpawnRequest, request: Request):
+    """Start a bot for a call placed on this node."""
+    check_auth(request)
+    if draining:
+        raise HTTPException(status_code=503, detail="Node is shutting down")
+    if NODE_CAPACITY and len(bot_registry.running()) >= NODE_CAPACITY:
+        raise HTTPException(status_code=503, detail="Node is at capacity")
+    try:
+        proc = await bot_pool.launch(
+            body.call_id, body.room_url, body.token, body.conversation_id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start subprocess: {e}")
+    bot_registry.add(body.call_id, proc, body.room_url, body.conversation_id)
+    return {"pid": proc.pid}
+
+
+@app.post("/kill/{call_id}")
+async def kill(call_id: str, request: Request):
+    """Stop a call running on this node."""
+    check_auth(request)
+    entry = next(
+        (entry for entry in bot_registry.running() if entry.call_id == call_id), None
+    )
+    if not entry:
+        raise HTTPException(status_code=404, detail=f"Call {call_id} is not running")
+    entry.handle.terminate()
+    return {"call_id": call_id, "status": "stopping"}
+
+
+@app.get("/status/{pid}")
+def get_status(pid: int, request: Request):
+    """Get the status of a bot process on this node."""
+    check_auth(request)
+    status = bot_registry.status(pid)
+    if not status:
+        raise HTTPException(
+            status_code=404, detail=f"Bot with process id: {pid} not found"
+        )
+    return JSONResponse(status)
+
+
+@app.get("/calls/{call_id}")
+def get_call_status(call_id: str, request: Request):
+    """Get the status of a call on this node."""
+    check_auth(request)
+    status = bot_registry.call_status(call_id)
+    if not status:
+        raise HTTPException(status_code=404, detail=f"Call {call_id} not found")
+    return JSONResponse(status)
+
+
+@app.get("/capacity")
+def get_capacity(request: Request):
+    """Report capacity, running calls, recently finished calls and write backlog."""
+    check_auth(request)
+    return {
+        "capacity": NODE_CAPACITY,
+        "draining": draining,
+        "running": [entry.call_id for entry in bot_registry.running()],
+        "finished": {
+            entry.call_id: entry.exit_code for entry in bot_registry.finished()
+        },
+        "write_backlog": write_queue.stats()["backlog"] if write_queue else 0,
+    }
+
+
+@app.get("/health")
+def health_check():
+    return JSONResponse({"status": "ok"})
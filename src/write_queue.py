@@ -0,0 +1,419 @@
+"""Durable write-behind queue for database updates made during calls.
+
+Bots don't wait on Supabase while a call runs: ``WriteQueue.enqueue()``
+records the update in a local SQLite database (WAL mode, shared by every
+process on the node) and returns. The database calls run in a worker
+thread, since a commit waits for fsync and for other processes' locks. A ``WriteFlusher`` in the server (or the
+worker agent on other nodes) sends queued updates in the background:
+
+- row inserts are upserts on their key columns, so a retry can't duplicate
+  them
+- updates to the same row are coalesced into one pending write, later
+  values winning, so only the latest state is sent
+- each round claims a batch of due writes and sends them concurrently
+- writes that fail transiently (timeouts, connection errors, 5xx) are
+  retried with exponential backoff and stay in the file until they succeed,
+  so a Supabase outage or a restart loses nothing
+- writes the database rejects (4xx, e.g. a foreign key violation while the
+  conversation insert hasn't landed yet) are retried ``REJECTED_ATTEMPTS``
+  times, and writes that match no row ``MISSING_ATTEMPTS`` times; then they
+  are parked in the ``failed_writes`` table for inspection
+
+A write is removed only when the version that was sent is still the latest,
+so an update that arrives while its row is being flushed is sent afterwards.
+"""
+
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from src.supabase_interface import SupabaseInterface, is_permanent_error
+
+# Queue file shared by the bots and the flusher on this node; unset or empty
+# writes to Supabase inline
+WRITE_QUEUE_PATH = os.getenv("WRITE_QUEUE_PATH", "")
+
+
+@dataclass
+class PendingWrite:
+    """A claimed write, as sent by the flusher."""
+
+    id: int
+    table: str
+    op: str
+    match: Dict[str, Any]
+    data: Dict[str, Any]
+    version: int
+    attempts: int
+
+
+class WriteQueue:
+    """Pending row updates in a SQLite database in WAL mode."""
+
+    # Current schema; PRAGMA user_version records which one a file has
+    SCHEMA_VERSION = 2
+    WRITES_TABLE = """
+        CREATE TABLE writes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            op TEXT NOT NULL DEFAULT 'update',
+            match TEXT NOT NULL,
+            data TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 1,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            claimed_until REAL NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            last_error TEXT,
+            UNIQUE (table_name, op, match)
+        )
+    """
+    WRITES_DUE_INDEX = "CREATE INDEX writes_due ON writes (next_attempt_at)"
+    FAILED_WRITES_TABLE = """
+        CREATE TABLE failed_writes (
+            id INTEGER PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            op TEXT NOT NULL,
+            match TEXT NOT NULL,
+            data TEXT NOT NULL,
+            attempts INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            failed_at REAL NOT NULL,
+            error TEXT
+        )
+    """
+    SCHEMA = (WRITES_TABLE, WRITES_DUE_INDEX, FAILED_WRITES_TABLE)
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Database file shared by the processes on the node
+        """
+        self.path = path
+        # Autocommit; multi-statement updates use explicit transactions
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # Queued writes must survive a power loss, not just a crash
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._migrate()
+        # The connection is used from worker threads, one call at a time
+        self._lock = threading.Lock()
+
+    async def enqueue(
+        self,
+        table: str,
+        match: Dict[str, Any],
+        data: Dict[str, Any],
+        op: str = "update",
+    ):
+        """Queue a write, merging it into a pending one for the same row.
+
+        Args:
+            table (str): Table name
+            match (Dict[str, Any]): Column values identifying the row(s)
+            data (Dict[str, Any]): Columns to set
+            op (str): ``update`` to update the matching rows, or ``upsert`` to
+                insert ``match`` + ``data`` as a row, replacing one with the
+                same ``match`` columns (so a retried insert is harmless)
+        """
+        await asyncio.to_thread(self._locked, self._enqueue, table, match, data, op)
+
+    async def claim(self, limit: int, lease_secs: float) -> List[PendingWrite]:
+        """Claim up to ``limit`` due writes for ``lease_secs`` seconds.
+
+        Writes claimed by another flusher are skipped until its lease ends.
+        """
+        return await asyncio.to_thread(self._locked, self._claim, limit, lease_secs)
+
+    async def complete(self, write: PendingWrite):
+        """Remove a sent write, unless it was updated while being sent."""
+        await asyncio.to_thread(self._locked, self._complete, write)
+
+    async def retry(self, write: PendingWrite, delay: float, error: str):
+        """Release a failed write to be tried again after ``delay`` seconds."""
+        await asyncio.to_thread(self._locked, self._retry, write, delay, error)
+
+    async def park(self, write: PendingWrite, error: str):
+        """Move a write that keeps failing to ``failed_writes``."""
+        await asyncio.to_thread(self._locked, self._park, write, error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Backlog size, the age of the oldest pending write in seconds and
+        the number of parked writes.
+
+        Blocking; call it from a thread (e.g. a sync FastAPI endpoint).
+        """
+        with self._lock:
+            count, oldest = self._db.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM writes"
+            ).fetchone()
+            (failed,) = self._db.execute("SELECT COUNT(*) FROM failed_writes").fetchone()
+        return {
+            "backlog": count,
+            "oldest_age": time.time() - oldest if oldest else 0.0,
+            "failed": failed,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _migrate(self):
+        """Create the schema, or bring an older file up to date.
+
+        Queued writes are kept: deleting the file would throw away updates
+        that haven't reached Supabase yet.
+        """
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            (version,) = self._db.execute("PRAGMA user_version").fetchone()
+            tables = {
+                name
+                for (name,) in self._db.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                )
+            }
+            if "writes" not in tables:
+                for statement in self.SCHEMA:
+                    self._db.execute(statement)
+            elif version < 2:
+                self._migrate_to_2(tables)
+            self._db.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def _migrate_to_2(self, tables: set):
+        # Version 1 had no op column (every write was an update) and was keyed
+        # on (table_name, match). SQLite can't change a table's UNIQUE
+        # constraint, so the table is rebuilt. Files written before versions
+        # were recorded may already have the column.
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(writes)")}
+        if "op" not in columns:
+            logger.info("Migrating the write queue to schema version 2")
+            self._db.execute("ALTER TABLE writes RENAME TO writes_v1")
+            self._db.execute("DROP INDEX IF EXISTS writes_due")
+            self._db.execute(self.WRITES_TABLE)
+            self._db.execute(self.WRITES_DUE_INDEX)
+            self._db.execute(
+                "INSERT INTO writes (id, table_name, op, match, data, version, attempts, "
+                "next_attempt_at, claimed_until, created_at, last_error) "
+                "SELECT id, table_name, 'update', match, data, version, attempts, "
+                "next_attempt_at, claimed_until, created_at, last_error FROM writes_v1"
+            )
+            self._db.execute("DROP TABLE writes_v1")
+        if "failed_writes" not in tables:
+            self._db.execute(self.FAILED_WRITES_TABLE)
+
+    def _locked(self, method, *args):
+        with self._lock:
+            return method(*args)
+
+    def _enqueue(self, table: str, match: Dict[str, Any], data: Dict[str, Any], op: str):
+        match_key = json.dumps(match, sort_keys=True)
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute(
+                "SELECT id, data FROM writes WHERE table_name = ? AND op = ? AND match = ?",
+                (table, op, match_key),
+            ).fetchone()
+            if row:
+                write_id, pending = row
+                self._db.execute(
+                    "UPDATE writes SET data = ?, version = version + 1 WHERE id = ?",
+                    (json.dumps({**json.loads(pending), **data}), write_id),
+                )
+            else:
+                self._db.execute(
+                    "INSERT INTO writes "
+                    "(table_name, op, match, data, next_attempt_at, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (table, op, match_key, json.dumps(data), now, now),
+                )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def _claim(self, limit: int, lease_secs: float) -> List[PendingWrite]:
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._db.execute(
+                "SELECT id, table_name, op, match, data, version, attempts FROM writes "
+                "WHERE next_attempt_at <= ? AND claimed_until <= ? ORDER BY id LIMIT ?",
+                (now, now, limit),
+            ).fetchall()
+            self._db.executemany(
+                "UPDATE writes SET claimed_until = ? WHERE id = ?",
+                [(now + lease_secs, row[0]) for row in rows],
+            )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return [
+            PendingWrite(id, table, op, json.loads(match), json.loads(data), version, attempts)
+            for id, table, op, match, data, version, attempts in rows
+        ]
+
+    def _complete(self, write: PendingWrite):
+        deleted = self._db.execute(
+            "DELETE FROM writes WHERE id = ? AND version = ?", (write.id, write.version)
+        ).rowcount
+        if not deleted:
+            self._db.execute("UPDATE writes SET claimed_until = 0 WHERE id = ?", (write.id,))
+
+    def _retry(self, write: PendingWrite, delay: float, error: str):
+        self._db.execute(
+            "UPDATE writes SET attempts = attempts + 1, next_attempt_at = ?, "
+            "claimed_until = 0, last_error = ? WHERE id = ?",
+            (time.time() + delay, error, write.id),
+        )
+
+    def _park(self, write: PendingWrite, error: str):
+        # Parks the latest data, including updates made while it was sent
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.execute(
+                "INSERT INTO failed_writes "
+                "(table_name, op, match, data, attempts, created_at, failed_at, error) "
+                "SELECT table_name, op, match, data, attempts + 1, created_at, ?, ? "
+                "FROM writes WHERE id = ?",
+                (time.time(), error, write.id),
+            )
+            self._db.execute("DELETE FROM writes WHERE id = ?", (write.id,))
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+
+_queue: Optional[WriteQueue] = None
+
+
+def get_write_queue() -> Optional[WriteQueue]:
+    """The process's write queue, or None if ``WRITE_QUEUE_PATH`` is empty."""
+    global _queue
+    if _queue is None and WRITE_QUEUE_PATH:
+        _queue = WriteQueue(WRITE_QUEUE_PATH)
+    return _queue
+
+
+class WriteFlusher:
+    """Sends queued writes to Supabase in the background."""
+
+    # Seconds between rounds when the queue is idle
+    INTERVAL_SECS = 0.5
+    # Retry backoff: BASE * 2**attempts, capped at MAX
+    BACKOFF_BASE_SECS = 0.5
+    BACKOFF_MAX_SECS = 60.0
+    # Attempts before a write that matches no row is parked
+    MISSING_ATTEMPTS = 5
+    # Attempts before a write the database rejects is parked
+    REJECTED_ATTEMPTS = 5
+
+    def __init__(self, queue: WriteQueue, batch_size: int = 50, concurrency: int = 8):
+        """
+        Args:
+            queue (WriteQueue): Queue to drain
+            batch_size (int): Writes claimed per round
+            concurrency (int): Writes in flight at once
+        """
+        self.queue = queue
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        # Claims outlive a round's worth of request timeouts
+        self.lease_secs = 60.0
+        self._tables: Dict[str, SupabaseInterface] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self, timeout: float = 5.0):
+        """Stop the background loop and make one last attempt at the backlog.
+
+        Whatever is still queued afterwards stays in the file for next time.
+        """
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Timed out flushing the write queue, the rest is kept")
+
+    async def flush(self) -> int:
+        """Send one batch of due writes.
+
+        Returns:
+            int: Number of writes claimed
+        """
+        writes = await self.queue.claim(self.batch_size, self.lease_secs)
+        if writes:
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def send(write: PendingWrite):
+                async with semaphore:
+                    await self._send(write)
+
+            await asyncio.gather(*(send(write) for write in writes))
+        return len(writes)
+
+    async def _run(self):
+        while True:
+            try:
+                if await self.flush() == self.batch_size:
+                    continue
+            except Exception as e:
+                logger.error(f"Write queue flush failed: {e}")
+            await asyncio.sleep(self.INTERVAL_SECS)
+
+    async def _send(self, write: PendingWrite):
+        try:
+            if write.op == "upsert":
+                await self._table(write.table).upsert(
+                    {**write.match, **write.data}, list(write.match)
+                )
+                updated = 1
+            else:
+                updated = await self._table(write.table).patch_where(write.match, write.data)
+        except Exception as e:
+            if is_permanent_error(e) and write.attempts + 1 >= self.REJECTED_ATTEMPTS:
+                logger.error(f"Parking write to {write.table} {write.match}: {e}")
+                await self.queue.park(write, str(e))
+                return
+            delay = min(self.BACKOFF_BASE_SECS * 2**write.attempts, self.BACKOFF_MAX_SECS)
+            await self.queue.retry(write, delay * random.uniform(0.5, 1.0), str(e))
+            return
+
+        if updated:
+            await self.queue.complete(write)
+        elif write.attempts + 1 >= self.MISSING_ATTEMPTS:
+            logger.warning(f"Parking write to {write.table} {write.match}: no such row")
+            await self.queue.park(write, "no matching row")
+        else:
+            delay = min(self.BACKOFF_BASE_SECS * 2**write.attempts, self.BACKOFF_MAX_SECS)
+            await self.queue.retry(write, delay, "no matching row")
+
+    def _table(self, table: str) -> SupabaseInterface:
+        if table not in self._tables:
+            self._tables[table] = SupabaseInterface(table)
+        return self._tables[table]
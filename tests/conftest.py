@@ -0,0 +1,12 @@
+"""Test setup shared by every test module.
+
+Server modules are imported as ``src.<module>``. Bot modules (the VAD
+engines, ``end_of_turn``...) import each other by bare name, as they do when a
+bot runs with ``src/`` on the path, so both directories go on ``sys.path``.
+"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path[:0] = [os.path.join(ROOT_DIR, "src"), ROOT_DIR]
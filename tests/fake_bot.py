@@ -0,0 +1,8 @@
+"""Stand-in bot for the tests: stays in its "call" until it is stopped."""
+
+import signal
+import sys
+import time
+
+signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+time.sleep(60)
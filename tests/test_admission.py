@@ -0,0 +1,164 @@
+"""Admission control: slots, the bounded wait queue and draining."""
+
+import asyncio
+
+import pytest
+
+from src.admission import AdmissionController, AdmissionRejected
+
+
+def test_admits_up_to_max_bots():
+    admission = AdmissionController(max_bots=2, queue_size=0)
+
+    async def run():
+        await admission.acquire()
+        await admission.acquire()
+        with pytest.raises(AdmissionRejected, match="queue is full"):
+            await admission.acquire()
+
+    asyncio.run(run())
+
+    assert admission.stats()["active"] == 2
+    assert (admission.admitted_total, admission.rejected_total) == (2, 1)
+
+
+def test_release_hands_the_slot_to_the_first_waiter():
+    admission = AdmissionController(max_bots=1, queue_timeout=5)
+    admitted = []
+
+    async def wait(name):
+        await admission.acquire()
+        admitted.append(name)
+
+    async def run():
+        await admission.acquire()
+        waiters = [asyncio.create_task(wait(name)) for name in ("first", "second")]
+        await asyncio.sleep(0)
+        assert admission.queue_depth == 2
+
+        admission.release()
+        await asyncio.sleep(0.01)
+        assert admitted == ["first"]
+        admission.release()
+        await asyncio.gather(*waiters)
+
+    asyncio.run(run())
+
+    assert admitted == ["first", "second"]
+    assert admission.active == 1
+    assert admission.queue_depth == 0
+
+
+def test_new_callers_queue_behind_waiters():
+    # A freed slot goes to the queue, not to whoever asks next
+    running = [1]
+    admission = AdmissionController(
+        max_bots=1, queue_timeout=5, bots_running=lambda: running[0]
+    )
+
+    async def run():
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        # Another API worker's bot exits; this one hasn't noticed yet
+        running[0] = 0
+        late = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        assert admission.queue_depth == 2
+        await asyncio.wait_for(waiter, 1)
+        assert not late.done()
+        late.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await late
+
+    asyncio.run(run())
+
+    assert admission.active == 1
+    assert admission.queue_depth == 0
+
+
+def test_queued_caller_times_out():
+    admission = AdmissionController(max_bots=1, queue_timeout=0.1)
+
+    async def run():
+        await admission.acquire()
+        with pytest.raises(AdmissionRejected, match="Timed out") as rejected:
+            await admission.acquire()
+        return rejected.value
+
+    rejected = asyncio.run(run())
+
+    assert rejected.retry_after == 1
+    assert admission.queue_depth == 0
+    assert (admission.active, admission.rejected_total) == (1, 1)
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    admission = AdmissionController(max_bots=1, queue_timeout=5)
+
+    async def run():
+        await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        admission.release()
+
+    asyncio.run(run())
+
+    assert admission.queue_depth == 0
+    assert admission.active == 0
+    assert admission.rejected_total == 0
+
+
+def test_budgets_are_polled_while_queued(monkeypatch):
+    monkeypatch.setattr(AdmissionController, "BUDGET_POLL_SECS", 0.01)
+    rss = [200]
+    admission = AdmissionController(
+        max_rss_bytes=100, queue_timeout=5, rss_used=lambda: rss[0]
+    )
+
+    async def run():
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        # Memory frees up without any release()
+        rss[0] = 50
+        await asyncio.wait_for(waiter, 1)
+
+    asyncio.run(run())
+
+    assert admission.active == 1
+
+
+def test_shared_bot_count_limits_admission():
+    admission = AdmissionController(max_bots=2, queue_size=0, bots_running=lambda: 2)
+
+    async def run():
+        with pytest.raises(AdmissionRejected):
+            await admission.acquire()
+
+    asyncio.run(run())
+
+    assert admission.active == 0
+
+
+def test_drain_rejects_queued_and_new_callers():
+    admission = AdmissionController(max_bots=1, queue_timeout=5)
+
+    async def run():
+        await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        admission.drain()
+        with pytest.raises(AdmissionRejected, match="shutting down"):
+            await waiter
+        admission.release()
+        with pytest.raises(AdmissionRejected, match="shutting down"):
+            await admission.acquire()
+
+    asyncio.run(run())
+
+    stats = admission.stats()
+    assert (stats["active"], stats["queue_depth"], stats["rejected_total"]) == (0, 0, 2)
+    assert stats["draining"]
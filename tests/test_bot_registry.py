@@ -0,0 +1,170 @@
+"""The bot registry's indexes, history and process handling."""
+
+import asyncio
+import signal
+import subprocess
+import sys
+
+from src.bot_registry import BotRegistry
+
+# Exits on SIGTERM unless told to ignore it; says when the handler is set
+CHILD = """
+import signal, sys, time
+if sys.argv[1] == "ignore":
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+print("ready", flush=True)
+time.sleep(60)
+"""
+
+
+class FakeHandle:
+    """A bot that isn't a local process."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.exit_code = None
+
+    def poll(self):
+        return self.exit_code
+
+
+def spawn(mode: str = "exit") -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-c", CHILD, mode], stdout=subprocess.PIPE, text=True
+    )
+    assert process.stdout.readline() == "ready\n"
+    return process
+
+
+def test_indexes_follow_running_calls():
+    registry = BotRegistry()
+    finished = []
+    registry.on_finished(finished.append)
+    registry.add("a", FakeHandle(100), "room-1", "conv-a", watch=False)
+    registry.add("b", FakeHandle(101), "room-1", watch=False)
+    registry.add("c", FakeHandle(100), "room-2", watch=False, node="worker-1")
+
+    assert registry.bots_in_room("room-1") == 2
+    assert registry.by_conversation("conv-a").call_id == "a"
+    # Pids are per node
+    assert [entry.call_id for entry in registry.by_pid(100)] == ["a"]
+    assert registry.status(100, "worker-1")["call_id"] == "c"
+
+    registry.finish("a", 0)
+    registry.finish("a", 1)
+
+    assert registry.bots_in_room("room-1") == 1
+    assert [entry.call_id for entry in finished] == ["a"]
+    assert registry.call_status("a")["status"] == "finished"
+    assert registry.call_status("a")["exit_code"] == 0
+    assert registry.by_conversation("conv-a").exit_code == 0
+    assert {entry.call_id for entry in registry.running()} == {"b", "c"}
+
+
+def test_host_status_reports_its_latest_call():
+    registry = BotRegistry()
+    host = FakeHandle(200)
+    registry.add("first", host, "room-1", watch=False)
+    registry.add("second", host, "room-2", watch=False)
+    registry.finish("second", 0)
+
+    status = registry.status(200)
+
+    assert status["call_id"] == "second"
+    # The host is still serving the first call
+    assert status["status"] == "running"
+
+
+def test_history_evicts_least_recently_used():
+    registry = BotRegistry(history_size=2)
+    for index, call_id in enumerate("abc"):
+        registry.add(call_id, FakeHandle(300 + index), "room", f"conv-{call_id}", watch=False)
+
+    registry.finish("a", 0)
+    registry.finish("b", 0)
+    # Looking a call up keeps it in the history
+    registry.call_status("a")
+    registry.finish("c", 0)
+
+    assert registry.call_status("b") is None
+    assert registry.status(301) is None
+    assert registry.by_conversation("conv-b") is None
+    assert [entry.call_id for entry in registry.finished()] == ["a", "c"]
+
+
+def test_mark_joined_once():
+    registry = BotRegistry()
+    registry.add("a", FakeHandle(400), "room", watch=False)
+
+    assert registry.mark_joined("a").call_id == "a"
+    assert registry.mark_joined("a") is None
+    assert registry.mark_joined("unknown") is None
+
+
+def test_reap_finishes_exited_bots():
+    registry = BotRegistry()
+    handle = FakeHandle(500)
+    registry.add("a", handle, "room", watch=False)
+
+    registry.reap()
+    assert registry.call_status("a")["status"] == "running"
+    handle.exit_code = 3
+    registry.reap()
+
+    assert registry.call_status("a")["exit_code"] == 3
+
+
+def test_exited_process_is_reaped():
+    async def run():
+        registry = BotRegistry()
+        registry.start()
+        process = subprocess.Popen([sys.executable, "-c", "raise SystemExit(7)"])
+        registry.add("a", process, "room")
+        for _ in range(100):
+            if not registry.running():
+                break
+            await asyncio.sleep(0.05)
+        registry.stop()
+        return registry.call_status("a")
+
+    status = asyncio.run(run())
+
+    assert status["status"] == "finished"
+    assert status["exit_code"] == 7
+
+
+def test_drain_terminates_then_kills():
+    async def run():
+        registry = BotRegistry()
+        registry.start()
+        polite, stubborn, other = spawn(), spawn("ignore"), spawn()
+        registry.add("polite", polite, "room")
+        registry.add("stubborn", stubborn, "room")
+        registry.add("other", other, "room")
+        try:
+            stopped = await registry.drain(
+                0.1, 0.5, select=lambda entry: entry.call_id != "other"
+            )
+            await asyncio.sleep(0.2)
+            return stopped, polite.poll(), stubborn.poll(), other.poll()
+        finally:
+            other.kill()
+            other.wait()
+            registry.stop()
+
+    stopped, polite, stubborn, other = asyncio.run(run())
+
+    assert sorted(entry.call_id for entry in stopped) == ["polite", "stubborn"]
+    assert polite == -signal.SIGTERM
+    assert stubborn == -signal.SIGKILL
+    assert other is None
+
+
+def test_drain_returns_when_calls_end():
+    async def run():
+        registry = BotRegistry()
+        registry.add("a", FakeHandle(600), "room", watch=False)
+        asyncio.get_running_loop().call_later(0.05, registry.finish, "a", 0)
+        return await registry.drain(5, 5)
+
+    assert asyncio.run(run()) == []
@@ -0,0 +1,141 @@
+import asyncio
+
+import numpy as np
+import pytest
+from pipecat.audio.vad.vad_analyzer import VADParams, VADState
+
+import end_of_turn
+from end_of_turn import EndOfTurnController
+from energy_vad_analyzer import EnergyBaseVADAnalyzer
+
+FRAME_SECS = 0.03
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(end_of_turn.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def events(monkeypatch):
+    events = []
+    monkeypatch.setattr(
+        end_of_turn, "emit", lambda event, **fields: events.append((event, fields))
+    )
+    return events
+
+
+def make_controller(stop_secs=0.5, **kwargs):
+    params = VADParams(start_secs=0.06, stop_secs=stop_secs, min_volume=0.0)
+    analyzer = EnergyBaseVADAnalyzer(sample_rate=16000, params=params)
+
+    async def build():
+        # Frame processors need a running loop to be built
+        return EndOfTurnController(analyzer, params, **kwargs)
+
+    return asyncio.run(build()), analyzer
+
+
+def feed(analyzer, clock, speech: bool, secs: float) -> VADState:
+    samples = analyzer.num_frames_required()
+    if speech:
+        frame = (np.sin(np.arange(samples) * 0.3) * 10000).astype(np.int16).tobytes()
+    else:
+        frame = np.zeros(samples, dtype=np.int16).tobytes()
+    state = None
+    for _ in range(round(secs / FRAME_SECS)):
+        clock.now += FRAME_SECS
+        state = analyzer.analyze_audio(frame)
+    return state
+
+
+def end_turn(controller, clock, gap: float, bot_answered: bool = False):
+    controller._on_user_stopped()
+    controller._bot_answered = bot_answered
+    clock.now += gap
+    controller._on_user_started()
+
+
+def test_turn_end_reports_saved_and_added_delay_without_negatives(clock, events):
+    controller, _ = make_controller(stop_secs=0.9)
+    controller._on_user_stopped()
+    controller.stop_secs = 0.3
+    controller._on_user_stopped()
+
+    (_, slow), (_, fast) = events
+    assert slow == {"stop_secs": 0.9, "saved_secs": 0.0, "added_secs": pytest.approx(0.4)}
+    assert fast == {"stop_secs": 0.3, "saved_secs": pytest.approx(0.2), "added_secs": 0.0}
+
+
+def test_short_pauses_within_a_turn_are_observed(clock, events):
+    controller, analyzer = make_controller(stop_secs=0.5)
+
+    assert feed(analyzer, clock, True, 0.3) == VADState.SPEAKING
+    assert feed(analyzer, clock, False, 0.18) == VADState.STOPPING
+    assert feed(analyzer, clock, True, 0.09) == VADState.SPEAKING
+
+    assert list(controller._pauses) == [pytest.approx(0.18)]
+
+
+def test_turn_ending_silence_is_not_a_pause(clock, events):
+    controller, analyzer = make_controller(stop_secs=0.3)
+
+    feed(analyzer, clock, True, 0.3)
+    assert feed(analyzer, clock, False, 0.6) == VADState.QUIET
+    feed(analyzer, clock, True, 0.3)
+
+    assert list(controller._pauses) == []
+
+
+def test_clean_turn_ends_step_down_to_the_short_pauses(clock, events):
+    controller, _ = make_controller(stop_secs=0.8)
+    controller._pauses.extend([0.2] * controller.MIN_PAUSES)
+
+    for _ in range(20):
+        end_turn(controller, clock, gap=5.0)
+    controller._on_user_stopped()
+
+    # The floor is 0.2 + margin, below the bound, so nothing holds it up
+    assert controller.pause_floor == pytest.approx(0.3)
+    assert controller.stop_secs == pytest.approx(0.3)
+
+
+def test_false_turn_end_is_a_pause_past_the_delay(clock, events):
+    controller, _ = make_controller(stop_secs=0.5)
+
+    end_turn(controller, clock, gap=0.46, bot_answered=True)
+
+    # The 0.5s delay plus 0.4s until speech began (detected 0.06s later)
+    assert list(controller._pauses) == [pytest.approx(0.9)]
+    assert events[-1] == ("false_turn_end", {"stop_secs": 0.5})
+    assert controller._pending_secs == pytest.approx(0.7)
+
+
+def test_long_pauses_hold_the_delay_up(clock, events):
+    controller, _ = make_controller(stop_secs=0.5)
+    controller._pauses.extend([0.2] * 5 + [0.9] * 5)
+
+    for _ in range(5):
+        end_turn(controller, clock, gap=5.0)
+
+    assert controller.pause_floor == pytest.approx(1.0)
+    assert controller._pending_secs == pytest.approx(1.0)
+
+
+def test_floor_needs_enough_pauses(clock, events):
+    controller, _ = make_controller(stop_secs=0.5)
+    controller._pauses.extend([1.0] * (controller.MIN_PAUSES - 1))
+
+    assert controller.pause_floor is None
+    end_turn(controller, clock, gap=5.0)
+    assert controller._pending_secs == pytest.approx(0.45)
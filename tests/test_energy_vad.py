@@ -0,0 +1,81 @@
+"""Integer energy VAD: batched scoring matches frame-by-frame scoring."""
+
+import numpy as np
+import pytest
+
+from energy_vad_analyzer import AdaptiveEnergyVADAnalyzer, EnergyBaseVADAnalyzer
+
+
+def frames(analyzer, levels, seed=0) -> np.ndarray:
+    """One frame of noise per RMS level, roughly, as int16 samples."""
+    rng = np.random.default_rng(seed)
+    length = analyzer.num_frames_required()
+    samples = [rng.normal(0, level, length) for level in levels]
+    return np.clip(np.concatenate(samples), -32768, 32767).astype(np.int16)
+
+
+def one_by_one(analyzer, pcm: np.ndarray) -> list:
+    length = analyzer.num_frames_required()
+    return [
+        analyzer.voice_confidence(pcm[start : start + length].tobytes())
+        for start in range(0, len(pcm) - length + 1, length)
+    ]
+
+
+@pytest.mark.parametrize("sample_rate", [8000, 16000])
+def test_batch_matches_single_frames(sample_rate):
+    analyzer = EnergyBaseVADAnalyzer(sample_rate=sample_rate)
+    pcm = frames(analyzer, [0, 100, 300, 800, 2000, 30000] * 5)
+
+    batch = analyzer.voice_confidences(pcm.tobytes())
+
+    assert batch.tolist() == one_by_one(analyzer, pcm)
+    assert batch.tolist()[:6] == [0.0, 0.0, 0.0, 1.0, 1.0, 1.0]
+
+
+def test_adaptive_batch_matches_single_frames():
+    # Quiet line, speech, a louder line, speech again
+    levels = [100] * 40 + [3000] * 15 + [600] * 130 + [5000] * 15
+    single = AdaptiveEnergyVADAnalyzer()
+    batched = AdaptiveEnergyVADAnalyzer()
+    pcm = frames(single, levels)
+
+    expected = one_by_one(single, pcm)
+    # Split across calls at an odd frame boundary; state carries over
+    split = 37 * batched.num_frames_required()
+    batch = np.concatenate(
+        [
+            batched.voice_confidences(pcm[:split].tobytes()),
+            batched.voice_confidences(pcm[split:].tobytes()),
+        ]
+    )
+
+    assert batch.tolist() == expected
+    assert batched.noise_floor == single.noise_floor
+    assert 1.0 in expected[40:55]
+    assert expected[-20:-15] == [0.0] * 5
+
+
+def test_full_scale_frames_do_not_overflow():
+    analyzer = EnergyBaseVADAnalyzer(threshold=32000)
+    length = analyzer.num_frames_required()
+    # Squares of a frame sum far beyond int32
+    pcm = np.full(length * 3, -32768, dtype=np.int16)
+
+    assert analyzer.voice_confidences(pcm.tobytes()).tolist() == [1.0, 1.0, 1.0]
+    assert analyzer.voice_confidence(pcm[:length].tobytes()) == 1.0
+    assert analyzer._frame_energies(pcm.tobytes()).tolist() == [32768**2 * length] * 3
+
+
+def test_trailing_partial_frame_is_ignored():
+    analyzer = EnergyBaseVADAnalyzer()
+    length = analyzer.num_frames_required()
+    pcm = frames(analyzer, [2000, 0, 2000])
+
+    assert analyzer.voice_confidences(pcm[: 2 * length + 100].tobytes()).tolist() == [
+        1.0,
+        0.0,
+    ]
+    assert analyzer.voice_confidences(pcm[: length - 1].tobytes()).tolist() == []
+    # A smaller batch after a larger one reuses the buffers
+    assert analyzer.voice_confidences(pcm[length:].tobytes()).tolist() == [0.0, 1.0]
@@ -0,0 +1,31 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+from conftest import ROOT_DIR
+
+SCRIPT = os.path.join(ROOT_DIR, "script", "import-time", "app.py")
+
+
+def load_script():
+    # The script's directory name isn't importable as a package
+    spec = importlib.util.spec_from_file_location("import_time", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+import_time = load_script()
+
+with open(import_time.BUDGET_FILE) as f:
+    BUDGETS = json.load(f)
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS))
+def test_bot_import_stays_within_budget(module):
+    # Each module is imported in a fresh interpreter
+    report = import_time.check(module, BUDGETS[module])
+
+    assert report["violations"] == [], f"{module}: {report['phases_ms']}"
@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.room_pool import RoomPool
+
+
+class FakeDaily:
+    """Daily REST helper that creates rooms, failing the first ``failures`` times."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.created = 0
+
+    async def create_room(self, params):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Daily API unavailable")
+        self.created += 1
+        return SimpleNamespace(url=f"https://example.daily.co/room-{self.created}")
+
+    async def get_token(self, room_url, expiry):
+        return f"token-for-{room_url}"
+
+
+async def wait_for_rooms(pool: RoomPool, count: int):
+    for _ in range(200):
+        if await pool.ready() >= count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"pool has {await pool.ready()} rooms, wanted {count}")
+
+
+def test_refill_survives_failures_and_keeps_going():
+    async def run():
+        pool = RoomPool(FakeDaily(failures=3), size=2, concurrency=1)
+        pool.RETRY_DELAY_SECS = 0.01
+        pool.start()
+        await wait_for_rooms(pool, 2)
+        await pool.close()
+        return pool
+
+    pool = asyncio.run(run())
+    assert pool._task is None
+    assert {room.url for room in pool._rooms} == {
+        "https://example.daily.co/room-1",
+        "https://example.daily.co/room-2",
+    }
+
+
+def test_refill_survives_a_failing_store():
+    class FlakyStore:
+        def __init__(self):
+            self.rooms = []
+            self.lease_calls = 0
+
+        async def acquire_lease(self, name, ttl):
+            self.lease_calls += 1
+            if self.lease_calls == 1:
+                raise OSError("database is locked")
+            return True
+
+        async def count_rooms(self, min_expires_at):
+            return len(self.rooms)
+
+        async def put_room(self, url, token, expires_at):
+            self.rooms.append(url)
+
+    async def run():
+        store = FlakyStore()
+        pool = RoomPool(FakeDaily(), size=1, store=store)
+        pool.RETRY_DELAY_SECS = 0.01
+        pool.start()
+        await wait_for_rooms(pool, 1)
+        await pool.close()
+        return store
+
+    store = asyncio.run(run())
+    assert store.lease_calls >= 2
+    assert store.rooms == ["https://example.daily.co/room-1"]
+
+
+def test_taking_a_room_wakes_the_refill():
+    async def run():
+        daily = FakeDaily()
+        pool = RoomPool(daily, size=1)
+        pool.start()
+        await wait_for_rooms(pool, 1)
+        await pool.acquire()
+        # Far sooner than CHECK_INTERVAL_SECS
+        await wait_for_rooms(pool, 1)
+        await pool.close()
+        return daily
+
+    assert asyncio.run(run()).created == 2
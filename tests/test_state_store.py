@@ -0,0 +1,169 @@
+"""SQLiteStateStore, with several stores on one file standing in for workers."""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from src.state_store import SQLiteStateStore
+
+
+@pytest.fixture
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def open_store(path, owner=None, **kwargs) -> SQLiteStateStore:
+    store = SQLiteStateStore(str(path), **kwargs)
+    if owner is not None:
+        store.owner = owner
+    return store
+
+
+async def applied(*stores: SQLiteStateStore):
+    """Wait for the stores' queued bot writes, which run in order with queries."""
+    for store in stores:
+        await store.running_bots()
+
+
+def test_bots_are_shared_between_workers(tmp_path):
+    async def run():
+        first = open_store(tmp_path / "state.db")
+        second = open_store(tmp_path / "state.db", owner=1)
+        first.add_bot("a", 100, "room-1", "conv-a")
+        first.add_bot("b", 101, "room-1")
+        second.add_bot("c", 100, "room-2", node="worker-1")
+        second.finish_bot("c", 0)
+        first.finish_bot("b", -15)
+        await applied(first, second)
+
+        result = (
+            await second.bots_in_room("room-1"),
+            await second.running_bots(),
+            await second.bot_status(100),
+            await first.bot_status(100, "worker-1"),
+            await first.call_status("b"),
+            await first.call_status("unknown"),
+        )
+        await first.close()
+        await second.close()
+        return result
+
+    in_room, running, local, remote, finished, unknown = asyncio.run(run())
+
+    assert (in_room, running) == (1, 1)
+    assert (local["call_id"], local["status"]) == ("a", "running")
+    assert (remote["call_id"], remote["status"]) == ("c", "finished")
+    assert (finished["status"], finished["exit_code"]) == ("finished", -15)
+    assert unknown is None
+
+
+def test_finished_history_is_bounded(tmp_path):
+    async def run():
+        store = open_store(tmp_path / "state.db", history_size=2)
+        for call_id in "abc":
+            store.add_bot(call_id, 100, "room")
+            store.finish_bot(call_id, 0)
+            # Ended times must differ for the cut-off
+            await asyncio.sleep(0.01)
+        statuses = [await store.call_status(call_id) for call_id in "abc"]
+        await store.close()
+        return statuses
+
+    statuses = asyncio.run(run())
+
+    assert statuses[0] is None
+    assert [status["call_id"] for status in statuses[1:]] == ["b", "c"]
+
+
+def test_orphaned_bots_are_those_of_dead_workers(tmp_path, dead_pid):
+    async def run():
+        live = open_store(tmp_path / "state.db")
+        gone = open_store(tmp_path / "state.db", owner=dead_pid)
+        live.add_bot("mine", 100, "room")
+        gone.add_bot("orphan", 101, "room")
+        gone.add_bot("ended", 102, "room")
+        gone.finish_bot("ended", 0)
+        await applied(live, gone)
+        orphans = await live.orphaned_bots()
+        await live.close()
+        await gone.close()
+        return orphans
+
+    orphans = asyncio.run(run())
+
+    assert [(bot["call_id"], bot["pid"], bot["node"]) for bot in orphans] == [
+        ("orphan", 101, "local")
+    ]
+
+
+def test_rooms_are_taken_once_and_expired_ones_dropped(tmp_path):
+    now = time.time()
+
+    async def run():
+        first = open_store(tmp_path / "state.db")
+        second = open_store(tmp_path / "state.db", owner=1)
+        await first.put_room("expiring", "t0", now + 10)
+        await first.put_room("later", "t2", now + 7200)
+        await second.put_room("soon", "t1", now + 3600)
+
+        counted = await first.count_rooms(now + 60)
+        taken = [await store.take_room(now + 60) for store in (first, second, first)]
+        await first.close()
+        await second.close()
+        return counted, taken
+
+    counted, taken = asyncio.run(run())
+
+    assert counted == 2
+    assert taken == [("soon", "t1", now + 3600), ("later", "t2", now + 7200), None]
+
+
+def test_lease_has_one_holder_until_it_expires(tmp_path):
+    async def run():
+        first = open_store(tmp_path / "state.db")
+        second = open_store(tmp_path / "state.db", owner=1)
+        result = [
+            await first.acquire_lease("room-pool", 0.2),
+            await second.acquire_lease("room-pool", 0.2),
+            # The holder renews it
+            await first.acquire_lease("room-pool", 0.2),
+        ]
+        await asyncio.sleep(0.3)
+        result.append(await second.acquire_lease("room-pool", 10))
+        result.append(await first.acquire_lease("room-pool", 10))
+        await first.close()
+        await second.close()
+        return result
+
+    assert asyncio.run(run()) == [True, False, True, True, False]
+
+
+def test_counters_of_exited_workers_are_kept(tmp_path, dead_pid):
+    async def run():
+        live = open_store(tmp_path / "state.db")
+        gone = open_store(tmp_path / "state.db", owner=dead_pid)
+        await gone.publish_counters({"calls": 3.0, "errors": 1.0})
+        await live.publish_counters({"calls": 2.0})
+        before = await live.counter_totals()
+        # Later totals replace the worker's earlier ones
+        await live.publish_counters({"calls": 5.0})
+        after = await live.counter_totals()
+        owners = await live._run(
+            live._fetchall, "SELECT DISTINCT owner FROM counters ORDER BY owner"
+        )
+        await live.close()
+        await gone.close()
+        return before, after, owners
+
+    before, after, owners = asyncio.run(run())
+
+    assert before == {"calls": 5.0, "errors": 1.0}
+    assert after == {"calls": 8.0, "errors": 1.0}
+    # The dead worker's totals were folded into owner 0
+    assert owners == [(0,), (os.getpid(),)]
@@ -0,0 +1,177 @@
+"""Bulk writes against a stand-in PostgREST served by httpx.MockTransport."""
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+from postgrest import AsyncPostgrestClient
+from postgrest.exceptions import APIError
+
+from src import supabase_interface
+from src.supabase_interface import SupabaseInterface, is_permanent_error
+
+REJECTED = {"code": "23514", "message": "new row violates check constraint"}
+
+
+class FakePostgrest:
+    """A table that rejects rows with ``bad`` set, and can fail transiently."""
+
+    def __init__(self, ids=(), outages: int = 0):
+        self.ids = set(ids)
+        self.outages = outages
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        rows = json.loads(request.content) if request.content else None
+        self.requests.append((request.method, rows))
+        if self.outages:
+            self.outages -= 1
+            return httpx.Response(503, json={"message": "upstream unavailable"})
+
+        if request.method == "POST":
+            if any(row.get("bad") for row in rows):
+                return httpx.Response(400, json=REJECTED)
+            self.ids.update(row["id"] for row in rows)
+            written = rows
+        else:
+            ids = parse_qs(request.url.query.decode())["id"][0]
+            requested = ids.removeprefix("in.(").removesuffix(")").split(",")
+            if rows.get("bad"):
+                return httpx.Response(400, json=REJECTED)
+            written = [{"id": id, **rows} for id in requested if id in self.ids]
+
+        body = written if "return=representation" in request.headers["Prefer"] else []
+        return httpx.Response(
+            200,
+            json=body,
+            headers={"Content-Range": f"0-{max(len(written) - 1, 0)}/{len(written)}"},
+        )
+
+
+@pytest.fixture
+def table(monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "http://supabase.test")
+    monkeypatch.setenv("SUPABASE_KEY", "key")
+    monkeypatch.setattr(supabase_interface, "BULK_RETRY_DELAY_SECS", 0)
+
+    def make(backend: FakePostgrest):
+        client = AsyncPostgrestClient("http://supabase.test/rest/v1")
+        client.session = httpx.AsyncClient(
+            base_url="http://supabase.test/rest/v1",
+            transport=httpx.MockTransport(backend),
+        )
+        monkeypatch.setattr(supabase_interface, "get_postgrest_client", lambda: client)
+        return SupabaseInterface[dict]("conversations")
+
+    return make
+
+
+def test_upsert_writes_in_chunks(table):
+    backend = FakePostgrest()
+    rows = [{"id": str(i), "status": "ended"} for i in range(10)]
+
+    result = asyncio.run(table(backend).bulk_upsert(rows, chunk_size=4))
+
+    assert result.written == 10
+    assert result.failed == []
+    assert [len(rows) for _, rows in backend.requests] == [4, 4, 2]
+
+
+def test_upsert_bisects_a_rejected_chunk_to_the_bad_rows(table):
+    backend = FakePostgrest()
+    rows = [{"id": str(i), "bad": i in (2, 5)} for i in range(8)]
+
+    result = asyncio.run(table(backend).bulk_upsert(rows, chunk_size=8))
+
+    assert result.written == 6
+    assert sorted(row["id"] for row, _ in result.failed) == ["2", "5"]
+    assert all("check constraint" in error for _, error in result.failed)
+    assert backend.ids == {"0", "1", "3", "4", "6", "7"}
+
+
+def test_upsert_retries_transient_failures_without_bisecting(table):
+    backend = FakePostgrest(outages=supabase_interface.BULK_RETRIES)
+    rows = [{"id": str(i)} for i in range(4)]
+
+    result = asyncio.run(table(backend).bulk_upsert(rows, chunk_size=4))
+
+    assert result.written == 4
+    assert result.failed == []
+    # Every attempt sent the whole chunk
+    assert [len(rows) for _, rows in backend.requests] == [4] * (
+        supabase_interface.BULK_RETRIES + 1
+    )
+
+
+def test_upsert_reports_the_chunk_once_retries_run_out(table):
+    backend = FakePostgrest(outages=100)
+    rows = [{"id": str(i)} for i in range(3)]
+
+    result = asyncio.run(table(backend).bulk_upsert(rows, chunk_size=3))
+
+    assert result.written == 0
+    assert [row for row, _ in result.failed] == rows
+    assert len(backend.requests) == supabase_interface.BULK_RETRIES + 1
+
+
+def test_upsert_groups_rows_by_their_columns(table):
+    backend = FakePostgrest()
+    rows = [{"id": "1", "status": "ended"}, {"id": "2"}, {"id": "3", "status": "ended"}]
+
+    asyncio.run(table(backend).bulk_upsert(rows))
+
+    assert sorted(len(rows) for _, rows in backend.requests) == [1, 2]
+
+
+def test_update_reports_ids_that_match_nothing(table):
+    backend = FakePostgrest(ids={"1", "2"})
+    updates = [{"id": id, "status": "ended"} for id in ("1", "2", "3")]
+
+    result = asyncio.run(table(backend).bulk_update(updates, return_records=True))
+
+    assert result.written == 2
+    assert result.failed == [({"id": "3", "status": "ended"}, "no matching record")]
+    assert sorted(record["id"] for record in result.records) == ["1", "2"]
+    # Same data, so one request for every id
+    assert len(backend.requests) == 1
+
+
+def test_update_isolates_rejected_groups(table):
+    backend = FakePostgrest(ids={"1", "2"})
+    updates = [{"id": "1", "status": "ended"}, {"id": "2", "bad": True}]
+
+    result = asyncio.run(table(backend).bulk_update(updates))
+
+    assert result.written == 1
+    assert [row["id"] for row, _ in result.failed] == ["2"]
+
+
+@pytest.mark.parametrize(
+    "error, permanent",
+    [
+        (APIError({"code": "23505", "message": "duplicate key"}), True),
+        (APIError({"code": "42703", "message": "unknown column"}), True),
+        (APIError({"code": "40001", "message": "serialization failure"}), False),
+        (APIError({"code": "57014", "message": "statement timeout"}), False),
+        (APIError({"code": "PGRST000", "message": "no connection"}), False),
+        (APIError({"code": "404", "message": "not found"}), True),
+        (APIError({"code": "429", "message": "too many requests"}), False),
+        (APIError({"code": "503", "message": "unavailable"}), False),
+        (APIError({"message": "no code"}), False),
+        (httpx.ReadTimeout("timed out"), False),
+    ],
+)
+def test_is_permanent_error(error, permanent):
+    assert is_permanent_error(error) is permanent
+
+
+def test_is_permanent_error_unwraps_causes():
+    try:
+        try:
+            raise APIError({"code": "23505", "message": "duplicate key"})
+        except APIError as e:
+            raise Exception("Failed to upsert") from e
+    except Exception as wrapped:
+        assert is_permanent_error(wrapped)
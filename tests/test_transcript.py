@@ -0,0 +1,44 @@
+import asyncio
+
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+
+from transcript import TranscriptRecorder
+
+
+async def finish(conversation, context):
+    # Frame processors need a running loop to be built
+    await TranscriptRecorder(conversation, context).finish()
+
+
+class FailingConversation:
+    """A conversation record whose database is down."""
+
+    def __init__(self, conversation_id=None):
+        self.conversation_id = conversation_id
+        self.updates = []
+
+    async def update(self, data):
+        self.updates.append(data)
+        raise ConnectionError("database unavailable")
+
+    async def add_turn(self, seq, message):
+        raise ConnectionError("database unavailable")
+
+
+def test_finish_survives_a_failed_update():
+    conversation = FailingConversation()
+    context = OpenAILLMContext([{"role": "user", "content": "hello"}])
+
+    asyncio.run(finish(conversation, context))
+
+    assert conversation.updates[0]["status"] == "ended"
+    assert conversation.updates[0]["transcript"] == [{"role": "user", "content": "hello"}]
+
+
+def test_finish_survives_failed_turn_writes():
+    conversation = FailingConversation("conversation-1")
+    context = OpenAILLMContext([{"role": "user", "content": "hello"}])
+
+    asyncio.run(finish(conversation, context))
+
+    assert conversation.updates == [{"status": "ended"}]
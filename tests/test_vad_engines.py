@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from pipecat.audio.vad.vad_analyzer import VADParams, VADState
+
+from cascaded_vad_analyzer import CascadedSileroVADAnalyzer
+from silero_vad_analyzer import SileroVADAnalyzer
+from vad_engines import (
+    DEFAULT_VAD_ENGINE,
+    VAD_ENGINES,
+    create_vad_analyzer,
+    load_vad_analyzer,
+)
+
+
+def silence(analyzer, frames: int = 1) -> bytes:
+    return np.zeros(analyzer.num_frames_required() * frames, dtype=np.int16).tobytes()
+
+
+@pytest.mark.parametrize("sample_rate", [8000, 16000])
+def test_silero_constructs_and_scores(sample_rate):
+    analyzer = SileroVADAnalyzer(sample_rate=sample_rate, params=VADParams(stop_secs=0.5))
+
+    assert analyzer.num_frames_required() == (512 if sample_rate == 16000 else 256)
+    assert analyzer.voice_confidence(silence(analyzer)) < 0.5
+    assert analyzer.analyze_audio(silence(analyzer, 4)) == VADState.QUIET
+
+
+def test_silero_analyzers_share_the_model():
+    first = SileroVADAnalyzer(sample_rate=16000)
+    second = SileroVADAnalyzer(sample_rate=16000)
+
+    assert first._model is second._model
+
+
+@pytest.mark.parametrize("engine", sorted(VAD_ENGINES))
+def test_every_engine_constructs_and_analyzes(engine):
+    analyzer = create_vad_analyzer(engine, VADParams(stop_secs=0.5))
+
+    assert type(analyzer).__name__ == engine
+    assert analyzer.num_frames_required() > 0
+    assert analyzer.analyze_audio(silence(analyzer, 4)) == VADState.QUIET
+
+
+@pytest.mark.parametrize("engine", sorted(VAD_ENGINES))
+def test_every_engine_constructs_with_defaults(engine):
+    assert create_vad_analyzer(engine).num_frames_required() > 0
+
+
+def test_unknown_engine_falls_back_to_default():
+    assert load_vad_analyzer("NoSuchAnalyzer") is load_vad_analyzer(DEFAULT_VAD_ENGINE)
+
+
+def test_cascaded_silero_keeps_silence_from_the_model():
+    analyzer = CascadedSileroVADAnalyzer(sample_rate=16000)
+    frame = silence(analyzer)
+    # The gate needs a few blocks to measure the line's floor
+    for _ in range(200):
+        analyzer.voice_confidence(frame)
+
+    assert analyzer.frames == 200
+    assert analyzer.skip_ratio > 0.9
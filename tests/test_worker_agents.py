@@ -0,0 +1,253 @@
+"""The scheduler against several worker agents running in this process.
+
+Each agent is its own copy of ``src/worker_agent.py`` (so its own registry
+and pool), served by uvicorn on a free port, and its bots are
+``tests/fake_bot.py``.
+"""
+
+import asyncio
+import importlib.util
+import os
+from contextlib import AsyncExitStack, asynccontextmanager
+
+import aiohttp
+import pytest
+import uvicorn
+
+from conftest import ROOT_DIR
+from src.bot_registry import BotRegistry
+from src.scheduler import (
+    BinPackingStrategy,
+    BotScheduler,
+    LeastLoadedStrategy,
+    RemoteNode,
+)
+
+TOKEN = "test-agent-token"
+AGENT_FILE = os.path.join(ROOT_DIR, "src", "worker_agent.py")
+FAKE_BOT = os.path.join("tests", "fake_bot.py")
+
+
+def load_agent(monkeypatch, index: int, capacity: int, token=TOKEN):
+    """A fresh copy of the worker agent module, configured from the env."""
+    if token:
+        monkeypatch.setenv("WORKER_AGENT_TOKEN", token)
+    else:
+        monkeypatch.delenv("WORKER_AGENT_TOKEN", raising=False)
+    monkeypatch.setenv("NODE_CAPACITY", str(capacity))
+    monkeypatch.setenv("BOT_POOL_SIZE", "0")
+    monkeypatch.setenv("SHUTDOWN_DRAIN_TIMEOUT", "0")
+    monkeypatch.setenv("SHUTDOWN_KILL_TIMEOUT", "1")
+    monkeypatch.delenv("WRITE_QUEUE_PATH", raising=False)
+    spec = importlib.util.spec_from_file_location(f"worker_agent_{index}", AGENT_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@asynccontextmanager
+async def serve(agent):
+    """Run an agent on a free port and yield its base URL."""
+    server = uvicorn.Server(
+        uvicorn.Config(agent.app, host="127.0.0.1", port=0, log_level="warning")
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    agent.bot_pool.bot_file = FAKE_BOT
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await task
+
+
+@asynccontextmanager
+async def silent_server():
+    """A server that accepts connections and never answers."""
+    connections = []
+
+    async def hold(reader, writer):
+        connections.append(writer)
+        await reader.read()
+
+    server = await asyncio.start_server(hold, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        for writer in connections:
+            writer.close()
+        server.close()
+
+
+@pytest.fixture
+def agents(monkeypatch):
+    """Factory for agent modules with the given capacities."""
+    return lambda *capacities: [
+        load_agent(monkeypatch, index, capacity)
+        for index, capacity in enumerate(capacities)
+    ]
+
+
+async def start_nodes(stack: AsyncExitStack, session, agents, **kwargs):
+    nodes = []
+    for agent in agents:
+        url = await stack.enter_async_context(serve(agent))
+        nodes.append(RemoteNode(url, session, TOKEN, **kwargs))
+    return nodes
+
+
+async def launch(scheduler: BotScheduler, call_id: str):
+    return await scheduler.launch(call_id, f"https://example.daily.co/{call_id}", "token")
+
+
+def test_least_loaded_spreads_calls_across_agents(agents):
+    async def run():
+        async with AsyncExitStack() as stack:
+            session = await stack.enter_async_context(aiohttp.ClientSession())
+            nodes = await start_nodes(stack, session, agents(2, 2))
+            scheduler = BotScheduler(nodes, LeastLoadedStrategy())
+            await asyncio.gather(*(node.refresh() for node in nodes))
+
+            bots = [await launch(scheduler, f"call-{i}") for i in range(4)]
+            with pytest.raises(RuntimeError):
+                await launch(scheduler, "call-4")
+            return nodes, bots
+
+    nodes, bots = asyncio.run(run())
+    assert [node.capacity for node in nodes] == [2, 2]
+    assert [bot.node for bot in bots] == [nodes[0], nodes[1], nodes[0], nodes[1]]
+
+
+def test_bin_packing_fills_one_agent_first(agents):
+    async def run():
+        async with AsyncExitStack() as stack:
+            session = await stack.enter_async_context(aiohttp.ClientSession())
+            nodes = await start_nodes(stack, session, agents(2, 2))
+            scheduler = BotScheduler(nodes, BinPackingStrategy())
+            await asyncio.gather(*(node.refresh() for node in nodes))
+
+            bots = [await launch(scheduler, f"call-{i}") for i in range(3)]
+            return nodes, bots
+
+    nodes, bots = asyncio.run(run())
+    assert [bot.node for bot in bots] == [nodes[0], nodes[0], nodes[1]]
+
+
+def test_launch_moves_on_from_an_agent_that_times_out(agents):
+    async def run():
+        async with AsyncExitStack() as stack:
+            session = await stack.enter_async_context(aiohttp.ClientSession())
+            hung_url = await stack.enter_async_context(silent_server())
+            hung = RemoteNode(hung_url, session, TOKEN, timeout=0.5)
+            (live,) = await start_nodes(stack, session, agents(0))
+            # Equal load, so the hung node is tried first
+            scheduler = BotScheduler([hung, live], LeastLoadedStrategy())
+
+            bot = await launch(scheduler, "call-0")
+            return hung, live, bot
+
+    hung, live, bot = asyncio.run(run())
+    assert bot.node is live
+    assert not hung.healthy
+    assert live.healthy
+
+
+def test_launch_moves_on_from_an_unreachable_agent(agents):
+    async def run():
+        async with AsyncExitStack() as stack:
+            session = await stack.enter_async_context(aiohttp.ClientSession())
+            # Nothing listens on port 9 (discard) here
+            gone = RemoteNode("http://127.0.0.1:9", session, TOKEN)
+            (live,) = await start_nodes(stack, session, agents(0))
+            scheduler = BotScheduler([gone, live], LeastLoadedStrategy())
+            return gone, await launch(scheduler, "call-0")
+
+    gone, bot = asyncio.run(run())
+    assert not gone.healthy
+    assert bot.node is not gone
+
+
+def test_status_is_routed_to_the_agent_running_the_call(agents):
+    async def run():
+        async with AsyncExitStack() as stack:
+            session = await stack.enter_async_context(aiohttp.ClientSession())
+            events = []
+            nodes = await start_nodes(
+                stack, session, agents(1, 1), on_event=events.append
+            )
+            scheduler = BotScheduler(nodes, LeastLoadedStrategy())
+            await asyncio.gather(*(node.refresh() for node in nodes))
+            registry = BotRegistry()
+
+            for call_id in ("call-a", "call-b"):
+                bot = await launch(scheduler, call_id)
+                registry.add(
+                    call_id, bot, f"room-{call_id}", watch=False, node=bot.node.name
+                )
+
+            status = registry.call_status("call-b")
+            node, other = sorted(nodes, key=lambda node: node.name != status["node"])
+            live = await node.call_status("call-b")
+            with pytest.raises(aiohttp.ClientResponseError) as missing:
+                await other.call_status("call-b")
+
+            # Stop the call and let the node report it finished
+            node.calls["call-b"].terminate()
+            for _ in range(100):
+                await node.refresh()
+                if events:
+                    break
+                await asyncio.sleep(0.05)
+            for event in events:
+                registry.finish(event["call_id"], event["exit_code"])
+            return status, live, missing.value, registry.call_status("call-b")
+
+    status, live, missing, finished = asyncio.run(run())
+    assert status["status"] == "running"
+    assert live["call_id"] == "call-b"
+    assert live["status"] == "running"
+    assert live["node"] == "local"
+    assert missing.status == 404
+    assert finished["status"] == "finished"
+    assert finished["node"] == status["node"]
+
+
+def test_agent_rejects_requests_without_the_token(agents):
+    async def run():
+        async with AsyncExitStack() as stack:
+            session = await stack.enter_async_context(aiohttp.ClientSession())
+            (node,) = await start_nodes(stack, session, agents(1))
+            statuses = []
+            for headers in ({}, {"Authorization": "Bearer wrong"}, node.headers):
+                async with session.get(f"{node.url}/capacity", headers=headers) as response:
+                    statuses.append(response.status)
+
+            impostor = RemoteNode(node.url, session, "wrong")
+            await impostor.refresh()
+            scheduler = BotScheduler(
+                [RemoteNode(node.url, session, "wrong")], LeastLoadedStrategy()
+            )
+            with pytest.raises(RuntimeError):
+                await launch(scheduler, "call-0")
+            return statuses, impostor, node
+
+    statuses, impostor, node = asyncio.run(run())
+    assert statuses == [401, 401, 200]
+    assert not impostor.healthy
+    assert node.calls == {}
+
+
+def test_agent_refuses_to_start_without_a_token(monkeypatch):
+    agent = load_agent(monkeypatch, 0, 1, token=None)
+
+    async def run():
+        async with agent.lifespan(agent.app):
+            pass
+
+    with pytest.raises(RuntimeError, match="WORKER_AGENT_TOKEN"):
+        asyncio.run(run())
@@ -0,0 +1,237 @@
+"""The SQLite write queue and its flusher, against a stand-in table."""
+
+import asyncio
+import json
+import sqlite3
+import time
+
+import pytest
+from postgrest.exceptions import APIError
+
+from src.write_queue import WriteFlusher, WriteQueue
+
+REJECTED = {"code": "23503", "message": "violates foreign key constraint"}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WriteQueue(str(tmp_path / "writes.db"))
+    yield queue
+    queue.close()
+
+
+def pending(queue: WriteQueue):
+    return queue._db.execute(
+        "SELECT table_name, op, match, data, attempts FROM writes ORDER BY id"
+    ).fetchall()
+
+
+def due_now(queue: WriteQueue):
+    queue._db.execute("UPDATE writes SET next_attempt_at = 0")
+
+
+class FakeTable:
+    """Records what the flusher sends; fails with ``error`` if set."""
+
+    def __init__(self, error: Exception = None, updated: int = 1):
+        self.error = error
+        self.updated = updated
+        self.sent = []
+
+    async def patch_where(self, match, data):
+        self.sent.append(("update", match, data))
+        if self.error:
+            raise self.error
+        return self.updated
+
+    async def upsert(self, data, unique_columns):
+        self.sent.append(("upsert", data, unique_columns))
+        if self.error:
+            raise self.error
+        return data
+
+
+def flusher_for(queue: WriteQueue, table: FakeTable) -> WriteFlusher:
+    flusher = WriteFlusher(queue)
+    flusher._tables["conversations"] = table
+    return flusher
+
+
+def test_updates_to_a_row_are_coalesced(queue):
+    async def run():
+        await queue.enqueue("conversations", {"id": "a"}, {"status": "active"})
+        await queue.enqueue("conversations", {"id": "a"}, {"status": "ended", "secs": 40})
+        await queue.enqueue("conversations", {"id": "b"}, {"status": "active"})
+        # Same row, but an insert is a separate write
+        await queue.enqueue("conversations", {"id": "a"}, {"status": "new"}, op="upsert")
+
+    asyncio.run(run())
+
+    assert pending(queue) == [
+        ("conversations", "update", '{"id": "a"}', '{"status": "ended", "secs": 40}', 0),
+        ("conversations", "update", '{"id": "b"}', '{"status": "active"}', 0),
+        ("conversations", "upsert", '{"id": "a"}', '{"status": "new"}', 0),
+    ]
+    assert queue.stats()["backlog"] == 3
+
+
+def test_claimed_writes_are_leased(queue):
+    async def run():
+        for id in "abc":
+            await queue.enqueue("conversations", {"id": id}, {"status": "ended"})
+        first = await queue.claim(2, lease_secs=60)
+        second = await queue.claim(2, lease_secs=60)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert [write.match for write in first] == [{"id": "a"}, {"id": "b"}]
+    assert [write.match for write in second] == [{"id": "c"}]
+
+
+def test_update_during_flush_is_kept(queue):
+    async def run():
+        await queue.enqueue("conversations", {"id": "a"}, {"status": "active"})
+        (write,) = await queue.claim(10, lease_secs=60)
+        await queue.enqueue("conversations", {"id": "a"}, {"status": "ended"})
+        await queue.complete(write)
+        return await queue.claim(10, lease_secs=60)
+
+    (write,) = asyncio.run(run())
+
+    assert write.data == {"status": "ended"}
+    assert write.version == 2
+
+
+def test_complete_removes_the_sent_version(queue):
+    async def run():
+        await queue.enqueue("conversations", {"id": "a"}, {"status": "active"})
+        (write,) = await queue.claim(10, lease_secs=60)
+        await queue.complete(write)
+
+    asyncio.run(run())
+
+    assert queue.stats()["backlog"] == 0
+
+
+def test_retry_delays_the_write(queue):
+    async def run():
+        await queue.enqueue("conversations", {"id": "a"}, {"status": "active"})
+        (write,) = await queue.claim(10, lease_secs=60)
+        await queue.retry(write, 60, "timed out")
+        return await queue.claim(10, lease_secs=60)
+
+    assert asyncio.run(run()) == []
+    assert pending(queue)[0][4] == 1
+
+
+def test_flusher_sends_and_removes(queue):
+    table = FakeTable()
+
+    async def run():
+        await queue.enqueue("conversations", {"id": "a"}, {"status": "ended"})
+        await queue.enqueue("conversations", {"id": "b"}, {"status": "new"}, op="upsert")
+        return await flusher_for(queue, table).flush()
+
+    assert asyncio.run(run()) == 2
+    assert sorted(table.sent) == [
+        ("update", {"id": "a"}, {"status": "ended"}),
+        ("upsert", {"id": "b", "status": "new"}, ["id"]),
+    ]
+    assert queue.stats()["backlog"] == 0
+
+
+def test_transient_failures_are_kept(queue):
+    table = FakeTable(error=APIError({"code": "503", "message": "unavailable"}))
+
+    async def run():
+        await queue.enqueue("conversations", {"id": "a"}, {"status": "ended"})
+        flusher = flusher_for(queue, table)
+        for _ in range(WriteFlusher.REJECTED_ATTEMPTS + 2):
+            due_now(queue)
+            await flusher.flush()
+
+    asyncio.run(run())
+
+    stats = queue.stats()
+    assert (stats["backlog"], stats["failed"]) == (1, 0)
+    assert pending(queue)[0][4] == WriteFlusher.REJECTED_ATTEMPTS + 2
+
+
+@pytest.mark.parametrize(
+    "table, attempts, error",
+    [
+        (FakeTable(error=APIError(REJECTED)), WriteFlusher.REJECTED_ATTEMPTS, None),
+        (FakeTable(updated=0), WriteFlusher.MISSING_ATTEMPTS, "no matching row"),
+    ],
+    ids=["rejected", "missing"],
+)
+def test_failing_writes_are_parked(queue, table, attempts, error):
+    async def run():
+        await queue.enqueue("conversations", {"id": "a"}, {"status": "ended"})
+        flusher = flusher_for(queue, table)
+        for _ in range(attempts):
+            assert queue.stats()["failed"] == 0
+            due_now(queue)
+            await flusher.flush()
+
+    asyncio.run(run())
+
+    assert queue.stats() == {"backlog": 0, "oldest_age": 0.0, "failed": 1}
+    match, data, parked_attempts, parked_error = queue._db.execute(
+        "SELECT match, data, attempts, error FROM failed_writes"
+    ).fetchone()
+    assert (json.loads(match), json.loads(data)) == ({"id": "a"}, {"status": "ended"})
+    assert parked_attempts == attempts
+    assert parked_error == (error or str(APIError(REJECTED)))
+
+
+def test_version_1_file_is_migrated(tmp_path):
+    path = str(tmp_path / "writes.db")
+    db = sqlite3.connect(path)
+    db.executescript(
+        """
+        CREATE TABLE writes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            match TEXT NOT NULL,
+            data TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 1,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            claimed_until REAL NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            last_error TEXT,
+            UNIQUE (table_name, match)
+        );
+        CREATE INDEX writes_due ON writes (next_attempt_at);
+        """
+    )
+    now = time.time()
+    db.execute(
+        "INSERT INTO writes (table_name, match, data, attempts, next_attempt_at, created_at) "
+        "VALUES ('conversations', '{\"id\": \"a\"}', '{\"status\": \"ended\"}', 2, ?, ?)",
+        (now, now),
+    )
+    db.commit()
+    db.close()
+
+    queue = WriteQueue(path)
+    try:
+
+        async def run():
+            await queue.enqueue("conversations", {"id": "a"}, {"status": "new"}, op="upsert")
+            return await queue.claim(10, lease_secs=60)
+
+        writes = asyncio.run(run())
+        (version,) = queue._db.execute("PRAGMA user_version").fetchone()
+    finally:
+        queue.close()
+
+    assert version == WriteQueue.SCHEMA_VERSION
+    assert [(write.op, write.match, write.data, write.attempts) for write in writes] == [
+        ("update", {"id": "a"}, {"status": "ended"}, 2),
+        ("upsert", {"id": "a"}, {"status": "new"}, 0),
+    ]
+    # Reopening a current file leaves it alone
+    WriteQueue(path).close()